@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+'''Functions for timing each stage of SDTWorkflow on synthetic print folders'''
+
+# external packages
+import os, sys
+import time
+import tempfile
+import traceback
+import argparse
+import logging
+from typing import List, Dict, Tuple, Union, Any, TextIO
+import numpy as np
+import pandas as pd
+
+# local packages
+currentdir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(currentdir)
+parentdir = os.path.dirname(currentdir)
+sys.path.insert(0, parentdir)     # py.metrics must not resolve to an installed module named py
+sys.path.append(os.path.join(parentdir, 'py'))
+from synth_folder import synthFolders, synthTables
+from tools.config import cfg
+from tools.plainIm import plainIm, plainExp
+from tools.timeCounter import profiler
+from full_sequence import SDTWorkflow
+
+# logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+#----------------------------------------------
+
+stages = ['getProgDims', 'exportStills', 'detectNozzle', 'exportBackground', 'analyze']
+
+class benchSDT:
+    '''creates synthetic print folders and times each stage of SDTWorkflow on each folder.
+    topFolder is the folder to put the synthetic files in. if empty, use a temporary folder
+    n is the number of print folders to create
+    stageList is the list of SDTWorkflow functions to time, in order'''
+
+    def __init__(self, topFolder:str='', n:int=1, stageList:List[str]=stages, **kwargs):
+        if len(topFolder)==0:
+            self.tempdir = tempfile.TemporaryDirectory()
+            topFolder = self.tempdir.name
+        self.topFolder = topFolder
+        self.n = n
+        self.stageList = stageList
+        self.kwargs = kwargs
+
+    def setup(self) -> None:
+        '''create the fluid tables and print folders, and point the config at them so nothing is read from the server'''
+        for key,val in synthTables(self.topFolder).items():
+            cfg.path[key].SDT = val
+        cfg.path.server = self.topFolder
+        self.folders = synthFolders(self.topFolder, n=self.n, **self.kwargs)
+
+    def runStage(self, wf:SDTWorkflow, stage:str) -> dict:
+        '''time a single stage. failures are recorded instead of raised, so later stages and folders still run'''
+        status = 'ok'
+        t0 = time.perf_counter()
+        c0 = time.process_time()
+        try:
+            with profiler.span(stage):
+                getattr(wf, stage)()
+        except KeyboardInterrupt as e:
+            raise e
+        except Exception as e:
+            status = f'{type(e).__name__}: {e}'
+            logging.warning(f'{stage} failed on {wf.folder}: {status}')
+            traceback.print_exc()
+        return {'stage':stage, 'wall':time.perf_counter()-t0, 'cpu':time.process_time()-c0, 'status':status}
+
+    def run(self) -> pd.DataFrame:
+        '''time every stage on every folder'''
+        if not hasattr(self, 'folders'):
+            self.setup()
+        profiler.enable()
+        out = []
+        for i,folder in enumerate(self.folders):
+            wf = SDTWorkflow(folder)
+            with profiler.span('folder'):
+                for stage in self.stageList:
+                    out.append({'folder':i, **self.runStage(wf, stage)})
+        profiler.disable()
+        self.df = pd.DataFrame(out, columns=['folder', 'stage', 'wall', 'cpu', 'status'])
+        return self.df
+
+    def units(self) -> dict:
+        '''units for the columns in the table'''
+        return {'folder':'', 'stage':'', 'wall':'s', 'cpu':'s', 'status':''}
+
+    def summary(self) -> pd.DataFrame:
+        '''median wall and cpu time for each stage, and the number of folders where the stage failed'''
+        g = self.df.groupby('stage', sort=False)
+        df = pd.DataFrame({'wall':g.wall.median(), 'cpu':g.cpu.median(), 'failures':g.status.apply(lambda x:(x!='ok').sum())})
+        return df.reset_index()
+
+    def exportBaseline(self, fn:str) -> None:
+        '''export the stage times so future runs can be compared to them'''
+        plainExp(fn, self.df, self.units(), index=False)
+
+    def exportProfile(self, fn:str) -> None:
+        '''export the spans recorded during the run'''
+        profiler.export(fn)
+
+    def compareBaseline(self, fn:str) -> pd.DataFrame:
+        '''compare this run to a baseline file. ratio is the median wall time in this run divided by the median wall time in the baseline'''
+        df0,_ = plainIm(fn, ic=None)
+        df0['wall'] = df0['wall'].astype(float)
+        base = df0.groupby('stage', sort=False).wall.median().rename('wall_0')
+        df = pd.merge(base, self.summary().set_index('stage'), left_index=True, right_index=True, how='outer')
+        df['ratio'] = df['wall']/df['wall_0']
+        return df.reset_index()
+
+
+#----------------------------------------------
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time each stage of SDTWorkflow on synthetic print folders')
+    parser.add_argument('-n', type=int, default=1, help='number of print folders')
+    parser.add_argument('--folder', default='', help='folder to put the synthetic files in. default is a temporary folder')
+    parser.add_argument('--baseline', default='', help='.csv file to export stage times to, or to compare against')
+    parser.add_argument('--compare', action='store_true', help='compare to the baseline instead of overwriting it')
+    parser.add_argument('--profile', default='', help='.csv or .json file to export the span profile to')
+    args = parser.parse_args()
+
+    b = benchSDT(args.folder, n=args.n)
+    b.run()
+    print(b.summary().to_string(index=False))
+    if len(args.baseline)>0:
+        if args.compare:
+            print(b.compareBaseline(args.baseline).to_string(index=False))
+        else:
+            b.exportBaseline(args.baseline)
+    if len(args.profile)>0:
+        b.exportProfile(args.profile)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+'''Functions for timing how long it takes to import modules in a fresh interpreter'''
+
+# external packages
+import os, sys
+import subprocess
+import argparse
+import logging
+from typing import List, Dict, Tuple, Union, Any, TextIO
+import numpy as np
+import pandas as pd
+
+# local packages
+currentdir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(currentdir)
+parentdir = os.path.dirname(currentdir)
+sys.path.append(os.path.join(parentdir, 'py'))
+from tools.plainIm import plainIm, plainExp
+
+# logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+#----------------------------------------------
+
+def importEnv() -> dict:
+    '''environment for the subprocess, with the repo and py folder first on the path'''
+    env = os.environ.copy()
+    paths = [parentdir, os.path.join(parentdir, 'py')]
+    if 'PYTHONPATH' in env and len(env['PYTHONPATH'])>0:
+        paths.append(env['PYTHONPATH'])
+    env['PYTHONPATH'] = os.pathsep.join(paths)
+    return env
+
+def importTime(module:str) -> float:
+    '''time in s to import the module in a fresh interpreter'''
+    code = f'import time; t0 = time.perf_counter(); import {module}; print(time.perf_counter()-t0)'
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=importEnv())
+    if out.returncode!=0:
+        raise ValueError(f'Failed to import {module}: {out.stderr.strip()}')
+    return float(out.stdout.strip().split('\n')[-1])
+
+def importBreakdown(module:str) -> pd.DataFrame:
+    '''get the cumulative import time of every module imported by the module, from python -X importtime'''
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], capture_output=True, text=True, env=importEnv())
+    rows = []
+    for line in out.stderr.split('\n'):
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cum_us, name = line[len('import time:'):].split('|')   # times are in us
+        rows.append({'module':name.strip(), 'self':int(self_us)/10**6, 'cumulative':int(cum_us)/10**6})
+    df = pd.DataFrame(rows, columns=['module', 'self', 'cumulative'])
+    return df.sort_values(by='cumulative', ascending=False).reset_index(drop=True)
+
+
+class benchImport:
+    '''times imports of each module in modules, n times each, each in a fresh interpreter'''
+
+    def __init__(self, modules:List[str]=['full_sequence'], n:int=5):
+        self.modules = modules
+        self.n = n
+
+    def run(self) -> pd.DataFrame:
+        '''time every import'''
+        out = []
+        for module in self.modules:
+            for i in range(self.n):
+                out.append({'module':module, 'run':i, 'wall':importTime(module)})
+        self.df = pd.DataFrame(out, columns=['module', 'run', 'wall'])
+        return self.df
+
+    def units(self) -> dict:
+        '''units for the columns in the table'''
+        return {'module':'', 'run':'', 'wall':'s'}
+
+    def summary(self) -> pd.DataFrame:
+        '''median and minimum import time for each module'''
+        g = self.df.groupby('module', sort=False).wall
+        return pd.DataFrame({'median':g.median(), 'min':g.min()}).reset_index()
+
+    def exportBaseline(self, fn:str) -> None:
+        '''export the import times so future runs can be compared to them'''
+        plainExp(fn, self.df, self.units(), index=False)
+
+    def compareBaseline(self, fn:str) -> pd.DataFrame:
+        '''compare this run to a baseline file. ratio is the median import time in this run divided by the median import time in the baseline'''
+        df0,_ = plainIm(fn, ic=None)
+        df0['wall'] = df0['wall'].astype(float)
+        base = df0.groupby('module', sort=False).wall.median().rename('median_0')
+        df = pd.merge(base, self.summary().set_index('module'), left_index=True, right_index=True, how='outer')
+        df['ratio'] = df['median']/df['median_0']
+        return df.reset_index()
+
+
+#----------------------------------------------
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time imports in a fresh interpreter')
+    parser.add_argument('modules', nargs='*', default=['full_sequence'], help='modules to import')
+    parser.add_argument('-n', type=int, default=5, help='number of times to import each module')
+    parser.add_argument('--baseline', default='', help='.csv file to export import times to, or to compare against')
+    parser.add_argument('--compare', action='store_true', help='compare to the baseline instead of overwriting it')
+    parser.add_argument('--breakdown', type=int, default=0, help='show this many of the slowest modules imported by each module')
+    args = parser.parse_args()
+
+    b = benchImport(args.modules, n=args.n)
+    b.run()
+    print(b.summary().to_string(index=False))
+    if len(args.baseline)>0:
+        if args.compare:
+            print(b.compareBaseline(args.baseline).to_string(index=False))
+        else:
+            b.exportBaseline(args.baseline)
+    if args.breakdown>0:
+        for module in args.modules:
+            print(importBreakdown(module).head(args.breakdown).to_string(index=False))
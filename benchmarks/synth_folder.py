@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+'''Functions for generating synthetic print folders for benchmarking'''
+
+# external packages
+import os, sys
+import logging
+import datetime
+from typing import List, Dict, Tuple, Union, Any, TextIO
+import numpy as np
+import pandas as pd
+import cv2 as cv
+
+# local packages
+currentdir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(currentdir)
+parentdir = os.path.dirname(currentdir)
+sys.path.append(os.path.join(parentdir, 'py'))
+from tools.plainIm import plainExp, plainExpDict
+import file.file_names as fn
+
+# logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+#----------------------------------------------
+
+class synthSDTHoriz:
+    '''creates a deterministic synthetic disturbHoriz print folder: a rendered video of a nozzle writing and disturbing 4 lines, a Fluigent time file, and a meta file.
+    topFolder is the folder to put the SDT file tree in
+    seed changes the background noise and the small timing offsets between folders
+    sbp is the shopbot file name, which determines the print type
+    date and time go into the file names
+    fps is the frame rate of the rendered video
+    size is the (width, height) of the video in px, which should match the Basler camera
+    dt is the time step in the time file in s
+    '''
+
+    def __init__(self, topFolder:str, seed:int=0, ink:str='SO9', sup:str='3.50', sbp:str='disturbHoriz3_1_1.250'
+                 , date:str='230207', time:str='152314', fps:float=30, size:Tuple[int,int]=(800,600), dt:float=0.05):
+        self.rng = np.random.default_rng(seed)
+        self.seed = seed
+        self.ink = ink
+        self.sup = sup
+        self.sbp = sbp
+        self.date = date
+        self.time = time
+        self.fps = fps
+        self.size = size
+        self.dt = dt
+
+        # print geometry, in mm and s. these match the meta file
+        self.di = 0.603
+        self.do = 0.907
+        self.vink = 5
+        self.vsup = 5
+        self.calibb = 0.05               # mm/s/mbar
+        self.pOn = self.vink/self.calibb  # mbar
+        self.pxpmm = 71                  # camera magnification 0.5
+        self.collectionFrameRate = 100
+        self.dstart = 1.2-0.002*self.collectionFrameRate   # video starts this long before the time file, see vidData.getVidStats
+        self.spacing = float(sbp.split('_')[-1])
+        self.dEst = self.di*np.sqrt(self.vink/self.vsup)
+        self.numLines = 4
+        self.lWrite = 6        # length of write and disturb moves
+        self.lExtend = 1       # length of the extension after each write and disturb move
+        self.zWrite = -3
+        self.zDisturb = self.zWrite+self.dEst*self.spacing
+        self.zObserve = self.zWrite+3
+        self.tObserve = 1.5+0.1*self.rng.random()   # time between the first and last observe snaps
+        self.tSnap = 0.25                           # time the camera flag is on for each snap
+        self.wobble = self.rng.uniform(0, 2*np.pi, 2)  # phase of the roughness on the top and bottom edges of the filament
+
+        sample = f'I_{ink}_S_{sup}'
+        self.printFolder = os.path.join(topFolder, 'SDT', ink, sample, f'{sample}_{date}', sbp)
+        self.tag = f'{sample}_{date}_{time}_{seed}'
+
+    def fileName(self, s:str, ext:str) -> str:
+        '''get the full path of a file in the print folder'''
+        return os.path.join(self.printFolder, f'{self.sbp}_{s}_{self.tag}.{ext}')
+
+    #---------------------------------------
+    # programmed moves
+
+    def addMove(self, target:Tuple[float,float,float], speed:float, pressure:bool=False, line:int=-1, wait:float=0, snaps:List[float]=[]) -> None:
+        '''add a move to the list of moves. wait is the time to hold at the target, and snaps are times after arriving at the target to take pictures'''
+        self.moves.append({'target':target, 'speed':speed, 'pressure':pressure, 'line':line, 'wait':wait, 'snaps':snaps})
+
+    def programMoves(self) -> None:
+        '''list all of the moves in the print'''
+        self.moves = []
+        y0 = 0
+        y1 = y0+self.lWrite
+        y2 = y1+self.lExtend
+        self.start = (0, y0, self.zObserve)
+        snaps = [0.3, 0.3+self.tObserve]
+        for j in range(self.numLines):
+            x = -2*j
+            for z,pressure in [(self.zWrite, True), (self.zDisturb, False)]:
+                self.addMove((x, y0, z), 2*self.vsup, line=j, wait=0.3)          # approach
+                self.addMove((x, y1, z), self.vsup, pressure=pressure, line=j)    # write or disturb
+                self.addMove((x, y2, z), self.vsup, line=j)                       # extend
+                self.addMove((x, y2, self.zObserve), 2*self.vsup, line=j, wait=snaps[-1]+0.5, snaps=snaps)   # observe
+        self.addMove((0, y0, self.zObserve), 2*self.vsup, wait=0.5)
+
+    #---------------------------------------
+    # time file
+
+    def flagTimes(self, move:dict, tarrive:float) -> List[Tuple[float,str,int]]:
+        '''get the (time, status, flag bit) for each flag flip in this move'''
+        out = []
+        for ts in move['snaps']:
+            out.append((tarrive+ts, 'SNAP', 8))
+            out.append((tarrive+ts+self.tSnap, 'SNOFF', 8))
+        return out
+
+    def simulate(self) -> None:
+        '''step through the moves and record the time table'''
+        self.programMoves()
+        pos = np.array(self.start, dtype=float)
+        rows = []
+        events = []      # (time, status, flag bit)
+        self.writes = {}   # line number: start and end of the write move
+        t = 0
+        for i,move in enumerate(self.moves):
+            target = np.array(move['target'], dtype=float)
+            dist = np.linalg.norm(target-pos)
+            tmove = dist/move['speed']
+            nsteps = max(int(np.ceil(tmove/self.dt)), 1)
+            tarrive = t+tmove
+            nwait = int(np.ceil(move['wait']/self.dt))
+            if move['pressure']:
+                events.append((t, 'ON', 0))
+                events.append((tarrive, 'OFF', 0))
+                self.writes[move['line']] = {'y0':pos[1], 'y1':target[1], 't0':t, 'tf':tarrive}
+            events = events+self.flagTimes(move, tarrive)
+            for k in range(1, nsteps+nwait+1):
+                tk = t+k*self.dt
+                frac = min((tk-t)/tmove, 1) if tmove>0 else 1
+                p = pos+(target-pos)*frac
+                rows.append({'time':tk, 'x_disp':p[0], 'y_disp':p[1], 'z_disp':p[2]
+                             , 'x_target':target[0], 'y_target':target[1], 'z_target':target[2]
+                             , 'targetLine':i+1, 'speed':move['speed'], 'line':move['line']})
+            pos = target
+            t = t+(nsteps+nwait)*self.dt
+        self.table = pd.DataFrame(rows)
+        self.labelFlags(events)
+        self.arrays = dict([[c, self.table[c].to_numpy()] for c in ['time', 'y_disp', 'z_disp', 'line']])
+
+    def labelFlags(self, events:List[Tuple[float,str,int]]) -> None:
+        '''put pressure, flag state, and flag status annotations into the time table'''
+        times = self.table.time.to_numpy()
+        flag = np.zeros(len(times), dtype=int)
+        status = np.full(len(times), '', dtype=object)
+        on = {}
+        for te,st,bit in sorted(events):
+            i = min(np.searchsorted(times, te), len(times)-1)
+            s = f'Flag {bit}: {st}'
+            status[i] = s if len(status[i])==0 else f'{status[i]}, {s}'
+            if st in ['ON', 'SNAP']:
+                on[bit] = i
+            else:
+                flag[on.pop(bit):i] += 2**bit
+        self.table['flag'] = flag
+        self.table['status'] = status
+        self.table['Channel_0_pressure'] = np.where(flag&1, self.pOn, 0)
+        self.table['trusted'] = False
+
+    def exportTimeFile(self) -> None:
+        '''export the Fluigent time table, with units in the header'''
+        units = {'time':'s', 'Channel_0_pressure':'mbar', 'x_disp':'mm', 'y_disp':'mm', 'z_disp':'mm'
+                 , 'x_target':'mm', 'y_target':'mm', 'z_target':'mm', 'speed':'mm/s'}
+        cols = ['time', 'Channel_0_pressure', 'x_disp', 'y_disp', 'z_disp', 'x_target', 'y_target', 'z_target', 'speed', 'targetLine', 'flag', 'trusted', 'status']
+        df = self.table[cols].copy()
+        df.rename(columns=dict([[c, f'{c}({u})'] for c,u in units.items()]), inplace=True)
+        df.to_csv(self.fileName('time', 'csv'), index=False)
+
+    def exportMetaFile(self) -> None:
+        '''export the meta file that describes the nozzle, camera, and pressure calibration'''
+        vals = {'nozzle_inner_diameter':self.di, 'nozzle_outer_diameter':self.do
+                , 'camera_magnification':0.5, 'camera_position':'side'
+                , 'Basler_camera_collection_frame_rate':self.collectionFrameRate
+                , 'caliba_channel_0':0, 'calibb_channel_0':self.calibb, 'calibc_channel_0':0
+                , 'ink_speed_channel_0':self.vink, 'speed_move_xy':self.vsup}
+        units = {'nozzle_inner_diameter':'mm', 'nozzle_outer_diameter':'mm', 'Basler_camera_collection_frame_rate':'fps'
+                 , 'caliba_channel_0':'mm/s/mbar^2', 'calibb_channel_0':'mm/s/mbar', 'calibc_channel_0':'mm/s'
+                 , 'ink_speed_channel_0':'mm/s', 'speed_move_xy':'mm/s'}
+        plainExpDict(self.fileName('meta', 'csv'), vals, units, diag=False)
+
+    #---------------------------------------
+    # video
+
+    def background(self) -> np.array:
+        '''get the empty frame, with a slight vertical gradient and fixed noise'''
+        w,h = self.size
+        grad = np.linspace(215, 195, h).reshape((h,1,1))
+        noise = self.rng.normal(0, 2, (h,w,1))
+        return np.clip(np.repeat(grad+noise, 3, axis=2), 0, 255).astype(np.uint8)
+
+    def renderFrame(self, frame:np.array, bg:np.array, t:float) -> np.array:
+        '''draw the nozzle and the filament of the current line at print time t'''
+        w,h = self.size
+        np.copyto(frame, bg)
+        cx = w//2
+        tip = h//2
+        times = self.arrays['time']
+        ti = min(np.searchsorted(times, t), len(times)-1)
+        yd = np.interp(t, times, self.arrays['y_disp'])
+        zd = np.interp(t, times, self.arrays['z_disp'])
+
+        # filament from the write move of the current line
+        j = self.arrays['line'][ti]
+        if j in self.writes and t>self.writes[j]['t0']:
+            wr = self.writes[j]
+            yend = min(yd, wr['y1']) if t<wr['tf'] else wr['y1']
+            c0 = int(round(cx+(wr['y0']-yd)*self.pxpmm))
+            c1 = int(round(cx+(yend-yd)*self.pxpmm))
+            r0 = tip+(zd-self.zWrite)*self.pxpmm
+            r1 = r0+self.dEst*self.pxpmm
+            if c1>c0:
+                # rough top and bottom edges that move with the bath, so straight edges don't look like the image border
+                cols = np.arange(max(c0,0), min(c1,w-1)+1, 4)
+                ybath = (cols-cx)/self.pxpmm+yd
+                top = r0+2*np.sin(ybath*5+self.wobble[0])
+                bot = r1+2*np.sin(ybath*7+self.wobble[1])
+                pts = np.concatenate([np.stack([cols, top], axis=1), np.stack([cols, bot], axis=1)[::-1]])
+                cv.fillPoly(frame, [np.round(pts).astype(np.int32)], (70,60,150))
+
+        # nozzle
+        nw = int(round(self.do*self.pxpmm/2))
+        cv.rectangle(frame, (cx-nw, 0), (cx+nw, tip), (90,90,90), -1)
+        cv.rectangle(frame, (cx-nw, 0), (cx+nw, tip), (40,40,40), 2)
+        return frame
+
+    def exportVideo(self) -> None:
+        '''render the video, which starts dstart before the time file'''
+        w,h = self.size
+        out = cv.VideoWriter(self.fileName('Basler camera', 'avi'), cv.VideoWriter_fourcc(*'MJPG'), self.fps, (w,h))
+        bg = self.background()
+        frame = np.empty_like(bg)
+        tmax = self.table.time.max()
+        for k in range(int((tmax+self.dstart)*self.fps)):
+            out.write(self.renderFrame(frame, bg, k/self.fps-self.dstart))
+        out.release()
+
+    #---------------------------------------
+
+    def export(self) -> str:
+        '''create the print folder and all of its files. returns the print folder'''
+        os.makedirs(self.printFolder, exist_ok=True)
+        self.simulate()
+        self.exportTimeFile()
+        self.exportMetaFile()
+        self.exportVideo()
+        if not fn.isPrintFolder(self.printFolder):
+            raise ValueError(f'Synthetic folder is not a print folder: {self.printFolder}')
+        logging.info(f'Exported synthetic print folder {self.printFolder}')
+        return self.printFolder
+
+
+def synthTables(topFolder:str, ink:str='SO9', sup:str='3.50') -> Dict[str,str]:
+    '''export minimal rheology, surface tension, and density tables for the ink and support, in the format that valTables reads. returns a dictionary of config path names and files'''
+    folder = os.path.join(topFolder, 'tables')
+    os.makedirs(folder, exist_ok=True)
+    fluids = [{'fluid':ink, 'rheWt':float(ink[2:]), 'base':'silicone oil', 'density':0.97
+               , 'tau0':20, 'k':3, 'n':0.5, 'eta0':800, 'Gstor':200}
+              , {'fluid':sup, 'rheWt':float(sup), 'base':'water', 'density':1.01
+               , 'tau0':15, 'k':2, 'n':0.45, 'eta0':600, 'Gstor':150}]
+    rhe = []
+    for f in fluids:
+        row = {'fluid':f['fluid'], 'rheWt':f['rheWt'], 'base':f['base']}
+        for dire in ['a', 'd']:
+            for val in ['tau0', 'k', 'n', 'eta0', 'Gstor']:
+                row[f'y2_{dire}_{val}'] = f[val]
+        rhe.append(row)
+    rhe = pd.DataFrame(rhe)
+    density = pd.DataFrame([{'rheWt':f['rheWt'], 'base':f['base'], 'density':f['density']} for f in fluids])
+    sigma = pd.DataFrame([{'ink_base':fluids[0]['base'], 'sup_base':fluids[1]['base'], 'sigma':20}])
+    out = {}
+    for name,df in [['rheTable', rhe], ['densityTable', density], ['sigmaTable', sigma]]:
+        file = os.path.join(folder, f'{name}.csv')
+        plainExp(file, df, dict([[c,''] for c in df.columns]), index=False, diag=False)
+        out[name] = file
+    return out
+
+def synthFolders(topFolder:str, n:int=1, date:str='230207', **kwargs) -> List[str]:
+    '''create n synthetic print folders with seeds 0 to n-1, each one day after the last starting at date (yymmdd), so they go in different sample folders. returns a list of print folders'''
+    d0 = datetime.datetime.strptime(date, '%y%m%d')
+    return [synthSDTHoriz(topFolder, seed=i, date=(d0+datetime.timedelta(days=i)).strftime('%y%m%d'), **kwargs).export() for i in range(n)]
@@ -23,6 +23,8 @@ from print_file_dict import *
 from levels import *
 from folder_loop import *
 from print_folders import *
+from still_index import *
+from folder_catalog import *
 
 
 # logging
@@ -28,6 +28,10 @@ logger.setLevel(logging.DEBUG)
 
 def allSBPFiles() -> dict:
     '''dictionary of all of the shopbot file names and their shortcuts'''
+    return dict(names.sbp)
+
+def allSBPFiles0() -> dict:
+    '''build the dictionary of all of the shopbot file names and their shortcuts from the tables'''
     return {**singleDisturbSBPfiles(), **SDTSBPfiles(), **tripleLineSBPfiles(), **singleLineSBPfiles()}
 
 def allStFiles() -> list:
@@ -37,32 +41,25 @@ def allStFiles() -> list:
 def isTripleLineStill(file:str) -> bool:
     '''determine if the file is a triple line still'''
     spl = splitFileName(file)
-    return spl[0] in tripleLineSBPPicfiles()
+    return spl[0] in names.pics['tripleLine']
 
 def isSingleLineStill(file:str) -> bool:
     '''determine if the file is a single line still'''
     spl = splitFileName(file)
-    return spl[0] in singleLineSBPPicfiles()
+    return spl[0] in names.pics['singleLine']
 
 def isSDTStill(file:str) -> bool:
     '''determine if the file is a single double triple file'''
     spl = splitFileName(file)
-    return spl[0] in SDTSBPPicfiles()
+    return spl[0] in names.pics['SDT']
 
 def isVidStill(file:str) ->bool:
     '''determine if the file is a video still'''
-    if not '.png' in file:
-        return False
-    if '_vstill_' in file:
-        return True
-    for st in allStFiles():
-        if f'_vid_{st}' in file:
-            return True
-    return False
+    return names.isVidStill(file)
 
 def isStill(file:str) -> bool:
     '''determine if the file is an unstitched image'''
-    return isTripleLineStill(file) or isSingleLineStill(file) or isSDTStill(file)
+    return names.isStill(file)
 
 def isStitch(file:str) -> bool:
     '''determine if the file is a stitched image'''
@@ -112,11 +109,7 @@ def singleDisturb2FileDict() -> str:
 
 def singleDisturbName(file:str) -> str:
     '''get the short name, given the sbp file name'''
-    d = singleDisturb2FileDict()
-    for key,val in d.items():
-        if val in file:
-            return key
-    raise ValueError(f'Unexpected sbp file name: {file}')
+    return names.shortName(file, 'singleDisturb')
 
 #--------------
 
@@ -148,11 +141,7 @@ def SDT2FileDict() -> str:
 
 def SDTName(file:str) -> str:
     '''get the short name, given the sbp file name'''
-    d = SDT2FileDict()
-    for key,val in d.items():
-        if val in file:
-            return key
-    raise ValueError(f'Unexpected sbp file name: {file}')
+    return names.shortName(file, 'SDT')
 
 
 #---
@@ -200,11 +189,7 @@ def tripleLine2FileDict() -> str:
 
 def tripleLineName(file:str) -> str:
     '''get the short name, given the sbp file name'''
-    d = tripleLine2FileDict()
-    for key,val in d.items():
-        if val in file:
-            return key
-    raise ValueError(f'Unexpected sbp file name: {file}')
+    return names.shortName(file, 'tripleLine')
 
 #---
 
@@ -240,15 +225,16 @@ def isSBPFolder(folder:str) -> bool:
     bn = os.path.basename(folder)
     if 'Pics' in bn:
         return False
-    for s in allSBPFiles():
-        if s in bn:
-            return True
+    return names.sbpRe.search(bn) is not None
     
 def isPrintFolder(folder:str) -> bool:
     '''determine if the folder is a print folder'''
     if os.path.exists(os.path.join(folder, 'raw')):
         return True  
+    return isPrintFolderName(folder)
 
+def isPrintFolderName(folder:str) -> bool:
+    '''determine if the folder is a print folder from its path alone, without looking inside it'''
     # has tripleLines SBP name in basename
     if isSBPFolder(folder):
         return True
@@ -258,3 +244,101 @@ def isPrintFolder(folder:str) -> bool:
         return True
 
     return False
+
+#--------------
+
+def nameRe(l:list, lookahead:bool=False) -> re.Pattern:
+    '''compile a regex that matches any of the strings in the list. 
+    if lookahead, match at every position so overlapping names are all found, preferring names earlier in the list at the same position'''
+    alt = '|'.join([re.escape(s) for s in l])
+    if lookahead:
+        return re.compile(f'(?=({alt}))')
+    else:
+        return re.compile(alt)
+
+class fileNameClassifier:
+    '''classifies file names using tables and regexes that are built once per process, instead of rebuilding the tables for every file'''
+    
+    def __init__(self):
+        self.sbp = allSBPFiles0()     # sbp file names and their shortcuts. do not change
+        self.pics = {'tripleLine':tripleLineSBPPicfiles(), 'singleLine':singleLineSBPPicfiles(), 'SDT':SDTSBPPicfiles()}   # pic sbp file names and their shortcuts
+        self.picShortcuts = {}
+        for d in self.pics.values():
+            self.picShortcuts.update(d)
+        self.sbpRe = nameRe(list(self.sbp))
+        self.vidStillRe = nameRe([f'_vid_{st}' for st in allStFiles()])
+        self.vstillRe = re.compile('_vstill_([^_]+)_([^_]+)')
+        self.objects = {'singleDisturb':singleDisturb2FileDict(), 'SDT':SDT2FileDict(), 'tripleLine':tripleLine2FileDict()}  # object names and their sbp file names
+        self.objectRes = {}
+        self.objectKeys = {}
+        for kind,d in self.objects.items():
+            self.objectKeys[kind] = list(d.keys())
+            self.objectRes[kind] = nameRe(list(d.values()), lookahead=True)
+            
+    def isStill(self, file:str) -> bool:
+        '''determine if the file is an unstitched image'''
+        return splitFileName(file)[0] in self.picShortcuts
+    
+    def isVidStill(self, file:str) -> bool:
+        '''determine if the file is a video still'''
+        if not '.png' in file:
+            return False
+        if '_vstill_' in file:
+            return True
+        return self.vidStillRe.search(file) is not None
+    
+    def shortName(self, file:str, kind:str) -> str:
+        '''get the short object name from the sbp file name in the string. kind is SDT, tripleLine, or singleDisturb.
+        if more than one sbp file name is in the string, use the one that comes first in the table'''
+        vals = list(self.objects[kind].values())
+        found = [vals.index(m.group(1)) for m in self.objectRes[kind].finditer(file)]
+        if len(found)==0:
+            raise ValueError(f'Unexpected sbp file name: {file}')
+        return self.objectKeys[kind][min(found)]
+    
+    def shortcut(self, spl0:str) -> str:
+        '''get the shortcut for the sbp name at the start of a file name. empty if it is not an sbp name'''
+        if spl0 in self.sbp:
+            return self.sbp[spl0]
+        return self.picShortcuts.get(spl0, '')
+    
+    def lineTag(self, file:str) -> str:
+        '''get the line tag from a video still name, e.g. l1w1o2. empty if there is none'''
+        m = self.vstillRe.search(os.path.basename(file))
+        if m is None:
+            return ''
+        return m.group(2)
+    
+    def classify(self, file:str) -> Tuple[str, str, str]:
+        '''get the kind of file, the shortcut of its sbp file, and the line tag in one pass. 
+        kind is the printFileDict list the file belongs in: background, still, vcrop, MLsegment2, MLsegment, Usegment, stitch, vstill, or still_unknown, 
+        in the order printFileDict.sortPNG checks them'''
+        bn = os.path.basename(file)
+        spl = splitFileName(file)
+        if 'background' in bn:
+            kind = 'background'
+        elif spl[0] in self.picShortcuts:
+            if 'Basler camera' in bn:
+                kind = 'still'   # raw still
+            elif 'vcrop' in bn:
+                kind = 'vcrop'
+            elif 'MLsegment2' in bn:
+                kind = 'MLsegment2'
+            elif 'MLsegment' in bn:
+                kind = 'MLsegment'
+            elif 'Usegment' in bn:
+                kind = 'Usegment'
+            elif self.isVidStill(file):
+                kind = 'vstill'
+            else:
+                kind = 'still_unknown'
+        elif isStitch(file):
+            kind = 'stitch'
+        elif self.isVidStill(file):
+            kind = 'vstill'
+        else:
+            kind = 'still_unknown'
+        return kind, self.shortcut(spl[0]), self.lineTag(file)
+            
+
+names = fileNameClassifier()   # shared classifier for the whole process
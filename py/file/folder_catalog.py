@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+'''class for keeping a list of the print folders in a top folder on disk, so folders can be found without walking the whole tree'''
+
+# external packages
+import os, sys
+from typing import List, Dict, Tuple, Union, Any, TextIO
+import logging
+import pandas as pd
+
+# local packages
+currentdir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(currentdir)
+sys.path.append(os.path.dirname(currentdir))
+import f_tools as ft
+import file_names as fn
+from tools.plainIm import *
+
+# logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+#----------------------------------------------
+
+class folderCatalog:
+    '''holds every directory that printFolders visits in the top folder, with its modification time and whether it is a print folder.
+    a directory only changes its modification time when its own contents change, so when we refresh the catalog,
+    only directories that changed are listed and checked again. the others are only checked for their modification time.
+    fn is the csv file that stores the catalog. if empty, use printFolderCatalog.csv in the top folder'''
+
+    def __init__(self, topFolder:str, fn:str=''):
+        self.topFolder = topFolder
+        if len(fn)==0:
+            fn = os.path.join(topFolder, 'printFolderCatalog.csv')
+        self.fn = fn
+        self.relisted = 0
+        self.importCatalog()
+
+    def fullPath(self, rel:str) -> str:
+        '''get the full path of a folder from its path relative to the top folder'''
+        if rel=='.':
+            return self.topFolder
+        return os.path.join(self.topFolder, *rel.split('/'))
+
+    def childPath(self, rel:str, name:str) -> str:
+        '''get the relative path of a subfolder'''
+        if rel=='.':
+            return name
+        return f'{rel}/{name}'
+
+    def importCatalog(self) -> None:
+        '''import the catalog from file, if there is one'''
+        self.dirs = {}   # relative path: (modification time in ns, is print folder, list of subfolder names)
+        df,_ = plainIm(self.fn, ic=None)
+        if len(df)==0:
+            return
+        for _,row in df.iterrows():
+            self.dirs[str(row['folder'])] = (int(row['mtime']), bool(row['print']), [])
+        for rel in self.dirs:
+            if not rel=='.':
+                parent = os.path.dirname(rel.replace('/', os.sep)).replace(os.sep, '/')
+                if len(parent)==0:
+                    parent = '.'
+                if parent in self.dirs:
+                    self.dirs[parent][2].append(os.path.basename(rel))
+
+    def exportCatalog(self) -> None:
+        '''export the catalog to file. if the top folder is a print folder, there is nothing worth storing'''
+        if fn.isPrintFolder(self.topFolder):
+            return
+        df = pd.DataFrame([{'folder':rel, 'mtime':mtime, 'print':int(isPrint)} for rel,(mtime,isPrint,_) in self.dirs.items()])
+        plainExp(self.fn, df, {'folder':'', 'mtime':'ns', 'print':''}, index=False, diag=False)
+
+    def visit(self, rel:str, new:dict) -> None:
+        '''check a folder and its subfolders, and add them to the new catalog'''
+        folder = self.fullPath(rel)
+        if rel in self.dirs and self.dirs[rel][1] and fn.isPrintFolderName(folder):
+            # the parent folder still holds this folder, and the name alone makes it a print folder
+            new[rel] = self.dirs[rel]
+            return
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+        except OSError:
+            return
+        if rel in self.dirs and self.dirs[rel][0]==mtime:
+            # nothing was added to or removed from this folder
+            isPrint = self.dirs[rel][1]
+            children = self.dirs[rel][2]
+        else:
+            isPrint = fn.isPrintFolder(folder)
+            children = [] if isPrint else [os.path.basename(d) for d in ft.listDirs(folder)]
+            self.relisted+=1
+        new[rel] = (mtime, isPrint, children)
+        if isPrint:
+            return
+        for c in children:
+            self.visit(self.childPath(rel, c), new)
+
+    def refresh(self, export:bool=True) -> None:
+        '''check the tree for changes and update the catalog'''
+        self.relisted = 0
+        new = {}
+        self.visit('.', new)
+        changed = not (list(new.items())==list(self.dirs.items()))
+        self.dirs = new
+        if changed:
+            logging.info(f'Updated print folder catalog for {self.topFolder}: listed {self.relisted} of {len(new)} folders')
+            if export:
+                self.exportCatalog()
+
+    def folders(self, tags:List[str]=[''], someIn:List[str]=[], refresh:bool=True) -> List[str]:
+        '''get the print folders whose names contain all of the tags and at least one of someIn.
+        refresh=False to use the catalog without checking the disk'''
+        if refresh:
+            self.refresh()
+        out = []
+        for rel,(_,isPrint,_) in self.dirs.items():
+            if isPrint:
+                folder = self.fullPath(rel)
+                if ft.allIn(tags, folder) and ft.anyIn(someIn, folder):
+                    out.append(folder)
+        return out
@@ -20,8 +20,11 @@ sys.path.append(os.path.dirname(currentdir))
 from tools.config import cfg
 from f_tools import *
 from print_folders import *
+from folder_catalog import folderCatalog
 from file_names import *
 from tools.plainIm import *
+from tools.timeCounter import profiler
+from tools.imWriter import writer, combineErrors
 
 # logging
 logger = logging.getLogger(__name__)
@@ -32,7 +35,7 @@ logger.setLevel(logging.DEBUG)
 class folderLoop:
     '''loops a function over all printFolders in the topFolder. 
     the function needs to have only one arg, folder, and all other variables need to go in kwargs
-    folders could be either the top folder to recurse into, or a list of folders
+    folders could be either the top folder to recurse into, a list of folders, or a folderCatalog of the top folder
     func is the function to run on all folders
     mustMatch is a list of strings that must be in the print folder name
     canMatch is a list of strings. If it's not empty, all print folders must have at least one of the strings in the list
@@ -40,16 +43,21 @@ class folderLoop:
     printErrors is true to print error messages from each folder
     folderDiag is the diagnostics printing level to feed into the function we're running on each file
     findFolders is false to use the folder list shown in the config file
+    profile is true to record folder/file/step spans with the shared profiler during run. the table goes in self.profile
     other kwargs get fed into the function to find folders and the function we're applying to each folder
     '''
     
-    def __init__(self, folders:Union[str, list], func, mustMatch:list=[], canMatch:list=[], printTraceback:bool=False, printErrors:bool=True, folderDiag:int=0, findFolders:bool=True, **kwargs):
+    def __init__(self, folders:Union[str, list, folderCatalog], func, mustMatch:list=[], canMatch:list=[], printTraceback:bool=False, printErrors:bool=True, folderDiag:int=0, findFolders:bool=True, profile:bool=False, **kwargs):
         if findFolders:
             if type(folders) is list:
                 # list of specific folders
                 self.folders = []
                 for folder in folders:
                     self.folders = self.folders + printFolders(folder, mustMatch=mustMatch, canMatch=canMatch, **kwargs)
+            elif isinstance(folders, folderCatalog):
+                # catalog of the top folder
+                self.topFolder = folders.topFolder
+                self.folders = printFolders(folders, mustMatch=mustMatch, canMatch=canMatch, **kwargs)
             elif not os.path.exists(folders):
                 self.topFolder = ''
                 self.folders = []
@@ -64,6 +72,7 @@ class folderLoop:
         self.printTraceback = printTraceback
         self.printErrors = printErrors
         self.folderDiag = folderDiag
+        self.profileOn = profile
         
     def runFolder(self, folder:str) -> None:
         '''run the function on one folder'''
@@ -82,23 +91,41 @@ class folderLoop:
 
         if self.folderDiag>0:
             print(folder)
+        writeErrors = []
         try:
-            self.func(folder, **self.kwargs)
+            with profiler.span('folder'):
+                try:
+                    self.func(folder, **self.kwargs)
+                finally:
+                    writeErrors = writer.wait()     # finish writing this folder's images. this does not raise, so it can't replace an error from func
         except KeyboardInterrupt as e:
             raise e
         except Exception as e:
-            self.folderErrorList.append({'folder':folder, 'error':e})
-            if self.printErrors:
-                print(e)
-            if self.printTraceback:
-                traceback.print_exc()
+            self.addError(folder, e)
+        if len(writeErrors)>0:
+            self.addError(folder, combineErrors(writeErrors), showTraceback=False)
+            
+    def addError(self, folder:str, e:Exception, showTraceback:bool=True) -> None:
+        '''record an error in a folder. showTraceback=False for errors that were not just raised'''
+        self.folderErrorList.append({'folder':folder, 'error':e})
+        if self.printErrors:
+            print(e)
+        if self.printTraceback and showTraceback:
+            traceback.print_exc()
 
         
     def run(self) -> list:
         '''apply the function to all folders'''
         self.folderErrorList = []
-        for folder in self.folders:
-            self.runFolder(folder)
+        if self.profileOn:
+            profiler.enable()
+        try:
+            for folder in self.folders:
+                self.runFolder(folder)
+        finally:
+            if self.profileOn:
+                profiler.disable()
+                self.profile = profiler.table()
         return self.folderErrorList
     
     def testFolderError(self, i:int, openFolder:bool=False, **kwargs) -> None:
@@ -123,6 +150,12 @@ class folderLoop:
     def exportErrors(self, fn:str) -> None:
         '''export the error list to file'''
         plainExp(fn, pd.DataFrame(self.folderErrorList), {'folder':'', 'error':''}, index=False)
+        
+    def exportProfile(self, fn:str) -> None:
+        '''export the table of spans from the last profiled run to a .csv or .json file'''
+        if not hasattr(self, 'profile'):
+            raise ValueError('No profile recorded. Run with profile=True')
+        profiler.export(fn)
     
 #----------
 
@@ -145,7 +178,8 @@ class folderFileLoop(folderLoop):
     def runFile(self, file:str, **kwargs) -> None:
         '''run func on a single file'''
         try:
-            self.fileFunc(file, **kwargs)
+            with profiler.span('file'):
+                self.fileFunc(file, **kwargs)
         except KeyboardInterrupt as e:
             raise e
         except Exception as e:
@@ -20,6 +20,8 @@ from tools.config import cfg
 from f_tools import *
 from tools.plainIm import *
 import file_names as fn
+from still_index import stills
+from print_meta import printMeta
 from levels import labelLevels
 
 # logging
@@ -75,6 +77,7 @@ class printFileDict:
         self.phoneCam = []
         self.confocal = []
         self.printType = ''
+        self.metaRec = None
         
     def __getattr__(self, s:str, ext:str='csv') -> str:
         '''get a specific file from the folder that hasn't already been defined'''
@@ -122,7 +125,7 @@ class printFileDict:
             
     def findVids(self):
         '''find the videos'''
-        sbp = fn.allSBPFiles() 
+        sbp = fn.names.sbp
         for f1 in os.listdir(self.printFolder):
             if f1.endswith('.avi'):
                 ffull = os.path.join(self.printFolder, f1)
@@ -130,7 +133,7 @@ class printFileDict:
                 
     def findTime(self):
         '''find the original time files'''
-        sbp = fn.allSBPFiles() 
+        sbp = fn.names.sbp
         for f1 in os.listdir(self.printFolder):
             if f1.endswith('.csv') and ('time' in f1 or 'Fluigent' in f1) and not ('timeRe' in f1):
                 ffull = os.path.join(self.printFolder, f1)
@@ -138,7 +141,7 @@ class printFileDict:
                 
     def findMeta(self):
         '''find the metadata files'''
-        sbp = fn.allSBPFiles() 
+        sbp = fn.names.sbp
         for f1 in os.listdir(self.printFolder):
             if f1.endswith('.csv') and ('meta' in f1 or 'speeds' in f1):
                 ffull = os.path.join(self.printFolder, f1)
@@ -280,7 +283,7 @@ class printFileDict:
         if len(fname)==0:
             fname, ext, spl = self.splitFile(os.path.basename(ffull))
         if len(sbp)==0:
-            sbp = fn.allSBPFiles() 
+            sbp = fn.names.sbp
         if 'Basler camera' in fname and spl[0] in sbp:
             self.vid.append(ffull)
         else:
@@ -322,31 +325,11 @@ class printFileDict:
                 
     def sortPNG(self, ffull:str, fname:str) -> None:
         '''put the png in the right list'''
-        if 'background' in fname:
+        kind = fn.names.classify(ffull)[0]
+        if kind=='background':
             self.background = ffull
-        elif fn.isStill(ffull):
-            if 'Basler camera' in fname:
-                # raw still
-                self.still.append(ffull)
-            elif 'vcrop' in fname:
-                self.vcrop.append(ffull)
-            elif 'MLsegment2' in fname:
-                self.MLsegment2.append(ffull)
-            elif 'MLsegment' in fname:
-                self.MLsegment.append(ffull)
-            elif 'Usegment' in fname:
-                self.Usegment.append(ffull)
-            elif fn.isVidStill(ffull):
-                self.vstill.append(ffull)
-            else: 
-                self.still_unknown.append(ffull)
-        elif fn.isStitch(ffull):
-            # stitched image
-            self.stitch.append(ffull)
-        elif fn.isVidStill(ffull):
-            self.vstill.append(ffull)
         else:
-            self.still_unknown.append(ffull)
+            getattr(self, kind).append(ffull)
             
     def splitFile(self, bn) -> Tuple[str, str, list]:
         '''split the file name into its components'''
@@ -358,7 +341,7 @@ class printFileDict:
         
     def sortFiles(self, folder:str):
         '''sort and label files in the given folder'''
-        sbp = fn.allSBPFiles() 
+        sbp = fn.names.sbp
         for f1 in os.listdir(folder):
             ffull = os.path.join(folder, f1)
             if os.path.isdir(ffull):
@@ -390,11 +373,7 @@ class printFileDict:
         
     def findVstill(self) -> None:
         '''find all of the vstill images'''
-        self.vstill = []
-        for f1 in os.listdir(self.printFolder):
-            if 'vstill' in f1 and 'png' in f1:
-                ffull = os.path.join(self.printFolder, f1)
-                self.vstill.append(ffull)
+        self.vstill = stills.stills(self.printFolder)
                 
     def findStillTag(self, tag:str) -> str:
         '''find a specific vstill with the given tag'''
@@ -544,20 +523,18 @@ class printFileDict:
             
         self.sort()
         
+    def metaRecord(self) -> printMeta:
+        '''get the values in the meta file, reading the file only if it is new or has changed'''
+        file = self.metaFile()
+        if self.metaRec is None or not self.metaRec.current(file):
+            self.metaRec = printMeta(file, date=self.date)
+        return self.metaRec
+    
+    def resetMeta(self) -> None:
+        '''read the meta file again the next time it is needed, e.g. after rewriting it'''
+        self.metaRec = None
+    
     def pxpmm(self):
         '''get pixels per mm'''
-        if len(self.meta)==0:
-            meta = {}
-        else:
-            meta,u = plainImDict(self.metaFile(), unitCol=1, valCol=2)
-        if 'camera_magnification' in meta:
-            cm = float(meta['camera_magnification'])
-        else:
-            cm = 1
-        d = {0.5:71, 1:139}
-        if cm in d:
-            pxpmm = d[cm]
-            return pxpmm
-        else:
-            raise ValueError(f'Unexpected camera magnification in {self.folder}: {cm}')
+        return self.metaRecord().pxpmm()
         
\ No newline at end of file
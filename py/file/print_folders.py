@@ -22,6 +22,7 @@ import f_tools as ft
 import levels as le
 import file_names as fn
 from tools.plainIm import plainIm
+from folder_catalog import folderCatalog
 
 
 # logging
@@ -55,8 +56,8 @@ def getPrintFolder(folder:str, **kwargs) -> str:
     levels = le.labelLevels(folder)
     return levels.printFolder()
  
-def printFolders(topFolder:str, tags:List[str]=[''], someIn:List[str]=[],  **kwargs) -> List[str]:
-    '''Get a list of bottom level print folders in the top folder'''
+def printFolders(topFolder:Union[str, folderCatalog], tags:List[str]=[''], someIn:List[str]=[],  **kwargs) -> List[str]:
+    '''Get a list of bottom level print folders in the top folder. topFolder can also be a folderCatalog, which only lists folders that changed'''
     if 'folderFile' in kwargs:
         fostrlist, _ = plainIm(kwargs['folderFile'])
         if len(fostrlist)>0:
@@ -65,6 +66,8 @@ def printFolders(topFolder:str, tags:List[str]=[''], someIn:List[str]=[],  **kwa
         tags = kwargs['mustMatch']
     if 'canMatch' in kwargs:
         someIn = kwargs['canMatch']
+    if isinstance(topFolder, folderCatalog):
+        return topFolder.folders(tags=tags, someIn=someIn)
     if fn.isPrintFolder(topFolder):
         if ft.allIn(tags, topFolder) and ft.anyIn(someIn, topFolder):
             folders = [topFolder]
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+'''class for holding the values in the meta file of a print folder'''
+
+# external packages
+import os, sys
+from typing import List, Dict, Tuple, Union, Any, TextIO
+import logging
+
+# local packages
+currentdir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(currentdir)
+sys.path.append(os.path.dirname(currentdir))
+from tools.plainIm import *
+
+# logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+#----------------------------------------------
+
+pxpmmDict = {0.5:71, 1:139}   # pixels per mm for each camera magnification
+
+class printMeta:
+    '''values from the meta file of a print folder, read once and shared by everything that needs them.
+    file is the meta file. if empty, there is no meta file and all values take their defaults.
+    values and units hold every row of the file and should not be changed. copy them first'''
+
+    def __init__(self, file:str, date:int=0):
+        self.file = file
+        self.date:int = date
+        if len(file)==0:
+            self.mtime = 0
+            self.values = {}
+            self.units = {}
+        else:
+            self.mtime = os.path.getmtime(file)
+            self.values, self.units = plainImDict(file, unitCol=1, valCol=2)
+        self.camMag:float = self.number('camera_magnification', 1)
+        self.camPosition:str = str(self.values.get('camera_position', ''))
+        self.frameRate:float = self.number('Basler_camera_collection_frame_rate', 120)
+        self.nozzleOuterDiameter:float = self.number('nozzle_outer_diameter', 0.908)
+
+    def number(self, key:str, default:float) -> float:
+        '''get the value as a float, or the default if it is not in the file'''
+        if key in self.values:
+            return float(self.values[key])
+        else:
+            return default
+
+    def current(self, file:str) -> bool:
+        '''check if this record was read from the current version of the file'''
+        if not file==self.file:
+            return False
+        if len(file)==0:
+            return True
+        return os.path.getmtime(file)==self.mtime
+
+    def pxpmm(self) -> int:
+        '''get pixels per mm from the camera magnification'''
+        if self.camMag in pxpmmDict:
+            return pxpmmDict[self.camMag]
+        else:
+            raise ValueError(f'Unexpected camera magnification in {self.file}: {self.camMag}')
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+'''Functions for finding stills in a print folder by tag without sorting the whole folder'''
+
+# external packages
+import os, sys
+from typing import List, Dict, Tuple, Union, Any, TextIO
+import logging
+
+# local packages
+
+
+# logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+#----------------------------------------------
+
+def isVstillName(f:str) -> bool:
+    '''check if the file name is a still taken from a video'''
+    return 'vstill' in f and 'png' in f
+
+class stillIndex:
+    '''remembers the names of the vstills in each print folder, so a still can be found by tag without listing and sorting the folder again.
+    a folder is listed again if its modification time changes'''
+
+    def __init__(self):
+        self.folders = {}   # print folder: (modification time, list of vstill names)
+
+    def names(self, printFolder:str) -> list:
+        '''get the vstill names in the folder, in listing order'''
+        mtime = os.path.getmtime(printFolder)
+        if printFolder in self.folders and self.folders[printFolder][0]==mtime:
+            return self.folders[printFolder][1]
+        names = [f for f in os.listdir(printFolder) if isVstillName(f)]
+        self.folders[printFolder] = (mtime, names)
+        return names
+
+    def stills(self, printFolder:str) -> list:
+        '''get the full paths of the vstills in the folder'''
+        return [os.path.join(printFolder, f) for f in self.names(printFolder)]
+
+    def find(self, printFolder:str, tag:str) -> list:
+        '''get the full paths of the vstills whose names contain the tag'''
+        return [os.path.join(printFolder, f) for f in self.names(printFolder) if tag in f]
+
+
+stills = stillIndex()   # shared index for the whole process
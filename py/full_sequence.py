@@ -16,6 +16,7 @@ import progDim.prog_dim as pg
 import vid.v_tools as vt
 import vid.noz_detect as nt
 import metrics.m_SDT as me
+from tools.timeCounter import profiler
 from m_tools import *
 
 
@@ -36,12 +37,18 @@ class SDTWorkflow:
         
     def run(self, stillsAwayK:dict={}, progDimsK:dict={}, exportStillsK:dict={}, nozzleK:dict={}, backgroundK:dict={}, analyzeK:dict={}, **kwargs):
         '''go through all of the steps to analyze a single print folder'''
-        self.putStillsAway(**stillsAwayK)      # put the original stills in the raw folder
-        self.getProgDims(**progDimsK)          # generate progDims table
-        self.exportStills(**exportStillsK)     # export stills from video
-        self.detectNozzle(**nozzleK)           # detect the nozzle
-        self.exportBackground(**backgroundK)   # export the background
-        self.analyze(**analyzeK)               # segment and measure images, and summarize measurements
+        with profiler.span('putStillsAway'):
+            self.putStillsAway(**stillsAwayK)      # put the original stills in the raw folder
+        with profiler.span('getProgDims'):
+            self.getProgDims(**progDimsK)          # generate progDims table
+        with profiler.span('exportStills'):
+            self.exportStills(**exportStillsK)     # export stills from video
+        with profiler.span('detectNozzle'):
+            self.detectNozzle(**nozzleK)           # detect the nozzle
+        with profiler.span('exportBackground'):
+            self.exportBackground(**backgroundK)   # export the background
+        with profiler.span('analyze'):
+            self.analyze(**analyzeK)               # segment and measure images, and summarize measurements
         
     def putStillsAway(self, **kwargs):
         '''put the shopbot-created stills in a folder'''
@@ -260,4 +267,7 @@ class fullSequencer(fh.folderLoop):
 
     def run(self):
         '''analyze all folders'''
-        super().run()
+        try:
+            super().run()
+        finally:
+            nt.priors.flush()   # export the nozzle positions found in this loop once
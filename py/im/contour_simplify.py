@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+'''Functions for simplifying a contour to a target number of vertices with approxPolyDP'''
+
+# external packages
+import cv2 as cv
+import numpy as np
+import os
+import sys
+import logging
+from typing import List, Dict, Tuple, Union, Any, TextIO, Callable
+
+# local packages
+
+
+# logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+#----------------------------------------------
+
+class contourSimplifier:
+    '''simplifies one closed contour at many epsilons. each simplification is only computed once.
+    the number of vertices usually drops as epsilon increases, but not always, so epsilons are stepped through in order instead of bisected.
+    epsilons past half of the arc length always give 2 or fewer vertices, so the search is bounded'''
+
+    def __init__(self, cnt:np.array):
+        self.cnt = cnt
+        self.perimeter = cv.arcLength(cnt, True)
+        self.polys = {}
+
+    def approx(self, eps:int) -> np.array:
+        '''simplified contour at this epsilon'''
+        if not eps in self.polys:
+            self.polys[eps] = cv.approxPolyDP(self.cnt, eps, True)
+        return self.polys[eps]
+
+    def count(self, eps:int) -> int:
+        '''number of vertices in the simplified contour at this epsilon'''
+        return len(self.approx(eps))
+
+    def firstAtMost(self, start:int, step:int, n:int) -> int:
+        '''smallest epsilon start+k*step, with k>=1, that gives n or fewer vertices'''
+        eps = start+step
+        while self.count(eps)>n:
+            if eps>self.perimeter/2:
+                raise ValueError(f'Could not simplify contour to {n} vertices')
+            eps = eps+step
+        return eps
+
+    def walkDown(self, eps:int, done:Callable) -> Tuple[int, np.array]:
+        '''lower epsilon by 1 until done(simplified contour) is True or epsilon reaches 0'''
+        poly = self.approx(eps)
+        while not done(poly) and eps>0:
+            eps = eps-1
+            poly = self.approx(eps)
+        return eps, poly
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+'''Functions for combining many frames into one image, one frame at a time'''
+
+# external packages
+import numpy as np
+import os
+import sys
+import logging
+from typing import List, Dict, Tuple, Union, Any, TextIO
+
+# local packages
+
+
+# logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+#----------------------------------------------
+
+class frameCombiner:
+    '''combines 8-bit frames one at a time, so memory does not grow with the number of frames.
+    keeps a running sum, max, and min of each pixel.
+    if median, also keeps a histogram of values for each pixel, which uses bins bytes per pixel if maxFrames<256, otherwise 2*bins bytes per pixel.
+    bins=256 gives the same median as np.median. fewer bins use less memory and give the center of the bin that holds the median'''
+
+    def __init__(self, median:bool=True, bins:int=256, maxFrames:int=65535):
+        if bins<1 or bins>256 or not 256%bins==0:
+            raise ValueError(f'bins must divide 256. Given {bins}')
+        self.useMedian = median
+        self.bins = bins
+        self.shift = 8-int(np.log2(bins))     # bits to drop from each value to get the bin
+        self.countType = np.uint8 if maxFrames<256 else np.uint16
+        self.n = 0
+
+    def start(self, frame:np.array) -> None:
+        '''create the running arrays from the first frame'''
+        self.shape = frame.shape
+        self.total = frame.astype(np.uint32)
+        self.maxi = frame.copy()
+        self.mini = frame.copy()
+        if self.useMedian:
+            self.size = frame.size
+            self.pix = np.arange(self.size)
+            self.counts = np.zeros(self.bins*self.size, dtype=self.countType)   # bin-major, so each bin is a contiguous slice
+
+    def add(self, frame:np.array) -> None:
+        '''add a frame to the running values'''
+        if self.n==0:
+            self.start(frame)
+        else:
+            if not frame.shape==self.shape:
+                raise ValueError(f'Frame shape {frame.shape} does not match {self.shape}')
+            self.total += frame
+            np.maximum(self.maxi, frame, out=self.maxi)
+            np.minimum(self.mini, frame, out=self.mini)
+        if self.useMedian:
+            if self.n>=np.iinfo(self.counts.dtype).max:
+                raise ValueError('Too many frames for the median histogram')
+            b = (frame.ravel()>>self.shift).astype(np.intp)
+            self.counts[b*self.size+self.pix] += 1
+        self.n+=1
+
+    def checkFrames(self) -> None:
+        '''make sure we have frames to combine'''
+        if self.n==0:
+            raise ValueError('No frames to combine')
+
+    def mean(self) -> np.array:
+        '''mean frame'''
+        self.checkFrames()
+        return (self.total/self.n).astype(np.uint8)
+
+    def lightest(self) -> np.array:
+        '''maximum of each pixel'''
+        self.checkFrames()
+        return self.maxi.copy()
+
+    def darkest(self) -> np.array:
+        '''minimum of each pixel'''
+        self.checkFrames()
+        return self.mini.copy()
+
+    def binValue(self, b:np.array) -> np.array:
+        '''value at the center of each bin'''
+        w = 256//self.bins
+        return b*w+(w-1)/2
+
+    def median(self) -> np.array:
+        '''median of each pixel. if there are an even number of frames, the mean of the two middle values'''
+        self.checkFrames()
+        if not self.useMedian:
+            raise ValueError('Median was not collected')
+        klo = (self.n-1)//2      # rank of the lower middle value
+        khi = self.n//2          # rank of the upper middle value
+        cum = np.zeros(self.size, dtype=np.uint32)
+        lo = np.full(self.size, -1)
+        hi = np.full(self.size, -1)
+        for b in range(self.bins):
+            cum += self.counts[b*self.size:(b+1)*self.size]
+            lo[(lo<0)&(cum>klo)] = b
+            hi[(hi<0)&(cum>khi)] = b
+            if hi.min()>=0:
+                break
+        out = (self.binValue(lo)+self.binValue(hi))/2
+        return out.reshape(self.shape).astype(np.uint8)
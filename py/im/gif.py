@@ -4,6 +4,8 @@
 # external packages
 import os, sys
 import imageio
+import numpy as np
+import cv2 as cv
 from typing import List, Dict, Tuple, Union, Any, TextIO
 import logging
 
@@ -22,31 +24,87 @@ for s in ['matplotlib', 'imageio', 'IPython', 'PIL']:
 
 #----------------------------------------------
 
+class gifStreamer:
+    '''streams frames into a gif file. frames are cropped, converted with the cv color conversion code colorCode, and shrunk by sizeCompression.
+    the gif writer holds onto every frame until it closes, so only the intermediate color buffer is reused between frames'''
+    
+    def __init__(self, newName:str, fps:float, colorCode:int=-1, crop:dict={}, sizeCompression:int=1):
+        self.newName = newName
+        self.colorCode = colorCode
+        self.crop = crop
+        self.sizeCompression = sizeCompression
+        self.colorBuffer = None
+        self.size = None
+        self.frames = 0
+        self.writer = imageio.get_writer(newName, fps=fps)
+        
+    def cropFrame(self, frame:np.array) -> np.array:
+        '''crop the frame, without copying it'''
+        crop = self.crop
+        if 'y0' in crop and 'yf' in crop and 'x0' in crop and 'xf' in crop:
+            return frame[crop['y0']:crop['yf'], crop['x0']:crop['xf']]
+        return frame
+        
+    def convertColor(self, frame:np.array, reuse:bool) -> np.array:
+        '''convert the color of the frame. reuse=True to write into the color buffer'''
+        if self.colorCode<0:
+            return frame
+        if not reuse:
+            return cv.cvtColor(frame, self.colorCode)
+        if self.colorBuffer is None:
+            self.colorBuffer = cv.cvtColor(frame, self.colorCode)
+        else:
+            cv.cvtColor(frame, self.colorCode, dst=self.colorBuffer)
+        return self.colorBuffer
+    
+    def resize(self, frame:np.array) -> np.array:
+        '''shrink the frame'''
+        if self.size is None:
+            h = int(frame.shape[0]/self.sizeCompression)
+            w = int(frame.shape[1]/self.sizeCompression)
+            self.size = (w,h)
+        return cv.resize(frame, self.size, interpolation = cv.INTER_AREA)
+        
+    def append(self, frame:np.array) -> None:
+        '''add a frame to the gif. the frame may be a buffer that the caller reuses'''
+        frame = self.cropFrame(frame)
+        if self.sizeCompression==1:
+            if self.colorCode<0:
+                frame = frame.copy()
+            else:
+                frame = self.convertColor(frame, False)
+        else:
+            frame = self.resize(self.convertColor(frame, True))
+        self.writer.append_data(frame)
+        self.frames+=1
+        
+    def close(self) -> None:
+        '''finish writing the gif'''
+        self.writer.close()
+        file_stats = os.stat(self.newName)
+        logging.info(f'Exported {self.newName}: {self.frames} frames, {file_stats.st_size / (1024 * 1024)} MB')
+        
+        
 def convertToFastGif(vid:str, factor:int=1, speedup:float=1, tstart:float=0, tend:float=-1):
-    '''convert the mp4 to a fast gif, reducing frames by a factor of int'''
+    '''convert the mp4 to a fast gif, reducing frames by a factor of int. the video is decoded once, from tstart to tend in seconds'''
     video = imageio.get_reader(vid,  'ffmpeg')
     newName = vid.replace('.mp4', '_fast.gif')
     if os.path.exists(newName):
         os.remove(newName)
     dat = video.get_meta_data()
     fps = int(dat['fps'])
-    result = imageio.get_writer(newName, fps=int((fps/factor)*speedup))
+    result = gifStreamer(newName, int((fps/factor)*speedup))
     skip = factor
-    i = 0
-    for num , im in enumerate(video):
-        frame = video.get_data(num)
+    for num, frame in enumerate(video):
+        if num<tstart*dat['fps']:
+            continue
+        if tend>=0 and num>tend*dat['fps']:
+            break
         skip = skip-1
         if skip==0:
-            # Write the frame into the
-            # file 'filename.avi'
-            result.append_data(frame)
+            result.append(frame)
             skip = factor
 
-      # When everything done, release 
-    # the video capture and video 
-    # write objects
     video.close()
     result.close()
-
-    logging.info(f'Exported {newName}')
     return
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+'''Functions for storing binary segmentation masks as run-length encoded files next to the png'''
+
+# external packages
+import cv2 as cv
+import numpy as np
+import os
+import sys
+import logging
+from typing import List, Dict, Tuple, Union, Any, TextIO
+
+# local packages
+
+
+# logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+#----------------------------------------------
+
+segmentFolders = ['Usegment', 'MLsegment', 'MLsegment2']   # subfolders that hold binary masks
+
+def rleEncode(mask:np.array) -> np.array:
+    '''get the lengths of alternating runs of 0 and nonzero pixels in the flattened mask, starting with a run of 0'''
+    flat = mask.ravel()!=0
+    edges = np.flatnonzero(flat[1:]!=flat[:-1])+1
+    bounds = np.concatenate([[0], edges, [flat.size]])
+    runs = np.diff(bounds)
+    if flat.size>0 and flat[0]:
+        runs = np.concatenate([[0], runs])   # the first run is always 0
+    return runs.astype(np.uint32)
+
+def rleDecode(runs:np.array, shape:tuple, val:int=255) -> np.array:
+    '''convert run lengths back into a mask of 0 and val'''
+    vals = np.zeros(len(runs), dtype=np.uint8)
+    vals[1::2] = val
+    return np.repeat(vals, runs).reshape(shape)
+
+def rleFN(file:str) -> str:
+    '''get the name of the run-length file that goes with the png'''
+    return os.path.splitext(file)[0]+'.rle'
+
+def exportRLE(file:str, mask:np.array) -> bool:
+    '''export a run-length file for the png file name.
+    the file is a header of height, width, and foreground value, followed by the run lengths, all as uint32.
+    only masks with one foreground value can be stored, so return False and remove any old file if the mask is not binary'''
+    fn = rleFN(file)
+    vals = np.unique(mask)
+    if len(mask.shape)>2 or len(vals)>2 or (len(vals)==2 and not vals[0]==0):
+        if os.path.exists(fn):
+            os.remove(fn)
+        return False
+    val = vals[-1] if (len(vals)>0 and vals[-1]>0) else 255
+    header = np.array([mask.shape[0], mask.shape[1], val], dtype=np.uint32)
+    np.concatenate([header, rleEncode(mask)]).tofile(fn)
+    return True
+
+def importRLE(fn:str) -> np.array:
+    '''import a mask from a run-length file'''
+    arr = np.fromfile(fn, dtype=np.uint32)
+    h, w, val = arr[:3]
+    runs = arr[3:]
+    if not runs.sum()==h*w:
+        raise ValueError(f'{fn}: run lengths do not match the mask size')
+    return rleDecode(runs, (int(h), int(w)), int(val))
+
+def rleCurrent(file:str) -> bool:
+    '''check if there is a run-length file that is at least as new as the png,
+    so masks that were edited by hand are read from the png'''
+    fn = rleFN(file)
+    if not os.path.exists(fn):
+        return False
+    if not os.path.exists(file):
+        return True
+    return os.path.getmtime(fn)>=os.path.getmtime(file)
+
+def importMask(file:str, cache:bool=True) -> np.array:
+    '''import a binary mask for the png file name, from the run-length file if it is current.
+    if cache, write a run-length file when the mask had to be read from the png'''
+    if rleCurrent(file):
+        return importRLE(rleFN(file))
+    mask = cv.imread(file, cv.IMREAD_GRAYSCALE)
+    if mask is None:
+        raise ValueError(f'Could not read {file}')
+    if cache:
+        exportRLE(file, mask)
+    return mask
+
+def exportMask(file:str, mask:np.array, png:bool=True) -> bool:
+    '''export the mask as a run-length file, and as a png for viewing if png. returns True if the png was written or not requested'''
+    out = True
+    if png:
+        out = cv.imwrite(file, mask)
+    exportRLE(file, mask)   # written after the png, so it is at least as new as the png
+    return out
+
+def encodeFolder(folder:str, overwrite:bool=False) -> int:
+    '''write run-length files for all of the segmentation pngs in a print folder. returns the number of files written'''
+    ct = 0
+    for sub in segmentFolders:
+        subfolder = os.path.join(folder, sub)
+        if not os.path.exists(subfolder):
+            continue
+        for f in os.listdir(subfolder):
+            if not f.endswith('.png'):
+                continue
+            file = os.path.join(subfolder, f)
+            if overwrite or not rleCurrent(file):
+                mask = cv.imread(file, cv.IMREAD_GRAYSCALE)
+                if mask is not None and exportRLE(file, mask):
+                    ct+=1
+    return ct
@@ -84,6 +84,9 @@ class segmenter(timeObject):
         
         
     def __getattr__(self, s):
+        if s=='sdf':
+            # not labeled yet. raise so hasattr checks for nd and crops work before makeDF
+            raise AttributeError(s)
         return getattr(self.sdf, s)
             
     def makeDF(self):
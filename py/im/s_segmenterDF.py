@@ -43,7 +43,10 @@ class segmenterFail:
 class segmenterDF(timeObject):
     '''holds labeled components for an image'''
     
+    checkpointVars = ['labeledIm', 'df', 'labelsBW', 'numComponents', 'success', 'trustLargest']   # state that component filters change
+    
     def __init__(self, filled:np.array, acrit:float=100, diag:int=0, **kwargs):
+        self.shared = set()   # arrays that are shared with a checkpoint, so they must be copied before they are changed in place
         self.acrit = acrit
         self.filled = filled
         self.trustLargest = 0
@@ -76,6 +79,24 @@ class segmenterDF(timeObject):
         imshow(self.imML, self.imU, self.dif, imdiag, titles=['ML', 'Unsupervised', 'Difference'])
         return
     
+    def checkpoint(self) -> dict:
+        '''save the state of the components, so filters can be rolled back with restore(). 
+        only the label image and component table are saved, and they are not copied until a filter changes them'''
+        self.shared = set(['labeledIm', 'df'])
+        return {s:getattr(self, s) for s in self.checkpointVars if s in self.__dict__}
+    
+    def restore(self, cp:dict) -> None:
+        '''roll back the components to a checkpoint'''
+        for s,val in cp.items():
+            setattr(self, s, val)
+        self.shared = set(['labeledIm', 'df'])   # the checkpoint can be restored again
+        
+    def own(self, s:str) -> None:
+        '''copy an array that is shared with a checkpoint before changing it in place'''
+        if s in self.shared:
+            setattr(self, s, getattr(self, s).copy())
+            self.shared.discard(s)
+    
     def getDataFrame(self):
         '''convert the labeled segments to a dataframe'''
         df = pd.DataFrame(self.stats, columns=['x0', 'y0', 'w', 'h','a'])
@@ -102,6 +123,7 @@ class segmenterDF(timeObject):
     def resetNumbering(self):
         '''reset the numbering of the components so the labeledIm is easier to read'''
         j = 1
+        self.own('labeledIm')
         for i,row in self.df[(self.df.w<self.w)&(self.df.h<self.h)].iterrows():
             self.labeledIm[self.labeledIm == i] = j
             self.df = self.df.rename(index={i:j})
@@ -176,6 +198,7 @@ class segmenterDF(timeObject):
         for i in list(self.df[~goodpts].index):
             if not checks or not i==mc:
                 # remove this object
+                self.own('labeledIm')
                 self.labeledIm[self.labeledIm==i] = 0
             else:
                 # add this point back in
@@ -300,6 +323,7 @@ class segmenterDF(timeObject):
         '''if the largest object is smooth, remove anything with high roughness'''
         if self.numComponents<=1:
             return
+        self.own('df')
         for i in self.df.index:
             mask = (self.labeledIm == i).astype("uint8") * 255 
             if np.max(mask)==255:
@@ -39,7 +39,8 @@ pd.set_option('display.max_rows', 500)
 
 
 class cropLocs:
-    '''a class for holding the locations of cropped images. this is useful for making sure that all cropped images are cropped to the same region'''
+    '''a class for holding the locations of cropped images. this is useful for making sure that all cropped images are cropped to the same region.
+    crops are looked up through a dictionary keyed by file name. changes are held in memory until commit or export'''
     
     def __init__(self, folder:str, overwrite:bool=False, **kwargs):
         self.folder = folder
@@ -57,20 +58,35 @@ class cropLocs:
         self.units = {'vstill':'', 'x0':'px', 'xf':'px', 'y0':'px', 'yf':'px'}
         self.df0 = self.df.copy()
         self.changed = False
+        self.buildIndex()
         
     def initializeDF(self):
         if len(self.pfd.vstill)==0:
             self.pfd.findVstill()
         self.df = pd.DataFrame({'vstill':[os.path.basename(f) for f in self.pfd.vstill]})
+        
+    def buildIndex(self):
+        '''build a dictionary of crop values keyed by file name'''
+        self.index = {}
+        self.positions = {}
+        for i,row in enumerate(self.df.to_dict('records')):
+            bn = row.pop('vstill')
+            if not bn in self.index:
+                self.index[bn] = row
+                self.positions[bn] = i
+        self.pending = set()    # file names whose crops have changed since the last commit
+        
+    def indexRow(self, file:str) -> dict:
+        '''get the row of crop values for this file'''
+        bn = os.path.basename(file)
+        if not bn in self.index:
+            raise ValueError(f'Cannot find {file} in cropLocs')
+        return self.index[bn]
             
     def getCrop(self, file:str) -> dict:
         '''get the crop dimensions from the file'''
-        row = self.df[self.df.vstill==os.path.basename(file)]
-        if len(row)==0:
-            raise ValueError(f'Cannot find {file} in cropLocs')
-        d = dict(row.iloc[0])
-        d.pop('vstill')
-        for key,val in d.items():
+        d = {}
+        for key,val in self.indexRow(file).items():
             if pd.isna(val):
                 return {}
             else:
@@ -86,18 +102,31 @@ class cropLocs:
         return True
     
     def changeCrop(self, file:str, crop:dict) -> None:
-        '''change the value of the crop in the table'''
-        row = self.df[self.df.vstill==os.path.basename(file)]
-        if len(row)==0:
-            raise ValueError(f'Cannot find {file} in cropLocs')
-        i = (row.iloc[0]).name
+        '''change the value of the crop in the index. the table is updated on commit'''
+        row = self.indexRow(file)
         for key,val in crop.items():
-            if not self.changed and (not key in self.df or pd.isna(self.df.loc[i,key]) or not self.df.loc[i,key]==val):
+            if not self.changed and (not key in row or pd.isna(row[key]) or not row[key]==val):
                 self.changed = True
-            self.df.loc[i,key] = val
+            row[key] = val
+        self.pending.add(os.path.basename(file))
+        
+    def commit(self) -> None:
+        '''write all pending changes into the table'''
+        if len(self.pending)==0:
+            return
+        files = list(self.pending)
+        new = pd.DataFrame([self.index[bn] for bn in files])
+        for col in new.columns:
+            if not col in self.df:
+                self.df[col] = np.nan
+        rows = [self.positions[bn] for bn in files]
+        cols = [self.df.columns.get_loc(col) for col in new.columns]
+        self.df.iloc[rows, cols] = new.values
+        self.pending = set()
             
     def export(self, overwrite:bool=False, diag:bool=True):
-        '''export the values to file'''
+        '''commit changes and export the values to file'''
+        self.commit()
         if not self.changed and os.path.exists(self.fn) and not overwrite:
             return
         plainExp(self.fn, self.df, self.units, diag=diag)
@@ -25,8 +25,11 @@ import im.crop as vc
 from im.segment import *
 from im.imshow import imshow
 import im.contour as co
+import im.mask_store as ms
+import im.contour_simplify as cs
 from tools.plainIm import *
 from tools.timeCounter import *
+from tools.imWriter import writer
 from tools.config import cfg
 from val.v_print import printVals
 from progDim.prog_dim import getProgDims, getProgDimsPV
@@ -50,22 +53,24 @@ pd.set_option('display.max_rows', 500)
 #----------------------------------------------
     
 def fileMetricFromTag(func, folder:str, tag:str, **kwargs):
-    '''get the filehorizSDT from a string that is in the file name'''
-    pfd = fh.printFileDict(folder)
-    pfd.findVstill()
-    i = 0
-    while i<len(pfd.vstill):
-        if tag in os.path.basename(pfd.vstill[i]):
-            fhs = func(pfd.vstill[i], **kwargs)
-            if len(tag)==6:
-                return fhs
-        i = i+1
-    return fhs   
+    '''get the filehorizSDT from a string that is in the file name. 
+    if the tag is 6 characters, use the first match, otherwise use the last match'''
+    if fh.isPrintFolder(folder):
+        printFolder = folder
+    else:
+        printFolder = fh.printFileDict(folder).printFolder
+    files = fh.stills.find(printFolder, tag)
+    if len(files)==0:
+        raise UnboundLocalError(f'No vstill with tag {tag} in {folder}')
+    if len(tag)==6:
+        return func(files[0], **kwargs)
+    return func(files[-1], **kwargs)
 
 class fileMetric(timeObject):
     '''collects data about fluid segments in an image'''
     
-    def __init__(self, file:str, diag:int=0, acrit:int=2500, exportDiag:int=2, normalize:bool=True, **kwargs):
+    def __init__(self, file:str, diag:int=0, acrit:int=2500, exportDiag:int=2, normalize:bool=True, maskStore:bool=False, **kwargs):
+        '''maskStore=True to also read and write segmentation masks as run-length files, which are faster to import than pngs'''
         self.file = file
         self.folder = os.path.dirname(self.file)
         if not os.path.exists(self.file):
@@ -74,6 +79,7 @@ class fileMetric(timeObject):
         self.diag = diag
         self.exportDiag = exportDiag
         self.normalize = normalize
+        self.maskStore = maskStore
         self.hasIm = False
         self.stats = {'line':'', 'usedML':False}
         self.units = {'line':'', 'usedML':''}
@@ -176,8 +182,9 @@ class fileMetric(timeObject):
         self.crop = self.cl.getCrop(self.file)
                 
     def getCropLocs(self):
-        '''get the crop locations'''
+        '''get the crop locations. if the crop locations were passed in by a folder loop, the folder loop exports them'''
         self.cl = cropLocs(self.folder, pfd=self.pfd)
+        self.ownCropLocs = True
         
     def exportCropDims(self, **kwargs):
         '''calculate crop dimensions and export'''
@@ -193,7 +200,7 @@ class fileMetric(timeObject):
             self.crop = vc.relativeCrop(self.pg, self.nd, self.tag, rc)  # get crop position based on the actual line position
             self.crop = vc.convertCropHW(h,w, self.crop)    # make sure everything is in bounds
             self.cl.changeCrop(self.file, self.crop)
-            if export:
+            if export and getattr(self, 'ownCropLocs', False):
                 self.cl.export()
                 
     #------------------------------
@@ -213,14 +220,13 @@ class fileMetric(timeObject):
         fnorig = self.subFN(subFolder, title)
         if not os.path.exists(fnorig) or overwrite:
             im = getattr(self, att)
-            out = cv.imwrite(fnorig, im)
+            # written on the shared writer thread. failures are raised when the writer is flushed
+            if self.maskStore and subFolder in ms.segmentFolders:
+                writer.submit(fnorig, ms.exportMask, fnorig, im.copy())
+            else:
+                writer.write(fnorig, im)
             if diag>1 and self.exportDiag>1:
-                if out:
-                    logging.info(f'Exported {os.path.basename(fnorig)}')
-                else:
-                    folderExists = os.path.exists(os.path.dirname(fnorig))
-                    writePermission = os.access(os.path.dirname(fnorig), os.W_OK)
-                    logging.info(f'Failed to export {fnorig}. Folder exists: {folderExists}. Write permission: {writePermission}. Name length: {len(fnorig)}')
+                logging.info(f'Exported {os.path.basename(fnorig)}')
                     
             
     def generateIm0(self):
@@ -278,18 +284,25 @@ class fileMetric(timeObject):
     def importUsegment(self):
         '''import the image segmented using the unsupervised model'''
         s = self.segmentFN()
-        if os.path.exists(s):
-            self.Usegment = cv.imread(s, cv.IMREAD_GRAYSCALE)
+        if os.path.exists(s) or (self.maskStore and ms.rleCurrent(s)):
+            self.Usegment = self.importMask(s)
             h,w = self.Usegment.shape
             if not h==self.crop['yf']-self.crop['y0'] or not w==self.crop['xf']-self.crop['x0']:
                 raise ValueError(f'{self.file}: Usegment is wrong shape')
             self.importedImages = True
             
+    def importMask(self, fn:str) -> np.array:
+        '''import a segmentation mask, from the run-length file if using the mask store'''
+        if self.maskStore:
+            return ms.importMask(fn)
+        else:
+            return cv.imread(fn, cv.IMREAD_GRAYSCALE)
+        
     def importMLsegment(self):
         '''import the image segmented using the ML model'''
         m = self.MLFN()
-        if os.path.exists(m):
-            self.MLsegment = cv.imread(m, cv.IMREAD_GRAYSCALE)
+        if os.path.exists(m) or (self.maskStore and ms.rleCurrent(m)):
+            self.MLsegment = self.importMask(m)
             h,w = self.MLsegment.shape
             if not h==self.crop['yf']-self.crop['y0'] or not w==self.crop['xf']-self.crop['x0']:
                 raise ValueError(f'{self.file}: MLsegment is wrong shape')
@@ -335,6 +348,7 @@ class fileMetric(timeObject):
         else:
             self.MLsegment = np.zeros((self.crop['yf']-self.crop['y0'], self.crop['xf']-self.crop['x0']), np.uint8)
         self.exportImage('MLsegment', 'MLsegment', 'MLsegment', overwrite=True)
+        writer.flush()    # this is called outside of a folder loop, so make sure the files are written now
         
     def acceptML(self):
         '''overwrite the Usegment file with the ML segmentation'''
@@ -344,6 +358,7 @@ class fileMetric(timeObject):
             return
         self.Usegment = self.MLsegment
         self.exportImage('Usegment', 'Usegment', 'Usegment', overwrite=True)
+        writer.flush()
       
     #------------------------------
 
@@ -536,24 +551,31 @@ class fileMetric(timeObject):
             ru = len(right.y.unique())
         return lu, ru
     
+    def ldiffReady(self, poly:np.array, horiz:bool) -> bool:
+        '''check if the simplified convex hull has 4 vertices and 2 points on each edge'''
+        if len(poly)<4:
+            return False
+        self.hull2 = poly
+        self.ldiffPoints = self.getLDiffPoints(horiz)
+        lu, ru = self.getLURU(*self.ldiffPoints, horiz)
+        return lu>=2 and ru>=2
+    
     def getLDiff(self, horiz:bool=False) -> float:
         '''get the difference in length between 
         the left and right lines if not horiz, 
         or the top and bottom lines if horiz'''
         
-        # smooth the hull until it is a quadrilateral
-        self.hull2 = [0,0,0,0,0]
-        ii = 30
-        while len(self.hull2)>4:
-            ii = ii+5
-            self.hull2 = cv.approxPolyDP(self.hull, ii, True)
-        left,right = self.getLDiffPoints(horiz)
-        lu, ru = self.getLURU(left, right, horiz)
-        while (len(self.hull2)<4 or lu<2 or ru<2) and ii>0:
-            ii = ii-1
-            self.hull2 = cv.approxPolyDP(self.hull, ii, True)
-            left,right = self.getLDiffPoints(horiz)
-            lu, ru = self.getLURU(left, right, horiz)
+        # smooth the hull until it is a quadrilateral: find the first epsilon in 35, 40, 45... with 4 or fewer vertices, 
+        # then lower epsilon by 1 until there are 4 vertices and both edges have 2 points
+        simp = cs.contourSimplifier(self.hull)
+        ii = simp.firstAtMost(30, 5, 4)
+        self.hull2 = None
+        ii, hull2 = simp.walkDown(ii, lambda poly:self.ldiffReady(poly, horiz))
+        if not hull2 is self.hull2:
+            # the last simplification was not checked
+            self.hull2 = hull2
+            self.ldiffPoints = self.getLDiffPoints(horiz)
+        left,right = self.ldiffPoints
 
         if horiz:
             wbottom = left.x.max()-left.x.min()
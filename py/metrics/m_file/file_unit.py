@@ -7,13 +7,18 @@ import traceback
 import logging
 import pandas as pd
 from matplotlib import pyplot as plt
-from typing import List, Dict, Tuple, Union, Any, TextIO
+from typing import List, Dict, Tuple, Union, Any, TextIO, Callable
 import re
 import numpy as np
 import cv2 as cv
 import shutil
 import subprocess
 import time
+import json
+import hashlib
+import types
+import unittest
+from concurrent.futures import ProcessPoolExecutor
 
 # local packages
 currentdir = os.path.dirname(os.path.realpath(__file__))
@@ -71,6 +76,59 @@ def addToTestFile(csv:str, fstr:str, fistr:str, func, slist:list, diag:int=4, **
             df = pd.concat([df, pd.DataFrame([l])])
     plainExp(csv, df, {}, index=False)
     
+def sourceVersion() -> str:
+    '''hash of the source of every loaded module in this repository, so cached results are thrown out when the measurement code changes'''
+    pydir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+    files = set()
+    for m in list(sys.modules.values()):
+        f = getattr(m, '__file__', None)
+        if type(f) is str and f.endswith('.py') and os.path.realpath(f).startswith(pydir):
+            files.add(os.path.realpath(f))
+    h = hashlib.sha1()
+    for f in sorted(files):
+        h.update(os.path.relpath(f, pydir).replace('\\', '/').encode())
+        with open(f, 'rb') as fi:
+            h.update(fi.read())
+    return h.hexdigest()
+
+def fileHash(file:str) -> str:
+    '''hash of the contents of the file. empty if the file does not exist'''
+    if not os.path.exists(file):
+        return ''
+    with open(file, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def jsonValue(v:Any) -> Any:
+    '''convert a measured value to something that can be stored in json'''
+    if isinstance(v, (bool, np.bool_)):
+        return bool(v)
+    if isinstance(v, (int, float, np.number)):
+        return float(v)
+    return str(v)
+
+def evalFile(func, file:str, kwargs:dict) -> dict:
+    '''measure a single file. returns a dictionary holding either the values or the error. this runs on worker processes'''
+    try:
+        d,u = func(file, diag=0, **kwargs).values()
+    except Exception as e:
+        return {'error':f'{type(e).__name__}: {e}'}
+    return {'values':{key:jsonValue(val) for key,val in d.items()}}
+
+def storedSetUp(results:dict) -> Callable:
+    '''get a setUp for a test case that takes the measurements for row self.test from results instead of measuring the file. 
+    a row that raised an error raises it again, as it would in setUp'''
+    def setUp(self):
+        r = results[self.test]
+        if 'error' in r:
+            raise ValueError(r['error'])
+        self.me = r['values']
+        self.units = {}
+    return setUp
+
+def failedIndices(result:unittest.TestResult) -> list:
+    '''get the indices of the files that failed from the result of a test module'''
+    return [int(re.split(': ', str(s))[-1][:-4]) for s in result.failures]
+    
 def testCSV(fn:str) -> str:
     '''get the path of the CSV for this unit test'''
     cdir = os.path.dirname(os.path.abspath(os.path.join('..')))
@@ -85,15 +143,78 @@ class unitTester:
         self.testcsv = testCSV(fn)
         self.testpy = f'test_{fn}'   # the python file for the test
         self.func = func
+        self.cachefile = os.path.join(os.path.dirname(self.testcsv), 'cache', f'test_{fn}.json')   # results from previous runs
         
     def run(self):
         '''test all files'''
-        currentdir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
-        sys.path.append(os.path.join(os.path.dirname(os.path.dirname(currentdir)), 'tests'))
-        tp = __import__(self.testpy)
+        tp = self.testModule()
         runner = tp.unittest.TextTestRunner()
         result = runner.run(tp.suite())
-        self.failedFiles = [int(re.split(': ', str(s))[-1][:-4]) for s in result.failures]  # indices of failed files
+        self.failedFiles = failedIndices(result)  # indices of failed files
+        
+    def testModule(self):
+        '''import the python file for the test, which holds the suite and the rules for comparing values'''
+        currentdir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+        sys.path.append(os.path.join(os.path.dirname(os.path.dirname(currentdir)), 'tests'))
+        return __import__(self.testpy)
+        
+    def rowKey(self, i:int, version:str, **kwargs) -> str:
+        '''key for the cached result of row i: the image name and contents, the measurement code, and the arguments'''
+        rel = os.path.join(self.testList.loc[i,'folder'], self.testList.loc[i,'file'])
+        file = os.path.join(cfg.path.server, rel)
+        s = ';'.join([rel, fileHash(file), version, self.func.__name__, str(sorted(kwargs.items()))])
+        return hashlib.sha1(s.encode()).hexdigest()
+    
+    def importCache(self) -> dict:
+        '''import results from previous runs'''
+        if not os.path.exists(self.cachefile):
+            return {}
+        with open(self.cachefile, 'r') as f:
+            return json.load(f)
+        
+    def exportCache(self, cache:dict) -> None:
+        '''export results so the next run can skip unchanged rows'''
+        if not os.path.exists(os.path.dirname(self.cachefile)):
+            os.mkdir(os.path.dirname(self.cachefile))
+        with open(self.cachefile, 'w') as f:
+            json.dump(cache, f)
+        
+    def runParallel(self, workers:int=0, cache:bool=True, **kwargs) -> None:
+        '''measure all files on worker processes and compare them to the expected values. 
+        workers is the number of processes. if 0, use one per cpu. 
+        if cache, only measure rows whose image, measurement code, or arguments changed since the last run. 
+        the values are compared by the suite in the test module, so files pass or fail the same way as in run()'''
+        self.importList()
+        version = sourceVersion()
+        keys = {i:self.rowKey(i, version, **kwargs) for i in self.testList.index}
+        old = self.importCache() if cache else {}
+        todo = [i for i in self.testList.index if not keys[i] in old]
+        files = [os.path.join(cfg.path.server, self.testList.loc[i,'folder'], self.testList.loc[i,'file']) for i in todo]
+        if workers==0:
+            workers = os.cpu_count()
+        if workers>1 and len(todo)>1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as ex:
+                out = list(ex.map(evalFile, [self.func]*len(todo), files, [kwargs]*len(todo)))
+        else:
+            out = [evalFile(self.func, file, kwargs) for file in files]
+        new = {keys[i]:r for i,r in zip(todo, out)}
+        self.results = {i:(new[keys[i]] if keys[i] in new else old[keys[i]]) for i in self.testList.index}
+        if cache:
+            self.exportCache({keys[i]:self.results[i] for i in self.testList.index})
+        
+        # compare the stored values using the test module's own checks
+        tp = self.testModule()
+        suite = tp.suite()
+        setUp = storedSetUp(self.results)
+        for t in suite:
+            t.setUp = types.MethodType(setUp, t)
+        result = tp.unittest.TextTestRunner().run(suite)
+        self.failedFiles = failedIndices(result)
+        logging.info(f'{self.testpy}: measured {len(todo)} files, reused {len(self.results)-len(todo)}, {len(self.failedFiles)} failed')
+        
+    def valueCols(self) -> list:
+        '''columns in the test list that hold expected values'''
+        return [c for c in self.testList.keys() if not c in ['folder', 'file']]
         
     def importList(self):
         '''import the list of files to test'''
@@ -153,8 +274,12 @@ class unitTester:
         logging.info(f'Exported {self.testcsv}')
         
     def keepTest(self, i:int, export:bool=True) -> None:
-        '''overwrite the value in the csv file with the current values'''
-        row, d, cols = self.runTest(i, diag=1)
+        '''overwrite the value in the csv file with the current values. uses the values from runParallel if there are any'''
+        if hasattr(self, 'results') and i in self.results and 'values' in self.results[i]:
+            d = self.results[i]['values']
+            cols = self.valueCols()
+        else:
+            row, d, cols = self.runTest(i, diag=1)
         for c in cols:
             if c in d:
                 self.testList.loc[i, c] = d[c]
@@ -13,7 +13,6 @@ import numpy as np
 import cv2 as cv
 import shutil
 import subprocess
-import copy
 
 # local packages
 currentdir = os.path.dirname(os.path.realpath(__file__))
@@ -53,13 +52,13 @@ class fileXS(fileMetric):
             dycrit = h/2
         if len(self.segmenter.df)>1:
             secondLargest = 2*list(self.segmenter.df.a.nlargest(2))[1]
-        seg1 = copy.deepcopy(self.segmenter)    # make a copy of the segmenter in case we need to roll back changes  
+        cp = self.segmenter.checkpoint()    # save the components in case we need to roll back changes  
         self.segmenter.eraseBorderComponents(10)  # remove anything too close to the border
         goodpts = (abs(self.segmenter.df.xc-xest)<100)&(abs(self.segmenter.df.yc-yest)<dycrit)
         self.segmenter.selectComponents(goodpts)
             # filter by location relative to expectation and area
         if not self.segmenter.success:
-            self.segmenter = seg1
+            self.segmenter.restore(cp)
             self.segmenter.selectComponents(self.segmenter.df.a>1000)   # just filter by area
         if len(self.segmenter.df)>1 and self.segmenter.df.a.max() < secondLargest:
             # largest object not much larger than 2nd largest
@@ -28,6 +28,7 @@ from progDim.prog_dim import getProgDims, getProgDimsPV
 import file.file_handling as fh
 from vid.noz_detect import *
 from tools.timeCounter import timeObject
+from tools.imWriter import writer
 import tools.regression as reg
 from folder_size_check import *
 
@@ -119,8 +120,9 @@ class folderMetric(timeObject):
         for file in files.values():
             self.nd.resetDims()
             try:
-                m, u = fm(file, pfd=self.pfd, pv=self.pv, nd=self.nd, pg=self.pg, cl=self.cl
-                          , diag=self.diag-1, exportCropLocs=False, overwriteCropLocs=self.overwriteCropLocs, **self.kwargs).values()
+                with self.timeSpan('file'):
+                    m, u = fm(file, pfd=self.pfd, pv=self.pv, nd=self.nd, pg=self.pg, cl=self.cl
+                              , diag=self.diag-1, exportCropLocs=False, overwriteCropLocs=self.overwriteCropLocs, **self.kwargs).values()
                 self.du = {**self.du, **u}
             except KeyboardInterrupt as e:
                 raise e
@@ -137,6 +139,7 @@ class folderMetric(timeObject):
                     else:
                         failures.append({'file':file, 'error':'no vals detected'})
                 out.append(m)
+        failures = failures + writer.wait()   # finish writing segmented images. a failed write should not throw away the measurements
         self.df = pd.DataFrame(out)
         self.failures = pd.DataFrame(failures)
         plainExp(self.failfn, self.failures, {'file':'', 'error':''})
@@ -151,6 +151,7 @@ class segmentExporter(folderFileLoop):
         # for file in pfd.vstill:
         for file in pfd.vstill:
             self.runFile(file, pfd=pfd, nd=nd, pv=pv, pg=pg, cl=cl, **kwargs)   
+        cl.export()
             
             
 class sizeCheckerExporter(folderFileLoop):
@@ -23,6 +23,7 @@ sys.path.append(os.path.dirname(os.path.dirname(currentdir)))
 from crop_locs import *
 from m_tools import *
 from tools.plainIm import *
+from tools.imWriter import writer
 from val.v_print import printVals
 from progDim.prog_dim import getProgDims, getProgDimsPV
 import file.file_handling as fh
@@ -99,6 +100,7 @@ class sizeChecker:
                         logging.info(f'Removed {os.path.basename(ml)}')
                 vs.getCrop(export=False)
                 vs.exportCrop(overwrite=True, diag=self.diag)
+                writer.flush()    # the crop is written on the writer thread. finish it before copying
                 cropfn = self.cropfn(bn)
                 if os.path.exists(cropfn):
                     newname = os.path.join(cropFolder, os.path.basename(cropfn))
@@ -109,4 +111,6 @@ class sizeChecker:
                 # redo unsupervised
                 vs.measure()
                 vs.exportSegment(overwrite=True, diag=self.diag)
+        writer.flush()
+        self.cl.export()
                 
\ No newline at end of file
@@ -6,13 +6,11 @@ import sys
 import os
 import numpy as np
 import matplotlib
-import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import matplotlib.cm as cm
 import matplotlib.colors as mc
 import pandas as pd
 import colorsys
-import seaborn as sns
 import itertools
 from typing import List, Dict, Tuple, Union, Any, TextIO
 import logging
@@ -184,16 +182,19 @@ class plotColors:
     
     def makeCubeHelix(self):
         '''create a colorfunction for the cubehelix palette'''
+        import seaborn as sns
         self.cmap = sns.cubehelix_palette(as_cmap=True, rot=-0.4)
         self.cfunc = self.cmapFunc
     
     def makeDiverging(self):
         '''create a diverging palette'''
+        import seaborn as sns
         self.cmap = sns.diverging_palette(220, 20, as_cmap=True)
         self.cfunc = self.cmapFunc
     
     def makePalette(self):
         '''create a color palette given a palette name'''
+        import seaborn as sns
         self.cmap = sns.color_palette(self.cname, as_cmap=True)
         self.cfunc = self.cmapFunc
     
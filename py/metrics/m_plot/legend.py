@@ -10,7 +10,6 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import matplotlib.lines as mlines
 import pandas as pd
-import seaborn as sns
 import itertools
 from typing import List, Dict, Tuple, Union, Any, TextIO
 import logging
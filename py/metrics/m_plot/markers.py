@@ -6,10 +6,8 @@ import sys
 import os
 import numpy as np
 import matplotlib
-import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import pandas as pd
-import seaborn as sns
 import itertools
 from typing import List, Dict, Tuple, Union, Any, TextIO
 import logging
@@ -7,7 +7,6 @@ import traceback
 import logging
 import pandas as pd
 import matplotlib
-from matplotlib import pyplot as plt
 from matplotlib.markers import MarkerStyle
 from matplotlib.ticker import (MultipleLocator, AutoMinorLocator)
 import matplotlib.cm as cm
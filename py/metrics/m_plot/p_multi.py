@@ -15,9 +15,7 @@ import colorsys
 from typing import List, Dict, Tuple, Union, Any, TextIO
 import re
 import numpy as np
-import seaborn as sns
 import string
-from scipy import stats
 import csv
 
 # local packages
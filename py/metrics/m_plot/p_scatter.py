@@ -7,7 +7,6 @@ import traceback
 import logging
 import pandas as pd
 import matplotlib
-from matplotlib import pyplot as plt
 from matplotlib.markers import MarkerStyle
 import matplotlib.cm as cm
 import matplotlib.colors as mc
@@ -15,9 +14,7 @@ import colorsys
 from typing import List, Dict, Tuple, Union, Any, TextIO
 import re
 import numpy as np
-import seaborn as sns
 import string
-from scipy import stats
 import csv
 import warnings
 warnings.simplefilter('error', UserWarning)
@@ -10,9 +10,7 @@ from typing import List, Dict, Tuple, Union, Any, TextIO
 import re
 import numpy as np
 import string
-from scipy import stats
 import csv
-from IPython.display import display, Math
 import matplotlib.pyplot as plt
 
 # local packages
@@ -66,6 +64,8 @@ class regressionTable:
         self.smax = self.ss.sigma.max()
         self.hlineRows = []
         self.dffull = pd.DataFrame([])
+        self.fits = pd.DataFrame([])        # linear regressions for each x variable
+        self.spears = pd.DataFrame([])      # spearman rank correlations for each x variable
         if export and not os.path.exists(exportFolder):
             logging.warning(f'exportFolder {exportFolder} does not exist. Defaulting to {cfg.path.fig}')
             exportFolder = cfg.path.fig
@@ -113,18 +113,60 @@ class regressionTable:
             self.ss = self.ms.addRatios(varlist=self.varlist, operator=s1, ss=self.ss)
             if self.logx:
                 self.ss = self.ms.addLogs(varlist=[f'{v}{s1}' for v in self.varlist], ss=self.ss)
+        if 'Ca' in self.varlist and self.logx:
+            self.ss = self.ms.addLogs(ss=self.ss, varlist=['int_Ca'])
+        self.ss = self.ms.addLogs(ss=self.ss, varlist=self.ratioList)
+        
+    def xcols(self) -> list:
+        '''get the list of x variables that go in the table, in the same order as the rows'''
+        cols = []
+        for var in self.constList+self.ratioList:
+            if 'spacing' in var or not self.logx or var in ['zdepth']:
+                cols.append(var)
+            else:
+                cols.append(f'{var}_log')
+        for scvar in self.varlist:
+            if scvar=='Ca':
+                cols.append('int_Ca_log' if self.logx else 'int_Ca')
+            for s in [f'ink_{scvar}', f'sup_{scvar}', f'{scvar}Prod', f'{scvar}Ratio']:
+                cols.append(f'{s}_log' if self.logx else s)
+        return [c for c in dict.fromkeys(cols) if c in self.ss]
+    
+    def fitGrid(self, xcols:list) -> None:
+        '''get the linear regressions and spearman rank correlations for all of the x variables at once'''
+        xcols = [c for c in xcols if not c in self.fits.index]
+        if len(xcols)==0:
+            return
+        if self.getLinReg:
+            self.fits = pd.concat([self.fits, rg.linearRegMatrix(self.ss, xcols, self.ycol)])
+        else:
+            self.fits = pd.concat([self.fits, pd.DataFrame(index=xcols)])
+        if self.getSpearman:
+            corr, p = rg.spearmanMatrix(self.ss, xcols, [self.ycol])
+            spears = pd.DataFrame({'spearman_corr':corr[self.ycol], 'spearman_p':p[self.ycol]})
+            self.spears = pd.concat([self.spears, spears])
     
     def regRow(self, df:list, d:dict, v:dict, xcol:str, title:str, label:str) -> None:
         '''get regression and correlation info for a single x,y variable combo'''
         if len(self.ss[xcol].unique())<2:
             return
+        self.fitGrid([xcol])
         if self.getLinReg:
-            reg = rg.regPD(self.ss, [xcol], self.ycol)
+            fit = self.fits.loc[xcol]
+            if pd.notna(fit['b']):
+                reg = {'c':fit['c'], 'r2':fit['r2'], 'b':fit['b']}
+            else:
+                # too few points or infinite values. let regPD handle it
+                reg = rg.regPD(self.ss, [xcol], self.ycol)
             reg['coeff'] = reg.pop('b')
         else:
             reg = {}
         if self.getSpearman:
-            spear = rg.spearman(self.ss, xcol, self.ycol)
+            spear = self.spears.loc[xcol]
+            if pd.notna(spear['spearman_corr']):
+                spear = {'spearman_corr':spear['spearman_corr'], 'spearman_p':spear['spearman_p']}
+            else:
+                spear = rg.spearman(self.ss, xcol, self.ycol)
             reg = {**reg, **spear}
             if spear['spearman_p']<0.001:
                 d[label] = spear['spearman_corr']   # store the correlation coefficient in the dictionary
@@ -141,7 +183,6 @@ class regressionTable:
         
         if scvar=='Ca':
             if self.logx:
-                self.ss = self.ms.addLogs(ss=self.ss, varlist=['int_Ca'])
                 self.regRow(df, d, v, 'int_Ca_log', '$Ca$', 'const')           
             else:
                 self.regRow(df, d, v, 'int_Ca', '$Ca$', 'const')    
@@ -173,7 +214,6 @@ class regressionTable:
     def addRatios(self) -> None:
         '''add the requested variables that are just ratios, one row per variable'''
         df = []
-        self.ss = self.ms.addLogs(ss=self.ss, varlist=self.ratioList)
         for vlist in [self.constList, self.ratioList]:
             for var in vlist:
                 d = {}
@@ -311,6 +351,7 @@ class regressionTable:
         self.dftextOut = dftextOut
         if self.printOut:
             # print(self.dftextOut)
+            from IPython.display import display
             display(self.df)
         if self.export:
             fn = os.path.join(self.exportFolder, 'regressionTables', f'tab_{self.label[4:]}.tex')
@@ -330,6 +371,7 @@ class regressionTable:
         self.dftextOut = dftext
         if self.printOut:
             # print(self.dftextOut)
+            from IPython.display import display
             display(self.df)
         if self.export:
             fn = os.path.join(self.exportFolder, 'regressionTables', f'tab_{self.label[4:]}.tex')
@@ -355,6 +397,7 @@ class regressionTable:
         self.dftext = dftext
         if self.printOut:
             # print(dftext)
+            from IPython.display import display
             display(df)
             # print('\n-------------\n')
         if self.export:
@@ -424,6 +467,7 @@ class regressionTable:
             self.checkYvar()
             return
         self.prepareSSI()  # get the independent variable list and the dataframe with those variables added
+        self.fitGrid(self.xcols())   # fit every x variable at once
         
         # go through each variable and get sup, ink, product, ratio
         self.addRatios()
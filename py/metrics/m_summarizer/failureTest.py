@@ -26,7 +26,6 @@ from val.v_print import printVals
 from progDim.prog_dim import getProgDims
 import file.file_handling as fh
 from m_tools import *
-from full_sequence import SDTWorkflow, fullSequencer
 
 # logging
 logger = logging.getLogger(__name__)
@@ -133,6 +132,7 @@ class failureTest:
         folder = self.folder(i)
         fh.openExplorer(os.path.join(folder, 'Usegment'))
         folder2 = os.path.join(cfg.path.server, folder)
+        from full_sequence import SDTWorkflow   # full_sequence imports this module
         self.sw = SDTWorkflow(folder2, **kwargs)
         self.sw.run()
         # if not testFailures:
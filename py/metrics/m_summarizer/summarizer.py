@@ -14,6 +14,7 @@ import cv2 as cv
 import shutil
 import subprocess
 import time
+import hashlib
 
 # local packages
 currentdir = os.path.dirname(os.path.realpath(__file__))
@@ -27,7 +28,6 @@ from progDim.prog_dim import getProgDims
 import file.file_handling as fh
 from m_tools import *
 from failureTest import *
-from full_sequence import SDTWorkflow
 
 # logging
 logger = logging.getLogger(__name__)
@@ -41,21 +41,102 @@ pd.set_option('display.max_rows', 500)
 
 #----------------------------------------------
  
+def folderSignature(folder:str) -> str:
+    '''get a hash of the names, sizes, and modification times of the measure, failure, summary, and metadata files in the folder'''
+    if not os.path.exists(folder):
+        return ''
+    l = []
+    for f in sorted(os.listdir(folder)):
+        if f.endswith('.csv') and any([s in f.lower() for s in ['measure', 'failures', 'summary', 'meta', 'speeds', 'manual']]):
+            st = os.stat(os.path.join(folder, f))
+            l.append(f'{f},{st.st_size},{st.st_mtime_ns}')
+    return hashlib.md5(';'.join(l).encode()).hexdigest()
+ 
 class summarizer(fh.folderLoop):
-    '''recursively create measures, summaries, failuares, and collect all of the summaries into a table. measureClass is a class definition for a folderMetric class. failures will be a list of files'''
+    '''recursively create measures, summaries, failuares, and collect all of the summaries into a table. measureClass is a class definition for a folderMetric class. failures will be a list of files.
+    incremental=True to reuse rows from the last exported summary for folders whose inputs have not changed since that export'''
     
-    def __init__(self, folders:Union[str,list], measureClass, overwrite:bool=False, overwriteMeasure:bool=False, overwriteSummary:bool=False, **kwargs):
+    def __init__(self, folders:Union[str,list], measureClass, overwrite:bool=False, overwriteMeasure:bool=False, overwriteSummary:bool=False, incremental:bool=False, **kwargs):
         super().__init__(folders, self.summarize, **kwargs)
         self.overwrite = overwrite
         self.overwriteMeasure = overwriteMeasure
         self.overwriteSummary = overwriteSummary
+        self.incremental = incremental
         self.measureClass = measureClass
         self.out = []
         self.units = {}
         self.failures = pd.DataFrame([])
+        self.signatures = {}
+        self.previous = {}
+        self.reused = 0
+        
+    def summaryFN(self) -> str:
+        '''file name of the exported summary table. subclasses that export to a fixed file should overwrite this'''
+        return ''
+    
+    def failureFN(self) -> str:
+        '''file name of the exported failure table. subclasses that export to a fixed file should overwrite this'''
+        return ''
+    
+    def signatureFN(self, fn:str) -> str:
+        '''file name of the table of folder signatures that goes next to the summary table fn'''
+        return fn.replace('.csv', '_signatures.csv')
+    
+    def relFolder(self, folder:str) -> str:
+        '''folder name relative to the server, as it appears in the printFolderR column of the summaries'''
+        return os.path.relpath(folder, cfg.path.server)
+    
+    def importPrevious(self) -> None:
+        '''import the last exported summary, failures, and folder signatures, grouped by folder'''
+        self.previous = {}
+        fn = self.summaryFN()
+        sigfn = self.signatureFN(fn)
+        if len(fn)==0 or not os.path.exists(sigfn):
+            return
+        sigs, _ = plainIm(sigfn, ic=None)
+        if len(sigs)==0:
+            return
+        for i,row in sigs.iterrows():
+            self.previous[row['printFolderR']] = {'signature':row['signature'], 'rows':[], 'failures':[]}
+        for f in [fn, fn.replace('.csv', '_gname.csv')]:
+            df, units = plainIm(f, ic=None)
+            if len(df)==0 or not 'printFolderR' in df:
+                continue
+            self.units = {**self.units, **units}
+            for folder, rows in df.groupby('printFolderR'):
+                if folder in self.previous:
+                    rows = rows.dropna(axis=1, how='all')
+                    self.previous[folder]['rows'] = self.previous[folder]['rows']+rows.to_dict('records')
+        failfn = self.failureFN()
+        if len(failfn)>0 and os.path.exists(failfn):
+            df, _ = plainIm(failfn, ic=None)
+            if len(df)>0:
+                for i,row in df.iterrows():
+                    folder = self.relFolder(os.path.dirname(row['file']))
+                    if folder in self.previous:
+                        err = '' if pd.isna(row['error']) else row['error']
+                        self.previous[folder]['failures'].append({'file':row['file'], 'error':err})
+        
+    def reusePrevious(self, folder:str) -> bool:
+        '''add the previous summary rows for this folder if its inputs have not changed. return True if the rows were reused'''
+        sig = folderSignature(folder)
+        rel = self.relFolder(folder)
+        self.signatures[rel] = sig
+        if self.overwrite or self.overwriteMeasure or self.overwriteSummary:
+            return False
+        if not rel in self.previous or not self.previous[rel]['signature']==sig or len(self.previous[rel]['rows'])==0:
+            return False
+        self.out = self.out+self.previous[rel]['rows']
+        if len(self.previous[rel]['failures'])>0:
+            self.failures = pd.concat([self.failures, pd.DataFrame(self.previous[rel]['failures'])])
+            self.failures.reset_index(inplace=True, drop=True)
+        self.reused+=1
+        return True
         
     def summarize(self, folder:str, **kwargs) -> None:
         '''get summaries from a single folder and add them to the running list'''
+        if self.incremental and self.reusePrevious(folder):
+            return
         summary = []
         failures = []
         pfd = fh.printFileDict(folder)
@@ -70,6 +151,7 @@ class summarizer(fh.folderLoop):
             runFull=(len(pfd.vstill)==0)
 
         if runFull:
+            from full_sequence import SDTWorkflow   # full_sequence imports this module
             sw = SDTWorkflow(folder)
             sw.run()
 
@@ -116,6 +198,9 @@ class summarizer(fh.folderLoop):
                     flist.append({'file':row['file'], 'error':err})
             self.failures = pd.concat([self.failures, pd.DataFrame(flist)])
             self.failures.reset_index(inplace=True, drop=True)
+        if self.incremental:
+            # the measure and summary files may have been rewritten, so get the signature after summarizing
+            self.signatures[self.relFolder(folder)] = folderSignature(folder)
 
     def export(self, fn:str) -> None:
         '''export the tables of data'''
@@ -126,6 +211,9 @@ class summarizer(fh.folderLoop):
             plainExp(fn.replace('.csv', '_gname.csv'), df[~(df.gname=='total')], self.units, index=False)  # export groups individually
         else:
             plainExp(fn, df, self.units, index=False)
+        if len(self.signatures)>0:
+            sigs = pd.DataFrame([{'printFolderR':key, 'signature':val} for key,val in self.signatures.items()])
+            plainExp(self.signatureFN(fn), sigs, {'printFolderR':'', 'signature':''}, index=False)
         
     def exportFailures(self, fn:str) -> None:
         '''export a list of failed files'''
@@ -142,4 +230,10 @@ class summarizer(fh.folderLoop):
         self.out = []
         self.units = {}
         self.failures = pd.DataFrame([])
+        self.signatures = {}
+        self.reused = 0
+        if self.incremental:
+            self.importPrevious()
         super().run()
+        if self.incremental:
+            logging.info(f'Reused summaries for {self.reused} of {len(self.folders)} folders')
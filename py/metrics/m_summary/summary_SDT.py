@@ -359,16 +359,14 @@ class summarySDT(summaryMetric):
     def depCorrelations(self, fn:str=''):
         '''get a table of spearman correlation strengths between all dependent variables'''
         v = self.numericDepVars()
-        out = []
+        pairs = []
         for i,var1 in enumerate(v):
             for var2 in v[i+1:]:
                 s1 = self.strip(var1)
                 s2 = self.strip(var2)
                 if not s1==s2 and not f'{s1}n'==s2 and not f'{s2}n'==s1:  
-                    spear = self.depCorrelation0(var1, var2)
-                    if len(spear)>0:
-                        out.append(spear)
-        self.depCor = pd.DataFrame(out)
+                    pairs.append((var1, var2))
+        self.depCor = rg.spearmanPairs(self.ss, pairs)
         self.exportDepCorrs(fn)
         
     def exportDepCorrs(self, fn:str=''):
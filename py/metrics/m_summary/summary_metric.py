@@ -273,12 +273,6 @@ class summaryMetric:
     def depCorrelations(self):
         '''get a table of spearman correlation strengths between all dependent variables'''
         v = self.numericDepVars()
-        out = []
-        for i,var1 in enumerate(v):
-            for var2 in v[i+1:]:
-                spear = rg.spearman(self.ss, var1, var2)
-                spear['var1'] = var1
-                spear['var2'] = var2
-                out.append(spear)
-        self.depCor = pd.DataFrame(out)
+        pairs = [(var1, var2) for i,var1 in enumerate(v) for var2 in v[i+1:]]
+        self.depCor = rg.spearmanPairs(self.ss, pairs)
         
\ No newline at end of file
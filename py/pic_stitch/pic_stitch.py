@@ -10,7 +10,6 @@ import sys
 import time
 import logging
 from typing import List, Dict, Tuple, Union, Any, TextIO
-from matplotlib import pyplot as plt
 import traceback
 
 # local packages
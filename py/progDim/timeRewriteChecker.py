@@ -28,6 +28,53 @@ for s in ['matplotlib', 'imageio', 'IPython', 'PIL']:
 
 #----------------------------------------------
 
+_donorFolders = {}   # candidate donor folders and the modification times they were found with, keyed by (top folder, shopbot file name)
+
+def resetDonorFolders() -> None:
+    '''forget all cached donor folder lists'''
+    _donorFolders.clear()
+
+def donorStamp(topfolder:str) -> tuple:
+    '''get the modification times of the top folder, the sample folders in it, and the date folders in those. 
+    these change when print folders are added or removed'''
+    stamp = [os.stat(topfolder).st_mtime_ns]
+    for f1 in os.scandir(topfolder):
+        if f1.is_dir():
+            stamp.append((f1.name, f1.stat().st_mtime_ns))
+            for f2 in os.scandir(f1.path):
+                if f2.is_dir():
+                    stamp.append((f1.name, f2.name, f2.stat().st_mtime_ns))
+    return tuple(stamp)
+
+def donorFolders(topfolder:str, sbp:str) -> List[str]:
+    '''get a list of print folders under the top folder that use the same shopbot file, in the order they should be searched for donor targets. 
+    the listing is cached, and only walked again if the top folder, one of its sample folders, or one of their date folders changed'''
+    key = (topfolder, sbp)
+    stamp = donorStamp(topfolder)
+    if key in _donorFolders and _donorFolders[key][0]==stamp:
+        return _donorFolders[key][1]
+    l = []
+    for f1 in os.listdir(topfolder):
+        f1f = os.path.join(topfolder, f1)   # I_SO8-S85-0.05_S_4.00
+        if not os.path.isdir(f1f):
+            continue
+        ll = os.listdir(f1f)
+        ll.reverse()
+        for f2 in ll:
+            f3f = os.path.join(f1f, f2, sbp)  # I_SO8-S85-0.05_S_4.00_230511\\disturbHoriz2_1_0.500
+            if os.path.exists(f3f):
+                l.append(f3f)
+    _donorFolders[key] = (stamp, l)
+    return l
+
+def donorFile(printFolder:str, doc:str) -> str:
+    '''find the csv of type doc in the print folder without sorting the whole folder'''
+    prefix = f'{os.path.basename(printFolder)}_{doc}_'
+    for f in os.listdir(printFolder):
+        if f.startswith(prefix) and f.endswith('.csv'):
+            return os.path.join(printFolder, f)
+    return ''
+
 class timeRewriteChecker:
     '''this is for checking and correcting errors in timeRewrite files'''
     
@@ -35,16 +82,27 @@ class timeRewriteChecker:
         self.printFolder = printFolder
         self.ftable = ftable
         self.ftable.loc[0, 'targetLine'] = 0
+        self.stats = {'blips':0, 'overshootPasses':0, 'overshootCorrections':0, 'stolen':False}
         if getBlips:
             self.getBlips()
         self.checkOvershoots()
-            
+
         self.ftable.drop(columns=['xt_orig', 'yt_orig', 'zt_orig'], inplace=True)
         if len(self.getOvershoots(trust=False))>0:
             # we still have some out of order points. steal from another folder
             self.stealTargets()
+            self.stats['stolen'] = True
         self.rewritten = True
-        
+        logging.info(f'{os.path.basename(self.printFolder)}: {self.report()}')
+
+    def report(self) -> str:
+        '''summarize the corrections that were needed for this folder'''
+        st = self.stats
+        s = f'{st["blips"]} blips, {st["overshootCorrections"]} overshoot corrections in {st["overshootPasses"]} passes'
+        if st['stolen']:
+            s = s + ', stole targets from another folder'
+        return s
+
     def getTargetList(self, stopPoints:list, imin:int, imax:int):
         '''get the endpoint of the current run for replacement'''
         stopPoint = min(list(filter(lambda x:x>imin, stopPoints)))
@@ -56,25 +114,20 @@ class timeRewriteChecker:
     def findAnotherFolder(self, doc:str='timeRewrite') -> pd.DataFrame:
         '''find another folder to steal from'''
         topfolder = os.path.dirname(os.path.dirname(os.path.dirname(self.printFolder)))  # singleDoubleTriple\\SO_S85-0.05
-        for f1 in os.listdir(topfolder):
-            f1f = os.path.join(topfolder, f1)   # I_SO8-S85-0.05_S_4.00
-            if not f1f in self.printFolder:
-                ll = os.listdir(f1f)
-                ll.reverse()
-                for f2 in ll:
-                    f2f = os.path.join(f1f, f2)  # I_SO8-S85-0.05_S_4.00_230511
-                    f3f = os.path.join(f2f, os.path.basename(self.printFolder))
-                    if os.path.exists(f3f):
-                        pfd2 = fh.printFileDict(f3f)
-                        if os.path.exists(getattr(pfd2, doc)):
-                            # print(f3f)
-                            ft2,_ = plainIm(getattr(pfd2, doc))
-                            if doc=='timeRewrite':
-                                overshoots = ft2[((ft2.targetLine)>(ft2.targetLine.shift(-1)))]
-                                if len(overshoots)==0:
-                                    return ft2
-                            else:
-                                return ft2
+        for f3f in donorFolders(topfolder, os.path.basename(self.printFolder)):
+            f1f = os.path.dirname(os.path.dirname(f3f))   # I_SO8-S85-0.05_S_4.00
+            if f1f in self.printFolder:
+                continue
+            file = donorFile(f3f, doc)
+            if len(file)==0:
+                continue
+            ft2,_ = plainIm(file)
+            if doc=='timeRewrite':
+                overshoots = ft2[((ft2.targetLine)>(ft2.targetLine.shift(-1)))]
+                if len(overshoots)==0:
+                    return ft2
+            else:
+                return ft2
         raise ValueError('No folder to steal from')
     
     def getStolenTargets(self, overwrite:bool=False):
@@ -178,13 +231,16 @@ class timeRewriteChecker:
         if 'SNOFF' in str(self.ftable.loc[i,'status']):
             self.ftable.loc[i, 'status'] = 'erased: 8 flag off'
 
+    def flagRuns(self) -> pd.DataFrame:
+        '''get a table of runs of constant flag, with the flag value, length of the run, and index of the first point in the run'''
+        flag = self.ftable.flag.to_numpy()
+        starts = np.flatnonzero(np.r_[True, flag[1:]!=flag[:-1]])
+        n = np.diff(np.r_[starts, len(flag)])
+        return pd.DataFrame({'flag':flag[starts], 'n':n, 'i0':self.ftable.index[starts]})
+
     def getBlips(self):
         '''find places where the flag only turned on briefly in error and shift the targets all the way down'''
-        fc = []  # table of points where the flag changes
-        f1 = self.ftable
-        for i, g in f1.groupby([(f1.flag != f1.flag.shift()).cumsum()]):
-            fc.append({'flag':g.iloc[0]['flag'], 'n':len(g), 'i0':g.iloc[0].name})
-        fc = pd.DataFrame(fc)
+        fc = self.flagRuns()  # table of points where the flag changes
         fc = fc[(fc.i0>0)&(fc.flag>0)]
         self.flagChanges = fc
         blips = fc[fc.n<3]
@@ -193,32 +249,47 @@ class timeRewriteChecker:
         self.flags = fc.flag.unique()
         self.off = min(self.flags)
         self.onFlags = set(self.flags).difference(set([self.off]))
+        self.stats['blips'] = len(blips)
         for i,blip in blips.iterrows():
+            # each blip pulls targets from the runs before it, so these have to go in order
             self.correctBlip(blip)
             
     #--------------------------------------------
-            
+    
+    def overshootRows(self, tl:np.ndarray, trust:bool=True) -> np.ndarray:
+        '''get the positions of points after the first point where the target line is larger than the next target line'''
+        bad = np.zeros(len(tl), dtype=bool)
+        bad[1:-1] = tl[1:-1]>tl[2:]
+        if trust:
+            bad = bad&(~self.ftable.trusted.to_numpy(dtype=bool))
+        return np.flatnonzero(bad)
         
     def getOvershoots(self, trust:bool=True) -> pd.DataFrame:
         '''find points where the target line overshot where the printer actually was'''
-        f = self.ftable.loc[1:]
-        if trust:
-            return f[((f.targetLine)>(f.targetLine.shift(-1)))&(~f.trusted)]
-        else:
-            return f[((f.targetLine)>(f.targetLine.shift(-1)))]
+        return self.ftable.iloc[self.overshootRows(self.ftable.targetLine.to_numpy(), trust=trust)]
         
     def checkOvershoots(self) -> None:
-        '''check for points where the shopbot has backtracked on targets'''
-        overshoots = self.getOvershoots()
+        '''check for points where the shopbot has backtracked on targets. corrections are made on arrays and written back to the table at the end'''
+        cols = ['xt', 'yt', 'zt', 'targetLine']
+        arrs = dict([[s, self.ftable[s].to_numpy(copy=True)] for s in cols])
+        tl = arrs['targetLine']
+        times = self.ftable.time.to_numpy()
+        overshoots = self.overshootRows(tl)
         dummy = 0
         while len(overshoots)>0 and dummy<10:
-            for i,row in overshoots.iterrows():
-                if i>0:
-                    bads = self.ftable[(self.ftable.targetLine==row['targetLine'])&(self.ftable.time<=row['time'])]
-                    for s in ['xt', 'yt', 'zt', 'targetLine']:
-                        self.ftable.loc[bads.iloc[0].name:bads.iloc[-1].name, s] = self.ftable.loc[row.name+1, s]   # overwrite these with the next target
-            overshoots = self.getOvershoots()
+            for i,t in zip(overshoots, tl[overshoots]):
+                bads = np.flatnonzero((tl==t)&(times<=times[i]))
+                if len(bads)==0:
+                    continue
+                for s in cols:
+                    arrs[s][bads[0]:bads[-1]+1] = arrs[s][i+1]   # overwrite these with the next target
+                self.stats['overshootCorrections']+=1
+            overshoots = self.overshootRows(tl)
             dummy = dummy+1
+        self.stats['overshootPasses'] = dummy
+        if dummy>0:
+            for s in cols:
+                self.ftable[s] = arrs[s]
         
     #--------------------------------------------
         
@@ -43,7 +43,9 @@ def getConfigDir() -> str:
     return configDirRecursive(currentdir)
 
 def dumpConfigs(cfg, path:str) -> int:
-    '''Saves config file. cfg could be a Box or a dict'''
+    '''Saves config file. cfg could be a Box, a dict, or a lazyConfig'''
+    if type(cfg) is lazyConfig:
+        cfg = cfg.resolve()
     with open(path, "w") as ymlout:
         if type(cfg) is Box:
             cout = cfg.to_dict()
@@ -98,8 +100,55 @@ def loadConfig() -> Box:
     path = findConfigFile()
     cfg = loadConfigFile(path)
     return cfg
+
+
+class lazyConfig:
+    '''stands in for the config Box. the config file is not found or loaded until the first time an attribute or key is used, 
+    so importing a module that uses cfg does not read any files'''
+    
+    def __init__(self):
+        object.__setattr__(self, 'loaded', None)
+        
+    def resolve(self) -> Box:
+        '''load the config if it has not been loaded, and return the Box'''
+        if self.loaded is None:
+            object.__setattr__(self, 'loaded', loadConfig())
+        return self.loaded
+    
+    def __getattr__(self, name:str):
+        if name=='loaded' or (name.startswith('__') and name.endswith('__')):
+            # don't load the config for copy and pickle lookups
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+    
+    def __setattr__(self, name:str, val) -> None:
+        setattr(self.resolve(), name, val)
+        
+    def __delattr__(self, name:str) -> None:
+        delattr(self.resolve(), name)
+    
+    def __getitem__(self, key:str):
+        return self.resolve()[key]
+    
+    def __setitem__(self, key:str, val) -> None:
+        self.resolve()[key] = val
+        
+    def __contains__(self, key:str) -> bool:
+        return key in self.resolve()
+    
+    def __iter__(self):
+        return iter(self.resolve())
+    
+    def __len__(self) -> int:
+        return len(self.resolve())
+    
+    def __dir__(self) -> list:
+        return dir(self.resolve())
+    
+    def __repr__(self) -> str:
+        return repr(self.resolve())
         
 #----------------------------------------------------
 
-cfg = loadConfig()
+cfg = lazyConfig()
     
\ No newline at end of file
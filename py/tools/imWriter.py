@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+'''Functions for writing images in background threads'''
+
+# external packages
+import os
+import sys
+import queue
+import threading
+import atexit
+import logging
+from typing import List, Dict, Tuple, Union, Any, TextIO, Callable
+import numpy as np
+import cv2 as cv
+
+# local packages
+
+
+# logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+#----------------------------------------------
+
+def writeError(fn:str) -> str:
+    '''describe why an image could not be written'''
+    folder = os.path.dirname(fn)
+    folderExists = os.path.exists(folder)
+    writePermission = os.access(folder, os.W_OK)
+    return f'Failed to export {fn}. Folder exists: {folderExists}. Write permission: {writePermission}. Name length: {len(fn)}'
+
+def combineErrors(errors:List[dict]) -> ValueError:
+    '''combine a list of failed writes into a single error'''
+    return ValueError('\n'.join([e['error'] for e in errors]))
+
+
+class imWriter:
+    '''writes images on worker threads, so png encoding overlaps with computation. opencv releases the GIL while encoding.
+    threads is the number of worker threads. if 0, images are written immediately
+    maxQueue is the number of images that can wait in the queue before write() blocks, which limits memory use
+    errors are collected and raised as a ValueError when flush() is called, or returned as a list of {'file', 'error'} when wait() is called'''
+
+    def __init__(self, threads:int=4, maxQueue:int=32):
+        self.threads = threads
+        self.maxQueue = maxQueue
+        self.workers = []
+        self.errors = []
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=maxQueue)
+
+    def setThreads(self, threads:int) -> None:
+        '''change the number of worker threads. 0 writes images immediately'''
+        self.flush()
+        self.stop()
+        self.threads = threads
+
+    def start(self) -> None:
+        '''start the worker threads if they are not running'''
+        self.workers = [w for w in self.workers if w.is_alive()]
+        while len(self.workers)<self.threads:
+            w = threading.Thread(target=self.work, daemon=True)
+            w.start()
+            self.workers.append(w)
+
+    def stop(self) -> None:
+        '''stop the worker threads after the queue is empty'''
+        for w in self.workers:
+            self.queue.put(None)
+        for w in self.workers:
+            w.join()
+        self.workers = []
+
+    def work(self) -> None:
+        '''worker thread: take jobs off the queue until it gets None'''
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                self.run(*job)
+            finally:
+                self.queue.task_done()
+
+    def run(self, fn:str, func:Callable, args:tuple) -> None:
+        '''run a single job and record any failure'''
+        try:
+            out = func(*args)
+        except Exception as e:
+            with self.lock:
+                self.errors.append({'file':fn, 'error':f'{fn}: {e}'})
+        else:
+            if out is False:
+                with self.lock:
+                    self.errors.append({'file':fn, 'error':writeError(fn)})
+
+    def submit(self, fn:str, func:Callable, *args) -> None:
+        '''run func(*args), which writes the file fn, on a worker thread. func should return False if the write failed'''
+        if self.threads<1:
+            self.run(fn, func, args)
+            return
+        self.start()
+        self.queue.put((fn, func, args))
+
+    def write(self, fn:str, im:np.array) -> None:
+        '''write the image to file. the image is copied, so the caller can keep changing it'''
+        self.submit(fn, cv.imwrite, fn, im.copy())
+
+    def wait(self) -> List[dict]:
+        '''wait for all queued images to be written, and return the writes that failed since the last wait or flush'''
+        if len(self.workers)>0:
+            self.queue.join()
+        with self.lock:
+            errors = self.errors
+            self.errors = []
+        return errors
+
+    def flush(self) -> None:
+        '''wait for all queued images to be written, and raise any errors since the last flush'''
+        errors = self.wait()
+        if len(errors)>0:
+            raise combineErrors(errors)
+
+
+writer = imWriter(threads=min(4, os.cpu_count() or 1))   # shared writer for the whole process
+
+@atexit.register
+def flushAtExit() -> None:
+    '''write any images that are still queued when the interpreter exits'''
+    try:
+        writer.flush()
+    except ValueError as e:
+        logging.error(e)
@@ -8,9 +8,7 @@ import os
 import sys
 import logging
 from typing import List, Dict, Tuple, Union, Any, TextIO
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import PolynomialFeatures
-from scipy import stats
+# sklearn and scipy take seconds to import, so they are imported inside the functions that use them
 
 # local packages
 currentdir = os.path.dirname(os.path.realpath(__file__))
@@ -45,6 +43,7 @@ def quadReg(x:list, y:list) -> dict:
 
 def polyMultiFit(X:np.array, y:np.array, order, intercept:Union[float,str]) -> dict:
     '''polynomial fit for multiple regression'''
+    from sklearn.preprocessing import PolynomialFeatures
     poly = PolynomialFeatures(degree = order)
     X_poly = poly.fit_transform(X)
 
@@ -55,6 +54,7 @@ def lr(X:np.array, y:np.array, intercept:Union[float,str]) -> dict:
     '''linear regression from numpy arrays'''
     if len(y)<5:
         return {}
+    from sklearn.linear_model import LinearRegression
     if type(intercept) is str:
         regr = LinearRegression().fit(X,y)
     else:
@@ -103,9 +103,106 @@ def spearman(df:pd.DataFrame, xcol:str, ycol:str) -> dict:
         return {}
     if len(ssi[xcol].unique())<2 or len(ssi[ycol].unique())<2:
         return {}
+    from scipy import stats
     corr, p = stats.spearmanr(ssi[xcol], ssi[ycol])
     return {'spearman_corr':corr, 'spearman_p':p}
-    
+
+def spearmanMatrix(df:pd.DataFrame, xcols:List[str], ycols:List[str]=[]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    '''get spearman rank correlations and p values between every column in xcols and every column in ycols, as two tables indexed by xcols with columns ycols.
+    like spearman, NaNs are dropped pairwise, and pairs with fewer than 10 points or fewer than 2 unique values get NaN.
+    columns that share the same missing values are ranked together and correlated with one matrix product'''
+    from scipy import stats
+    if len(ycols)==0:
+        ycols = xcols
+    cols = list(dict.fromkeys(list(xcols)+list(ycols)))
+    X = df[cols].to_numpy(dtype=float)
+    valid = ~np.isnan(X)
+
+    # group columns by their pattern of missing values
+    def groupCols(clist:List[str]) -> List[List[int]]:
+        patterns = {}
+        for c in dict.fromkeys(clist):
+            j = cols.index(c)
+            patterns.setdefault(valid[:,j].tobytes(), []).append(j)
+        return list(patterns.values())
+    xgroups = groupCols(xcols)
+    ygroups = groupCols(ycols)
+    symmetric = xgroups==ygroups
+
+    corr = np.full((len(cols), len(cols)), np.nan)
+    n = np.zeros((len(cols), len(cols)))
+    for a,ia in enumerate(xgroups):
+        for b,ib in enumerate(ygroups):
+            if symmetric and b<a:
+                continue
+            rows = valid[:,ia[0]]&valid[:,ib[0]]
+            nrows = rows.sum()
+            if nrows<10:
+                continue
+            ii = ia if ia==ib else ia+ib
+            sub = X[rows][:,ii]
+            R = stats.rankdata(sub, axis=0)
+            R = R-R.mean(axis=0)
+            norm = np.sqrt((R**2).sum(axis=0))
+            norm[np.ptp(sub, axis=0)==0] = np.nan     # fewer than 2 unique values
+            Z = R/norm
+            C = np.clip(Z[:,:len(ia)].T@Z[:,len(ii)-len(ib):], -1, 1)
+            corr[np.ix_(ia, ib)] = C
+            corr[np.ix_(ib, ia)] = C.T
+            n[np.ix_(ia, ib)] = nrows
+            n[np.ix_(ib, ia)] = nrows
+
+    # p values from the t distribution, as in scipy.stats.spearmanr
+    dof = n-2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = corr*np.sqrt((dof/((corr+1)*(1-corr))).clip(0))
+    p = 2*stats.t.sf(np.abs(t), np.where(dof>0, dof, np.nan))
+
+    xi = [cols.index(c) for c in xcols]
+    yi = [cols.index(c) for c in ycols]
+    corrdf = pd.DataFrame(corr[np.ix_(xi, yi)], index=list(xcols), columns=list(ycols))
+    pdf = pd.DataFrame(p[np.ix_(xi, yi)], index=list(xcols), columns=list(ycols))
+    return corrdf, pdf
+
+def linearRegMatrix(df:pd.DataFrame, xcols:List[str], ycol:str) -> pd.DataFrame:
+    '''get the linear regression y=bx+c of ycol against each column in xcols, as a table indexed by xcols with columns b, c, r2, n.
+    like regPD, NaNs are dropped pairwise. all fits are solved at once with column sums instead of one LinearRegression per column.
+    fits with fewer than 5 points or infinite values get NaN'''
+    X = df[list(xcols)].to_numpy(dtype=float)
+    y = df[ycol].to_numpy(dtype=float).reshape((-1,1))
+    valid = ~np.isnan(X) & ~np.isnan(y)
+    n = valid.sum(axis=0)
+    finite = ~(valid & (np.isinf(X) | np.isinf(y))).any(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Xv = np.where(valid, X, 0)
+        Yv = np.where(valid, y, 0)
+        xm = Xv.sum(axis=0)/n
+        ym = Yv.sum(axis=0)/n
+        xc = np.where(valid, X-xm, 0)
+        yc = np.where(valid, y-ym, 0)
+        sxx = (xc**2).sum(axis=0)
+        syy = (yc**2).sum(axis=0)
+        b = np.where(sxx>0, (xc*yc).sum(axis=0)/sxx, 0)    # a constant x gives a flat fit, as in LinearRegression
+        c = ym-b*xm
+        ssres = (np.where(valid, yc-b*xc, 0)**2).sum(axis=0)
+        r2 = np.where(syy>0, 1-ssres/syy, np.where(ssres==0, 1, 0))
+    ok = (n>=5) & finite
+    out = pd.DataFrame({'b':b, 'c':c, 'r2':r2}, index=list(xcols))
+    out.loc[~ok, :] = np.nan
+    out['n'] = n
+    return out
+
+def spearmanPairs(df:pd.DataFrame, pairs:List[Tuple[str,str]]) -> pd.DataFrame:
+    '''get a table of spearman rank correlations for a list of (var1, var2) pairs, with columns spearman_corr, spearman_p, var1, var2'''
+    cols = list(dict.fromkeys([p[0] for p in pairs]+[p[1] for p in pairs]))
+    if len(cols)==0:
+        return pd.DataFrame([])
+    corr, p = spearmanMatrix(df, cols)
+    out = []
+    for var1,var2 in pairs:
+        out.append({'spearman_corr':corr.loc[var1, var2], 'spearman_p':p.loc[var1, var2], 'var1':var1, 'var2':var2})
+    return pd.DataFrame(out)
+
 def removeOutliers(df:pd.DataFrame, col:str, sigma:float=3) -> pd.DataFrame:
     '''remove outliers in column by # of standard deviation sigma'''
     return df[np.abs(df[col]-df[col].mean()) <= (sigma*df[col].std())]
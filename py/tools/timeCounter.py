@@ -2,9 +2,17 @@
 '''Functions for measuring computation time'''
 
 # external packages
+import os
+import sys
 import time
+import json
+from contextlib import contextmanager
+import pandas as pd
 
 # local packages
+currentdir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(currentdir)
+from plainIm import plainIm, plainExp
 
 # logging
 #----------------------------------------------
@@ -15,20 +23,137 @@ def timeCounter(t0:float, s:str) -> float:
         print(f'{s} {(tt-t0):0.4f} seconds')
     return tt
 
+
+class spanProfiler:
+    '''records nested spans of time (e.g. folder/step/file/operation), with wall time, cpu time, and call counts.
+    spans with the same path are added together, so a whole folderLoop run can be aggregated into one table.
+    nothing is recorded unless the profiler is enabled'''
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self) -> None:
+        '''clear all recorded spans'''
+        self.stats = {}   # path tuple: [calls, wall time, cpu time]
+        self.stack = []   # names of the spans that are currently open
+
+    def enable(self, reset:bool=True) -> None:
+        '''start recording spans'''
+        if reset:
+            self.reset()
+        self.enabled = True
+
+    def disable(self) -> None:
+        '''stop recording spans'''
+        self.enabled = False
+
+    def path(self, name:str) -> tuple:
+        '''get the path of a span with this name inside the currently open spans'''
+        return tuple(self.stack)+(name,)
+
+    def record(self, path:tuple, wall:float, cpu:float, calls:int=1) -> None:
+        '''add time to the span at this path'''
+        if not path in self.stats:
+            self.stats[path] = [0, 0, 0]
+        s = self.stats[path]
+        s[0]+=calls
+        s[1]+=wall
+        s[2]+=cpu
+
+    @contextmanager
+    def span(self, name:str):
+        '''time everything inside the with block as a span with this name'''
+        if not self.enabled:
+            yield
+            return
+        self.stack.append(name)
+        t0 = time.perf_counter()
+        c0 = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter()-t0
+            cpu = time.process_time()-c0
+            self.stack.pop()
+            self.record(self.path(name), wall, cpu)
+
+    def table(self) -> pd.DataFrame:
+        '''get a table of all spans, with the time spent in each span outside of its child spans'''
+        out = []
+        for path,s in self.stats.items():
+            children = [c for p,c in self.stats.items() if len(p)==len(path)+1 and p[:-1]==path]
+            out.append({'span':'/'.join(path), 'depth':len(path), 'calls':s[0], 'wall':s[1], 'cpu':s[2]
+                        , 'selfWall':s[1]-sum([c[1] for c in children])})
+        df = pd.DataFrame(out, columns=['span', 'depth', 'calls', 'wall', 'cpu', 'selfWall'])
+        df.sort_values(by='span', inplace=True)
+        df.reset_index(inplace=True, drop=True)
+        return df
+
+    def units(self) -> dict:
+        '''units for the columns in the table'''
+        return {'span':'', 'depth':'', 'calls':'', 'wall':'s', 'cpu':'s', 'selfWall':'s'}
+
+    def export(self, fn:str) -> None:
+        '''export the table to a .csv or .json file'''
+        df = self.table()
+        if fn.endswith('.json'):
+            with open(fn, 'w') as f:
+                json.dump(df.to_dict('records'), f, indent=1)
+        else:
+            plainExp(fn, df, self.units(), index=False)
+
+    def show(self, n:int=20) -> pd.DataFrame:
+        '''get the n spans that took the most time outside of their child spans'''
+        return self.table().sort_values(by='selfWall', ascending=False).head(n)
+
+
+def importProfile(fn:str) -> pd.DataFrame:
+    '''import a profile table that was exported from spanProfiler'''
+    if fn.endswith('.json'):
+        with open(fn, 'r') as f:
+            return pd.DataFrame(json.load(f))
+    else:
+        df,_ = plainIm(fn, ic=None)
+        return df
+
+def compareProfiles(fn0:str, fn1:str) -> pd.DataFrame:
+    '''compare two exported profiles. ratio is the wall time in fn1 divided by the wall time in fn0'''
+    df0 = importProfile(fn0)
+    df1 = importProfile(fn1)
+    df = pd.merge(df0[['span', 'calls', 'wall', 'cpu']], df1[['span', 'calls', 'wall', 'cpu']], on='span', how='outer', suffixes=['_0', '_1'])
+    df['ratio'] = df['wall_1']/df['wall_0']
+    return df
+
+profiler = spanProfiler()    # shared profiler for the whole process
+
+
 class timeObject:
-    '''this gives functions to any subclass that let us track how long functions take'''
-    
+    '''this gives functions to any subclass that let us track how long functions take.
+    when the shared profiler is enabled, times are recorded as spans. otherwise, they are printed'''
+
     def __init__(self):
         return
-    
+
     def initializeTimeCounter(self, name:str):
-        self.timeCount = time.time()
+        self.timeCount = time.perf_counter()
+        self.cpuCount = time.process_time()
         self.timeName = name
-        
+
     def timeCounter(self, s:str):
+        '''record the time since the last call as an operation named s'''
         if not hasattr(self, 'timeCount'):
             self.initializeTimeCounter('')
-        tt = time.time()
-        print(f'{self.timeName} {(tt-self.timeCount):0.4f} seconds {s} ')
+        tt = time.perf_counter()
+        ct = time.process_time()
+        if profiler.enabled:
+            name = f'{self.timeName} {s}'.strip()
+            profiler.record(profiler.path(name), tt-self.timeCount, ct-self.cpuCount)
+        else:
+            print(f'{self.timeName} {(tt-self.timeCount):0.4f} seconds {s} ')
         self.timeCount = tt
-        
\ No newline at end of file
+        self.cpuCount = ct
+
+    def timeSpan(self, name:str):
+        '''context manager that times everything inside the with block as a span'''
+        return profiler.span(name)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+'''Functions for getting the metadata of many print folders at once'''
+
+# external packages
+import os, sys
+import traceback
+import logging
+from typing import List, Dict, Tuple, Union, Any, TextIO
+import re
+import pandas as pd
+import numpy as np
+
+# local packages
+currentdir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(currentdir)
+sys.path.append(os.path.dirname(currentdir))
+from tools.config import cfg
+import file.file_handling as fh
+from val.v_fluid import fluidVals
+from val.v_pressure import pressureVals
+from val.v_geometry import geometryVals
+from val.v_tables import valTables
+from val.v_print import printVals, sampleNames, findTension
+
+# logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+for s in ['matplotlib', 'imageio', 'IPython', 'PIL']:
+    logging.getLogger(s).setLevel(logging.WARNING)
+
+#----------------------------------------------
+
+metaList = ['shortname', 'days', 'rheModifier', 'surfactant', 'surfactantWt', 'diluent', 'diluentWt', 'dye', 'var', 'val', 'base', 'type']   # fluid composition, in the order of fluidVals.metarow
+rheList = ['tau0a', 'tau0d', 'Gstora', 'Gstord', 'eta0a', 'eta0d']    # rheology values in fluidVals.metarow
+rheUnits = {'tau0':'Pa', 'k':'Pa*s^n', 'n':'', 'eta0':'Pa*s', 'Gstor':'Pa'}
+fluidConstUnits = {'density':'g/mL', 'v':'mm/s','rate':'1/s','visc0':'Pa*s', 'CaInv':'','Re':'','WeInv':'','OhInv':'','dPRa':'mm', 'dPRd':'mm', 'Bma':'', 'Bmd':''}   # same as fluidVals.constants
+ratioList = ['viscRatio', 'tau0aRatio', 'tau0dRatio', 'GaRatio', 'GdRatio', 'GtaRatio', 'tGdRatio']
+
+
+class printValsBatch:
+    '''gets the printVals metarow for many print folders at once.
+    each fluid is looked up in the rheology and density tables once, and each ink and support pair in the surface tension table once.
+    those values are merged into the table of folders, and the dimensionless numbers are calculated for all folders at once.
+    pressure and geometry are read from each folder's meta file, the same way printVals reads them.
+    folders that this can't handle (e.g. missing fluid properties) are measured with printVals, so they give the same values or errors'''
+
+    def __init__(self, folders:List[str], fluidProperties:bool=True, printErrors:bool=True, printTraceback:bool=False, **kwargs):
+        self.folders = folders
+        self.fluidProperties = fluidProperties
+        self.printErrors = printErrors
+        self.printTraceback = printTraceback
+        self.kwargs = kwargs
+        self.tables = {}     # valTables for each print type
+        self.fluids = {}     # fluidVals for each print type, fluid, and ink or sup
+        self.sigmas = {}     # surface tension for each print type, ink, and support
+        self.errors = []
+        self.rows = {}       # metarow for each folder that was measured
+        self.printTypes = {} # print type for each folder that was measured
+
+    def addError(self, folder:str, e:Exception) -> None:
+        '''record a folder that could not be measured'''
+        self.errors.append({'folder':folder, 'error':e})
+        if self.printErrors:
+            print(e)
+        if self.printTraceback:
+            traceback.print_exc()
+
+    def valTable(self, printType:str) -> valTables:
+        '''get the fluid tables for the print type'''
+        if not printType in self.tables:
+            self.tables[printType] = valTables(printType)
+        return self.tables[printType]
+
+    def fluid(self, printType:str, name:str, ftype:str) -> fluidVals:
+        '''get the fluid, looking it up in the tables only the first time'''
+        key = (printType, name, ftype)
+        if not key in self.fluids:
+            self.fluids[key] = fluidVals(name, ftype, properties=self.fluidProperties, valTable=self.valTable(printType), **self.kwargs)
+        return self.fluids[key]
+
+    def sigma(self, printType:str, ink:str, sup:str, bn:str) -> float:
+        '''get the surface tension, looking it up in the table only the first time'''
+        key = (printType, ink, sup)
+        if not key in self.sigmas:
+            self.sigmas[key] = findTension(self.valTable(printType).sigmaDF(), self.fluid(printType, ink, 'ink'), self.fluid(printType, sup, 'sup'), bn)
+        return self.sigmas[key]
+
+    def folderRow(self, folder:str) -> dict:
+        '''get the values that come from the folder itself. returns an empty dict if printVals is needed for this folder'''
+        pfd = fh.printFileDict(folder)
+        bn, ink, sup = sampleNames(folder)
+        pfd.pxpmm()   # check the magnification, like printVals
+        row = {'folder':folder, 'printFolderR':os.path.relpath(folder, cfg.path.server), 'bn':bn, 'ink':ink, 'sup':sup,
+               'printType':pfd.printType, 'date':pfd.date, 'fluFile':len(pfd.timeSeries)>0}
+        if pfd.printType in ['tripleLine', 'singleDisturb', 'SDT']:
+            split = re.split('_', os.path.basename(pfd.printFolder))
+            if len(split)<=1:
+                return {}
+            if 'disturbXS' in folder:
+                row['spacing'] = float(split[3])
+            else:
+                row['spacing'] = float(split[2])
+        inkf = self.fluid(pfd.printType, ink, 'ink')
+        supf = self.fluid(pfd.printType, sup, 'sup')
+        if self.fluidProperties and not all([hasattr(f, 'rheUnits') and hasattr(f, 'density') for f in [inkf, supf]]):
+            return {}
+        row['sigma'] = self.sigma(pfd.printType, ink, sup, bn)
+        if row['sigma'] is None:
+            return {}
+        press = pressureVals(folder, pfd=pfd)
+        geo = geometryVals(folder, pfd=pfd)
+        row['calibFile'] = press.calibFile
+        row['pressure'] = press.metarow()
+        for s in ['vink', 'vsup']:
+            row[s] = press.__dict__[s]
+        for s in ['di', 'do', 'lBath']:
+            row[s] = geo.__dict__[s]
+        return row
+
+    def fluidTable(self, ftype:str) -> pd.DataFrame:
+        '''table of fluid values to merge into the folder table, with columns named ftype_value'''
+        rows = []
+        for (printType, name, ft),f in self.fluids.items():
+            if not ft==ftype:
+                continue
+            row = {'printType':printType, ftype:name}
+            for s in metaList+rheList+['kd', 'nd', 'density']:
+                if hasattr(f, s):
+                    row[f'{ftype}_{s}'] = getattr(f, s)
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def fluidConstants(self, df:pd.DataFrame, tag:str, v:pd.Series, diam:pd.Series) -> None:
+        '''calculate the columns that fluidVals.constants calculates, for all folders at once'''
+        df[f'{tag}v'] = v
+        df[f'{tag}rate'] = v/diam
+        if not self.fluidProperties:
+            return
+        rate = df[f'{tag}rate'].astype(float)
+        kd = df[f'{tag}kd'].astype(float)
+        nd = df[f'{tag}nd'].astype(float)
+        tau0d = df[f'{tag}tau0d'].astype(float)
+        density = df[f'{tag}density'].astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            visc0 = (kd*(rate.abs()**(nd-1)) + tau0d/(rate.abs())).where(rate>0, -1)
+            df[f'{tag}visc0'] = visc0
+            df[f'{tag}CaInv'] = df.sigma/(visc0*v)
+            df[f'{tag}Re'] = 10**-3*(density*v*diam)/(visc0)
+            df[f'{tag}WeInv'] = 10**3*df.sigma/(density*v**2*diam)
+            df[f'{tag}OhInv'] = np.sqrt(df[f'{tag}WeInv'])*df[f'{tag}Re']
+            for dire in ['a', 'd']:
+                tau0 = df[f'{tag}tau0{dire}'].astype(float)
+                df[f'{tag}dPR{dire}'] = df.sigma/tau0
+                df[f'{tag}Bm{dire}'] = tau0*diam/(visc0*v)
+
+    def constants(self, df:pd.DataFrame) -> None:
+        '''calculate the columns that printVals.const calculates, for all folders at once'''
+        df['sigma'] = df.sigma.astype(float)
+        self.fluidConstants(df, 'ink_', df.vink.astype(float), df['di'].astype(float))
+        self.fluidConstants(df, 'sup_', df.vsup.astype(float), df['do'].astype(float))
+        df['vRatio'] = df.ink_v/df.sup_v
+        df['dEst'] = df['di']*np.sqrt(df.vRatio)
+        if not self.fluidProperties:
+            return
+        for s,(i,j) in {'viscRatio':('visc0', 'visc0'), 'tau0aRatio':('tau0a', 'tau0a'), 'tau0dRatio':('tau0d', 'tau0d'), 'GaRatio':('Gstora', 'Gstora'),
+                        'GdRatio':('Gstord', 'Gstord'), 'GtaRatio':('Gstora', 'tau0a'), 'tGdRatio':('tau0d', 'Gstord')}.items():
+            df[s] = df[f'ink_{i}'].astype(float)/df[f'sup_{j}'].astype(float)
+        ddiff = df.ink_density.astype(float)-df.sup_density.astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for dire in ['a', 'd']:
+                df[f'rGrav{dire}'] = (10**6*(df[f'sup_tau0{dire}'].astype(float))/((ddiff)*9.8)).where(ddiff.abs()>0, 0)
+                for tag in ['ink_', 'sup_']:
+                    df[f'{tag}dnormInv{dire}'] = df[f'{tag}dPR{dire}']/df.dEst
+            df['int_Re'] = 10**-3*(df.ink_density.astype(float)*df.ink_v*df['di'])/(df.sup_visc0)
+            df['ReRatio'] = df.ink_Re/df.sup_Re
+            l = df.lBath
+            dn = 2*np.sqrt(df['do']*l/np.pi)
+            Kn = 1/3+2/3*np.sqrt(np.pi)/2
+            df['hDragP'] = 3*np.pi*df.sup_visc0*df.sup_v*(dn*Kn)/(df['do']*l)
+            df['vDragP'] = 3*df.sup_visc0*df.sup_v*4/(df['do'])
+            df['int_CaInv'] = df.sigma/(df.sup_visc0*df.ink_v)
+
+    def fluidRow(self, r:pd.Series, tag:str) -> Tuple[dict, dict]:
+        '''get the metarow of one fluid, in the same order as fluidVals.metarow'''
+        out = {f'{tag}{s}':r[f'{tag}{s}'] for s in metaList}
+        units = {f'{tag}{s}':'' for s in metaList}
+        if self.fluidProperties:
+            for s in rheList:
+                out[f'{tag}{s}'] = r[f'{tag}{s}']
+                units[f'{tag}{s}'] = rheUnits[s[:-1]]
+        clist = list(fluidConstUnits)
+        if self.fluidProperties:
+            clist = clist+['dnormInva', 'dnormInvd']
+        for s in clist:
+            c = f'{tag}{s}'
+            out[c] = r[c] if (c in r and not (s=='density' and not self.fluidProperties)) else ''
+            units[c] = fluidConstUnits.get(s, '')
+        units[f'{tag}val'] = r[f'{tag}var']
+        return out, units
+
+    def metarow(self, r:pd.Series) -> Tuple[dict, dict]:
+        '''get the metarow for one folder, in the same order as printVals.metarow'''
+        meta = {s:r[s] for s in ['printFolderR', 'bn', 'date', 'sigma', 'fluFile', 'calibFile']}
+        units = {'printFolderR':'', 'bn':'', 'date':'yymmdd', 'sigma':'mN/m', 'fluFile':'', 'calibFile':''}
+        clist = ['date'] + (['spacing'] if 'spacing' in r and not pd.isna(r['spacing']) else []) + ['sigma', 'vRatio', 'dEst']
+        cunits = {'date':'yymmdd', 'spacing':'$d_{est}$', 'sigma':'mN/m', 'vRatio':'', 'dEst':'mm'}
+        if self.fluidProperties:
+            clist = clist + ratioList + ['rGrava', 'rGravd', 'int_Re', 'ReRatio', 'hDragP', 'vDragP', 'int_CaInv']
+            cunits = {**cunits, **{s:'' for s in ratioList}, 'rGrava':'mm', 'rGravd':'mm', 'int_Re':'', 'ReRatio':'', 'hDragP':'Pa', 'vDragP':'Pa', 'int_CaInv':''}
+        const = {s:r[s] for s in clist}
+        pvals, punits = r['pressure']
+        inkvals, inkunits = self.fluidRow(r, 'ink_')
+        supvals, supunits = self.fluidRow(r, 'sup_')
+        out = {**meta, **const, **pvals, **inkvals, **supvals}
+        units = {**units, **{s:cunits[s] for s in clist}, **punits, **inkunits, **supunits}
+        return out, units
+
+    def printValsRow(self, folder:str) -> Tuple[dict, dict]:
+        '''get the metarow for one folder using printVals'''
+        pfd = fh.printFileDict(folder)
+        pv = printVals(folder, fluidProperties=self.fluidProperties, pfd=pfd, valTable=self.valTable(pfd.printType), **self.kwargs)
+        self.printTypes[folder] = pfd.printType
+        return pv.metarow()
+
+    def run(self) -> Tuple[pd.DataFrame, dict]:
+        '''get the metarow table for all of the folders, in the same order as the list of folders, and the units of each column'''
+        self.errors = []
+        self.printTypes = {}
+        rows = []
+        slow = []
+        for folder in self.folders:
+            try:
+                row = self.folderRow(folder)
+            except KeyboardInterrupt as e:
+                raise e
+            except Exception as e:
+                self.addError(folder, e)
+                continue
+            if len(row)==0:
+                slow.append(folder)
+            else:
+                rows.append(row)
+                self.printTypes[folder] = row['printType']
+
+        out = {}
+        units = {}
+        if len(rows)>0:
+            df = pd.DataFrame(rows)
+            for ftype in ['ink', 'sup']:
+                df = df.merge(self.fluidTable(ftype), on=['printType', ftype], how='left')
+            self.constants(df)
+            for _,r in df.iterrows():
+                out[r['folder']], u = self.metarow(r)
+                units = {**units, **u}
+        for folder in slow:
+            try:
+                out[folder], u = self.printValsRow(folder)
+                units = {**units, **u}
+            except KeyboardInterrupt as e:
+                raise e
+            except Exception as e:
+                self.addError(folder, e)
+        self.rows = dict([[f, out[f]] for f in self.folders if f in out])
+        self.table = pd.DataFrame(list(self.rows.values()))
+        self.units = units
+        logging.info(f'Built metadata for {len(out)} of {len(self.folders)} folders, {len(slow)} with printVals, {len(self.errors)} errors')
+        return self.table, self.units
@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+'''Functions for storing the metadata of many print folders in a local database, so folders can be selected by their values'''
+
+# external packages
+import os, sys
+import traceback
+import logging
+from typing import List, Dict, Tuple, Union, Any, TextIO
+import sqlite3
+import pandas as pd
+import numpy as np
+
+# local packages
+currentdir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(currentdir)
+sys.path.append(os.path.dirname(currentdir))
+from tools.config import cfg
+import file.file_handling as fh
+from val.v_print import printVals
+from val.v_batch import printValsBatch
+
+# logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+for s in ['matplotlib', 'imageio', 'IPython', 'PIL']:
+    logging.getLogger(s).setLevel(logging.WARNING)
+
+#----------------------------------------------
+
+indexCols = ['printType', 'date', 'bn', 'spacing', 'vRatio', 'viscRatio',
+             'ink_shortname', 'sup_shortname', 'ink_base', 'sup_base', 'ink_val', 'sup_val', 'ink_visc0', 'sup_visc0', 'ink_v', 'sup_v']   # columns that get an index when they first appear
+
+def sqlValue(v:Any) -> Any:
+    '''convert a metarow value to something sqlite can store. empty strings and nan become NULL'''
+    if isinstance(v, (bool, np.bool_)):
+        return int(v)
+    if isinstance(v, (int, np.integer)):
+        return int(v)
+    if isinstance(v, (float, np.floating)):
+        if np.isnan(v):
+            return None
+        return float(v)
+    if v is None or (type(v) is str and len(v)==0):
+        return None
+    return str(v)
+
+def quote(col:str) -> str:
+    '''quote a column name for sql'''
+    return '"'+col.replace('"', '""')+'"'
+
+def tableFiles() -> List[str]:
+    '''get the rheology, density, and surface tension tables that metarow values come from'''
+    out = []
+    for s in ['rheTable', 'densityTable', 'sigmaTable']:
+        if s in cfg.path:
+            out = out+[f for f in cfg.path[s].values() if type(f) is str]
+    return out
+
+def tableStamp() -> str:
+    '''get a string that changes when any of the fluid tables change'''
+    return ';'.join([str(os.stat(f).st_mtime_ns) if os.path.exists(f) else '' for f in tableFiles()])
+
+def folderStamp(folder:str, tables:str='') -> str:
+    '''get a string that changes when files are added to the print folder, the meta file is rewritten, or the fluid tables change.
+    tables is the stamp from tableStamp. if empty, it is found here'''
+    times = [os.stat(folder).st_mtime_ns]
+    for f in os.listdir(folder):
+        if f.endswith('.csv') and ('meta' in f or 'speeds' in f):
+            times.append(os.stat(os.path.join(folder, f)).st_mtime_ns)
+    if len(tables)==0:
+        tables = tableStamp()
+    return f'{max(times)}|{tables}'
+
+
+class metaCatalog:
+    '''holds the metarow of every print folder in a sqlite database, so folders can be selected by ink, support, speed, or geometry with one query.
+    fn is the database file. if empty, use metaCatalog.sqlite in the local figure folder, because sqlite locking is unreliable on network shares like the server folder.
+    rows are only rebuilt for folders whose files or fluid tables changed since the last refresh'''
+
+    def __init__(self, fn:str=''):
+        if len(fn)==0:
+            if not os.path.exists(cfg.path.fig):
+                os.makedirs(cfg.path.fig)
+            fn = os.path.join(cfg.path.fig, 'metaCatalog.sqlite')
+        self.fn = fn
+        self.errors = []
+        self.conn = sqlite3.connect(self.fn)
+        self.conn.execute('CREATE TABLE IF NOT EXISTS folders (printFolderR TEXT PRIMARY KEY, printType TEXT, stamp TEXT)')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS units (col TEXT PRIMARY KEY, unit TEXT)')
+        self.index('printType')
+        self.conn.commit()
+
+    def close(self) -> None:
+        '''close the database'''
+        self.conn.close()
+
+    def columns(self) -> List[str]:
+        '''get the list of columns in the folders table'''
+        return [row[1] for row in self.conn.execute('PRAGMA table_info(folders)')]
+
+    def units(self) -> dict:
+        '''get the units of each column'''
+        return dict(self.conn.execute('SELECT col, unit FROM units').fetchall())
+
+    def stamps(self) -> dict:
+        '''get the stamp stored for each folder'''
+        return dict(self.conn.execute('SELECT printFolderR, stamp FROM folders').fetchall())
+
+    def addColumns(self, row:dict) -> None:
+        '''add any columns in the row that are not in the table yet, and index them if they are in indexCols'''
+        existing = set(self.columns())
+        for col in row:
+            if not col in existing:
+                self.conn.execute(f'ALTER TABLE folders ADD COLUMN {quote(col)}')   # no type, so each value keeps the type it was stored with
+                existing.add(col)
+                if col in indexCols:
+                    self.index(col)
+
+    def index(self, col:str) -> None:
+        '''create an index on the column, so queries that filter on it do not scan the whole table'''
+        self.conn.execute(f'CREATE INDEX IF NOT EXISTS {quote("idx_"+col)} ON folders ({quote(col)})')
+
+    def addRow(self, meta:dict, units:dict, printType:str, stamp:str) -> None:
+        '''add or replace the row for a folder. meta is the output of printVals.metarow'''
+        row = {'printFolderR':meta['printFolderR'], 'printType':printType, 'stamp':stamp}
+        for key,val in meta.items():
+            if not key in row:
+                row[key] = sqlValue(val)
+        self.addColumns(row)
+        cols = list(row.keys())
+        self.conn.execute(f'INSERT OR REPLACE INTO folders ({",".join([quote(c) for c in cols])}) VALUES ({",".join(["?"]*len(cols))})', [row[c] for c in cols])
+        self.conn.executemany('INSERT OR REPLACE INTO units (col, unit) VALUES (?,?)', [(key, str(u)) for key,u in units.items()])
+
+    def addFolder(self, folder:str, stamp:str='', **kwargs) -> None:
+        '''measure the metadata for one print folder and store it'''
+        if len(stamp)==0:
+            stamp = folderStamp(folder)
+        pv = printVals(folder, **kwargs)
+        meta, units = pv.metarow()
+        self.addRow(meta, units, pv.pfd.printType, stamp)
+
+    def refresh(self, folders:Union[str, list, fh.folderCatalog], mustMatch:list=[], canMatch:list=[], prune:bool=True,
+                printErrors:bool=True, printTraceback:bool=False, **kwargs) -> list:
+        '''add or update the rows for all print folders in folders, which can be a top folder, a list of folders, or a folderCatalog.
+        only folders whose stamp changed are measured again. the stamp includes the fluid tables, so if the tables changed, each folder is measured again the next time it is refreshed.
+        if prune and there are no mustMatch or canMatch strings, remove rows for folders inside a top folder that no longer exist.
+        returns a list of folders that could not be measured, with their errors'''
+        if type(folders) is list:
+            found = []
+            for folder in folders:
+                found = found + fh.printFolders(folder, mustMatch=mustMatch, canMatch=canMatch)
+        else:
+            found = fh.printFolders(folders, mustMatch=mustMatch, canMatch=canMatch)
+        tables = tableStamp()
+        old = self.stamps()
+        self.errors = []
+        changed = {}
+        for folder in found:
+            try:
+                stamp = folderStamp(folder, tables)
+            except KeyboardInterrupt as e:
+                raise e
+            except Exception as e:
+                self.errors.append({'folder':folder, 'error':e})
+                if printErrors:
+                    print(e)
+                if printTraceback:
+                    traceback.print_exc()
+                continue
+            if not old.get(os.path.relpath(folder, cfg.path.server), '')==stamp:
+                changed[folder] = stamp
+
+        # measure all of the changed folders at once
+        batch = printValsBatch(list(changed), printErrors=printErrors, printTraceback=printTraceback, **kwargs)
+        _, units = batch.run()
+        for folder,meta in batch.rows.items():
+            self.addRow(meta, units, batch.printTypes[folder], changed[folder])
+        self.errors = self.errors + batch.errors
+        measured = len(batch.rows)
+        if prune and len(mustMatch)==0 and len(canMatch)==0 and not type(folders) is list:
+            self.prune(folders, found)
+        self.conn.commit()
+        logging.info(f'Refreshed metadata catalog: measured {measured} of {len(found)} folders, {len(self.errors)} errors')
+        return self.errors
+
+    def prune(self, topFolder:Union[str, fh.folderCatalog], found:List[str]) -> None:
+        '''remove rows for folders in the top folder that were not found'''
+        if isinstance(topFolder, fh.folderCatalog):
+            topFolder = topFolder.topFolder
+        top = os.path.relpath(topFolder, cfg.path.server)
+        keep = set([os.path.relpath(f, cfg.path.server) for f in found])
+        for rel in list(self.stamps()):
+            inside = (top=='.' or rel==top or rel.startswith(top+os.sep)) and not rel.startswith('..')
+            if inside and not rel in keep:
+                self.conn.execute('DELETE FROM folders WHERE printFolderR=?', (rel,))
+
+    def where(self, printType:str='', ranges:dict={}, equals:dict={}) -> Tuple[str, list]:
+        '''build a where clause.
+        ranges is a dictionary of column:(min, max). use None for an open end.
+        equals is a dictionary of column:value or column:list of values'''
+        cols = set(self.columns())
+        clauses = []
+        params = []
+        if len(printType)>0:
+            equals = {**equals, 'printType':printType}
+        for col in list(ranges)+list(equals):
+            if not col in cols:
+                raise ValueError(f'Column {col} is not in the metadata catalog')
+        for col,(lo,hi) in ranges.items():
+            if lo is not None:
+                clauses.append(f'{quote(col)}>=?')
+                params.append(lo)
+            if hi is not None:
+                clauses.append(f'{quote(col)}<=?')
+                params.append(hi)
+        for col,val in equals.items():
+            if type(val) is list:
+                clauses.append(f'{quote(col)} IN ({",".join(["?"]*len(val))})')
+                params = params+val
+            else:
+                clauses.append(f'{quote(col)}=?')
+                params.append(val)
+        if len(clauses)==0:
+            return '', params
+        return ' WHERE '+' AND '.join(clauses), params
+
+    def query(self, sql:str, params:list=[]) -> pd.DataFrame:
+        '''run any select statement on the catalog'''
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def select(self, printType:str='', ranges:dict={}, equals:dict={}, cols:List[str]=[]) -> pd.DataFrame:
+        '''get the rows that match, e.g. select('SDT', ranges={'ink_visc0':(1,10), 'vRatio':(1,1)}).
+        cols is the list of columns to return. if empty, return all'''
+        w, params = self.where(printType, ranges, equals)
+        c = ','.join([quote(s) for s in cols]) if len(cols)>0 else '*'
+        return self.query(f'SELECT {c} FROM folders{w} ORDER BY printFolderR', params)
+
+    def folders(self, printType:str='', ranges:dict={}, equals:dict={}) -> List[str]:
+        '''get the full paths of the print folders that match'''
+        df = self.select(printType, ranges, equals, cols=['printFolderR'])
+        return [os.path.join(cfg.path.server, f) for f in df.printFolderR]
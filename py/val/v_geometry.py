@@ -82,9 +82,10 @@ class geometryVals:
         '''find the metadata file. returns 0 if successful'''
         if not hasattr(self.pfd, 'meta') or len(self.pfd.meta)==0:
             return 1
-        file = self.pfd.metaFile()
+        meta = self.pfd.metaRecord()
+        file = meta.file
         bn = fh.twoBN(file)
-        d,u = plainImDict(file, unitCol=1, valCol=2)
+        d,u = meta.values, meta.units
   
         self.searchValues('di',['&nid','nozzle_inner_diameter', 'nozzle_0_diameter'], d, u, bn, file)
         self.searchValues('do', ['&nd', 'nozzle_outer_diameter'], d, u, bn, file)
@@ -122,8 +122,9 @@ class pressureVals:
             vf = float(spl[i+1])
         else:
             return
-        mf = self.pfd.metaFile()
-        v,u = plainImDict(mf, unitCol=1, valCol=2)
+        meta = self.pfd.metaRecord()
+        mf = meta.file
+        v,u = dict(meta.values), dict(meta.units)
         if vf==v['ink_speed_channel_0']:
             return
         v['ink_speed_channel_0']=vf
@@ -142,14 +143,16 @@ class pressureVals:
         v['ink_pressure_channel_0'] = p
         shutil.copyfile(mf, mf.replace('meta', 'metOrig'))
         plainExpDict(mf, v, u, quotechar='"')
+        self.pfd.resetMeta()
     
     def importMetaFile(self) -> int:
         '''find the metadata file. returns 0 if successful'''
         self.correctVF()
-        file = self.pfd.metaFile()
+        meta = self.pfd.metaRecord()
+        file = meta.file
         if len(file)==0:
             return 1
-        v,u = plainImDict(self.pfd.metaFile(), unitCol=1, valCol=2)
+        v,u = meta.values, meta.units
         for s in ['a', 'b', 'c']:
             # calib params
             for s1 in [f'calib{s}_channel_{self.channel}', f'calib{s}']:
@@ -263,8 +266,9 @@ class pressureVals:
         
     def changeFit(self):
         '''change the pressure vs speed model used in progDims and measurements for a single folder'''
-        mf = self.pfd.meta[0]
-        meta,u = plainImDict(mf, unitCol=1, valCol=2)
+        rec = self.pfd.metaRecord()
+        mf = rec.file
+        meta,u = dict(rec.values), dict(rec.units)
         if meta['caliba_channel_0'] == self.caliba and meta['calibb_channel_0'] == self.calibb and meta['calibc_channel_0'] == self.calibc:
             return
         meta['caliba_channel_0'] = self.caliba
@@ -272,6 +276,7 @@ class pressureVals:
         meta['calibc_channel_0'] = self.calibc
         shutil.copyfile(mf, mf.replace('meta', 'metOrig'))
         plainExpDict(mf, meta, u, quotechar='"')
+        self.pfd.resetMeta()
         return
   
     def getFitFromCalib(self, calibFile:str) -> dict:
@@ -32,6 +32,45 @@ for s in ['matplotlib', 'imageio', 'IPython', 'PIL']:
 
 #----------------------------------------------
 
+def sampleNames(printFolder:str) -> Tuple[str, str, str]:
+    '''get the sample name, ink short name, and support short name from the folder name'''
+    fi = printFolder
+    fi0 = ''
+    while not fh.sampleInName(fi) and not fi0==fi:
+        fi0 = fi
+        fi = os.path.dirname(fi)
+    if fi0==fi:
+        # no sample folder found
+        for f in os.listdir(printFolder):
+            if '_I_' in f and '_S_' in f:
+                spl = re.split('I_', f)[1]
+                spl = re.split('_', spl)
+                return f'I_{spl[0]}_S_{spl[2]}', spl[0], spl[2]
+        raise ValueError(f'Could not find sample name for {printFolder}')
+    else:
+        # sample folder found
+        bn = os.path.basename(os.path.dirname(fi))
+        split = re.split('_', bn)
+        return bn, split[1], split[3]
+    
+def findTension(sigt:pd.DataFrame, ink:fluidVals, sup:fluidVals, bn:str) -> float:
+    '''find the surface tension between the ink and support in the surface tension table. returns None if there is none'''
+    criterion = sigt.ink_base==ink.base
+    fluids = {'ink':ink, 'sup':sup}
+    for s in ['sup_base', 'ink_surfactant', 'ink_surfactantWt', 'sup_surfactant']:
+        if s in sigt:
+            spl = re.split('_', s)
+            criterion = criterion&(sigt[s]==getattr(fluids[spl[0]], spl[1]))
+    entry = sigt[criterion]
+    if len(entry)==0:
+        print(sigt)
+        logging.error(f'No surface tension fit found for fluid {bn}')
+        return
+    if len(entry)>1:
+        logging.error(f'Multiple surface tension fits found for fluid {bn}')
+    entry = entry.iloc[0]
+    return entry['sigma'] # mN/m
+
 class printVals:
     '''class that holds info about the experiment'''
     
@@ -90,27 +129,7 @@ class printVals:
         
     def findSampleName(self):
         '''determine the sample name from the folder name'''
-        fi = self.printFolder
-        fi0 = ''
-        while not fh.sampleInName(fi) and not fi0==fi:
-            fi0 = fi
-            fi = os.path.dirname(fi)
-        if fi0==fi:
-            # no sample folder found
-            for f in os.listdir(self.printFolder):
-                if '_I_' in f and '_S_' in f:
-                    spl = re.split('I_', f)[1]
-                    spl = re.split('_', spl)
-                    self.inkShortName = spl[0]
-                    self.supShortName = spl[2]
-                    self.bn = f'I_{self.inkShortName}_S_{self.supShortName}'
-                    return
-        else:
-            # sample folder found
-            self.bn = os.path.basename(os.path.dirname(fi))
-            split = re.split('_', self.bn)
-            self.inkShortName = split[1]
-            self.supShortName = split[3]
+        self.bn, self.inkShortName, self.supShortName = sampleNames(self.printFolder)
   
     def const(self) -> None:
         '''define dimensionless numbers and critical values'''
@@ -236,21 +255,10 @@ class printVals:
     
     def tension(self) -> float:
         '''pull the surface tension from a table'''
-        sigt = self.valTable.sigmaDF()
-        criterion = sigt.ink_base==self.ink.base
-        for s in ['sup_base', 'ink_surfactant', 'ink_surfactantWt', 'sup_surfactant']:
-            if s in sigt:
-                spl = re.split('_', s)
-                criterion = criterion&(sigt[s]==getattr(getattr(self, spl[0]), spl[1]))
-        entry = sigt[criterion]
-        if len(entry)==0:
-            print(sigt)
-            logging.error(f'No surface tension fit found for fluid {self.bn}')
+        sigma = findTension(self.valTable.sigmaDF(), self.ink, self.sup, self.bn)
+        if sigma is None:
             return
-        if len(entry)>1:
-            logging.error(f'Multiple surface tension fits found for fluid {self.bn}')
-        entry = entry.iloc[0]
-        self.sigma = entry['sigma'] # mN/m
+        self.sigma = sigma # mN/m
         self.constUnits['sigma'] = 'mN/m'
         return self.sigma
     
@@ -263,8 +271,9 @@ class printVals:
 class pvSingle(printVals):
     '''class that holds info about single line experiments'''
     
-    def __init__(self, folder:str, di:float=cfg.const.di, do:float=cfg.const.do):
-        super(pvSingle, self).__init__(folder, di=di, do=do)
+    def __init__(self, folder:str, di:float=0, do:float=0):
+        '''di and do default to the values in the config'''
+        super(pvSingle, self).__init__(folder, di=(di if di>0 else cfg.const.di), do=(do if do>0 else cfg.const.do))
         self.units = {'bn':'','folder':'','date':'YYMMDD','di':'mm','do':'mm', 'sigma':'mN/m', 'fluFile':'', 'calibFile':''}
         if '3day' in folder:
             # 3 days
@@ -423,8 +432,9 @@ class pvSingle(printVals):
 class pvTriple(printVals):
     '''class that holds info about triple line experiments'''
     
-    def __init__(self, folder:str, di:float=cfg.const.di, do:float=cfg.const.do):
-        super().__init__(folder, di=di, do=do)
+    def __init__(self, folder:str, di:float=0, do:float=0):
+        '''di and do default to the values in the config'''
+        super().__init__(folder, di=(di if di>0 else cfg.const.di), do=(do if do>0 else cfg.const.do))
         self.units = {'bn':'','folder':'','date':'YYMMDD','di':'mm','do':'mm', 'sigma':'mN/m', 'fluFile':'', 'calibFile':''}
 
 
@@ -20,9 +20,12 @@ sys.path.append(os.path.dirname(currentdir))
 from val.v_print import printVals
 from im.imshow import imshow
 import im.morph as vm
+from im.s_segmenter import segmenter
 from tools.config import cfg
 from tools.plainIm import *
 from file.file_handling import isSubFolder
+from vid.v_tools import vidData
+from vid.noz_detect import nozData
 import metrics.m_single as me
 
 # logging
@@ -35,29 +38,30 @@ for s in ['matplotlib', 'imageio', 'IPython', 'PIL']:
 #----------------------------------------------
 
 
-class singleVidData:
+class singleVidData(vidData):
     '''holds metadata and tables about video'''
     
-    def __init__(self, folder:str, pxpmm:float=cfg.const.pxpmm):
-        self.folder = folder
-        self.nozData = nozData(folder)
+    def __init__(self, folder:str, pxpmm:float=0):
+        '''pxpmm defaults to the value from the camera magnification in the meta file'''
         self.pv = printVals(folder) # object that holds metadata about folder
-        self.file = self.pv.vidFile()    # video file
-        self.measures = []
-        self.measuresUnits = []
+        super().__init__(folder, pfd=self.pv.pfd)   # video file, stream, and frame error
+        self.nozData = nozData(folder, pfd=self.pfd)
         self.nozMask = []
         self.prog = []
-        self.streamOpen = False
-        self.pxpmm = pxpmm
-        self.importNozzleDims() # if the pxpmm was defined in file, this will adopt the pxpmm from file
+        if pxpmm>0:
+            self.pxpmm = pxpmm
         if not os.path.exists(self.file):
             # file does not exist
             return   
         pg = self.getProgDims()
         if pg>0:
             return
-        self.defineCritVals()  
         
+    def __getattr__(self, s):
+        '''lets us probe the nozData object held inside of this object, e.g. xL, yB, maskNozzle'''
+        if s=='nozData':
+            raise AttributeError(s)
+        return getattr(self.nozData, s)
         
     def getVertFrame(self, time:float) -> np.ndarray:
         '''obtain frame and crop to nozzle width'''
@@ -121,10 +125,9 @@ class singleVidData:
         if len(self.nozMask)==0:
             self.detectNozzle()
             
-        # get the frame
-        self.openStream()
-        frame = self.getFrameAtTime(time)
-        self.closeStream()
+        # get the frame, from the stream that is already open if this is part of a measurement session
+        with self.borrowStream():
+            frame = self.getFrameAtTime(time)
         
         # mask the nozzle
         frame2 = self.maskNozzle(frame, dilate=20, ave=True, **kwargs)
@@ -148,15 +151,15 @@ class singleVidData:
         
         # segment the filament out
         acrit = 1000    # minimum area for segmentation
-        filled, markers, finalAt = vm.segmentInterfaces(frame2, acrit=acrit, diag=(diag>1), **kwargs)
-        df = vm.markers2df(markers) # convert to dataframe
+        seg = segmenter(frame2, acrit=acrit, diag=max(0, diag-1), **kwargs)
+        df = seg.df     # table of labeled components
         df = df[df.a>acrit]
         if len(df)==0:
             # nothing detected
             return {},{}
         
         filI = df.a.idxmax()                                       # index of filament label, largest remaining object
-        componentMask = (markers[1] == filI).astype("uint8") * 255 # get largest object
+        componentMask = (seg.labeledIm == filI).astype("uint8") * 255 # get largest object
         componentMask = vm.openMorph(componentMask, 5)             # remove burrs
         contours = cv.findContours(componentMask,cv.RETR_TREE,cv.CHAIN_APPROX_SIMPLE)  # get filament outline
         if int(cv.__version__[0])>=4:
@@ -225,7 +228,7 @@ class singleVidData:
     
     def vidMeasuresFN(self, tag) -> str:
         '''file name for video measurement table'''
-        return os.path.join(self.pv.folder, f'{os.path.basename(self.pv.folder)}_vid{tag}Measures.csv')
+        return os.path.join(self.folder, f'{os.path.basename(self.folder)}_vid{tag}Measures.csv')
         
         
     def measureVideoHoriz(self, diag:int=0, overwrite:int=0, **kwargs) -> Tuple[pd.DataFrame, dict]:
@@ -241,25 +244,27 @@ class singleVidData:
             return
         out = []
         units = []
-        for s in ['horiz0', 'horiz1', 'horiz2']:
-            row = (self.prog[self.prog.name==s])
-            t0 = row.iloc[0]['t0']
-            tf = row.iloc[0]['tf']
-            dt = tf-t0
-            # iterate through times inside of this line
-            for f in np.linspace(0.3,0.9,num=20):
-                t = t0+dt*f
-                if f==0.9:
-                    d = diag
-                else:
-                    d = diag-1
-                try:
-                    framerow, u = self.measureHorizFrame(t, s, f, diag=d, **kwargs)  # measure the frame
-                except:
-                    traceback.print_exc()
-                if len(framerow)>0:
-                    out.append(framerow)
-                    units = u
+        with self.borrowStream():    # open the video once for all of the frames
+            for s in ['horiz0', 'horiz1', 'horiz2']:
+                row = (self.prog[self.prog.name==s])
+                t0 = row.iloc[0]['t0']
+                tf = row.iloc[0]['tf']
+                dt = tf-t0
+                # iterate through times inside of this line
+                for f in np.linspace(0.3,0.9,num=20):
+                    t = t0+dt*f
+                    if f==0.9:
+                        d = diag
+                    else:
+                        d = diag-1
+                    try:
+                        framerow, u = self.measureHorizFrame(t, s, f, diag=d, **kwargs)  # measure the frame
+                    except:
+                        traceback.print_exc()
+                        framerow = {}
+                    if len(framerow)>0:
+                        out.append(framerow)
+                        units = u
                     
         # store table in object
         self.measures = pd.DataFrame(out)
@@ -369,18 +374,19 @@ class singleVidData:
             logging.error(f'Error detecting nozzle in {self.folder}')
 #             traceback.print_exc()
             return self.folder
-        if measureHoriz:
-            # measure horizontal lines
-            self.measureVideoHoriz(diag=diag, **kwargs)
-        if measureXS:
-            # measure xs
-            self.measureVideoXS(diag=diag, **kwargs)
-        if exportVert:
-            # export stills of vertical lines
-            self.exportStillVerts(diag=diag, **kwargs)
-        if exportHoriz:
-            # export stills of horizontal lines
-            self.exportStillHoriz(diag=diag, **kwargs)
+        with self.borrowStream():   # share one open video between all of the measurements
+            if measureHoriz:
+                # measure horizontal lines
+                self.measureVideoHoriz(diag=diag, **kwargs)
+            if measureXS:
+                # measure xs
+                self.measureVideoXS(diag=diag, **kwargs)
+            if exportVert:
+                # export stills of vertical lines
+                self.exportStillVerts(diag=diag, **kwargs)
+            if exportHoriz:
+                # export stills of horizontal lines
+                self.exportStillHoriz(diag=diag, **kwargs)
         return ''
         
         
@@ -23,6 +23,7 @@ from im.imshow import imshow
 import im.morph as vm
 import im.crop as vc
 from tools.config import cfg
+from tools.imWriter import writer
 from tools.plainIm import *
 import file.file_handling as fh
 from v_tools import vidData
@@ -68,24 +69,28 @@ class background:
     def exportBackground0(self, diag:int=0):
         '''export the background image to file'''
         fn = self.backgroundFN()
-        cv.imwrite(fn, self.background)
+        writer.write(fn, self.background)
+        writer.flush()
         logging.info(f'Exported {fn}')
         if diag>0:
             imshow(self.background)
             
-    def exportBackground(self, overwrite:bool=False, diag:int=0, flip:bool=False, frameAve:bool=True, curveFit:bool=False, **kwargs) -> None:
-        '''create a background file'''
+    def exportBackground(self, overwrite:bool=False, diag:int=0, flip:bool=False, frameAve:bool=True, curveFit:bool=False, stream:bool=False, **kwargs) -> None:
+        '''create a background file. stream=True to read frames one at a time, so many frames (numpics) can be used without holding them all in memory'''
         fn = self.backgroundFN()
         if not os.path.exists(fn) or overwrite:
             if frameAve:
                 if 'mode' in kwargs:
                     self.mode = kwargs.pop('mode')
 
-                self.background = self.fs.frame(mode=self.mode, diag=diag-1, overwrite=True, flip=flip, **kwargs)
+                self.background = self.fs.frame(mode=self.mode, diag=diag-1, overwrite=True, flip=flip, stream=stream, **kwargs)
                 self.background = cv.medianBlur(self.background, 11)
             else:
                 backSub = cv.createBackgroundSubtractorMOG2()
-                frames = self.fs.getFrames(diag=diag-1, overwrite=True, flip=flip, **kwargs)
+                if stream:
+                    frames = self.fs.streamFrames(flip=flip, **kwargs)
+                else:
+                    frames = self.fs.getFrames(diag=diag-1, overwrite=True, flip=flip, **kwargs)
                 for frame in frames:
                     backSub.apply(frame)
                 self.fs.randomBounds(**kwargs)
@@ -31,7 +31,8 @@ from noz_plots import *
 from noz_dims import *
 from background import *
 from noz_detector import *
-from timeCounter import *
+from noz_prior import priors
+from tools.timeCounter import *
 
 
 # logging
@@ -211,7 +212,12 @@ def exportNozDims(folder:str, overwrite:bool=False, **kwargs) -> None:
 def exportNozDimsRecursive(folder:str, overwrite:bool=False, **kwargs) -> list:
     '''export stills of key lines from videos'''
     fl = fh.folderLoop(folder, exportNozDims, overwrite=overwrite, **kwargs)
-    fl.run()
+    if type(folder) is str:
+        priors.seed(folder)   # learn the positions that were already detected in this folder
+    try:
+        fl.run()
+    finally:
+        priors.flush()   # export the nozzle positions found in this loop once
     return fl
 
 def exportNozDimsRetry(folder:str, lcrit:int=15, overwrite:bool=False) -> None:
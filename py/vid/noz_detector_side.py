@@ -20,6 +20,7 @@ currentdir = os.path.dirname(os.path.realpath(__file__))
 sys.path.append(currentdir)
 sys.path.append(os.path.dirname(currentdir))
 from noz_detector_tools import *
+from noz_lines import *
 
 # logging
 logger = logging.getLogger(__name__)
@@ -30,31 +31,6 @@ for s in ['matplotlib', 'imageio', 'IPython', 'PIL']:
 
 #----------------------------------------------
 
-def combineLines(df:pd.DataFrame) -> dict:
-    '''combine groups of similar Hough transform lines into one line'''
-    top = (df[df.y0==df.y0.min()]).iloc[0]
-    bot = (df[df.yf==df.yf.max()]).iloc[0]
-    return {'x0':top['x0'],'y0':top['y0'],'xf':bot['xf'],'yf':bot['yf']}
-
-def lineIntersect(line1:pd.Series, line2:pd.Series) -> Tuple[float,float]:
-    '''find intersection between two lines'''
-    if line1['xf']-line1['x0']==0:
-        # line 1 is vertical
-        x = line1['xf']
-        m1 = (line2['yf']-line2['y0'])/(line2['xf']-line2['x0'])
-        line1['y0']=line2['y0']
-        line1['x0']=line2['x0']
-    elif line2['xf']-line2['x0']==0:
-        # line 2 is vertical
-        x = line2['xf']
-        m1 = (line1['yf']-line1['y0'])/(line1['xf']-line1['x0'])
-    else:
-        m1 = (line1['yf']-line1['y0'])/(line1['xf']-line1['x0'])
-        m2 = (line2['yf']-line2['y0'])/(line2['xf']-line2['x0'])
-        x = (line2['y0']-line1['y0']-m2*line2['x0']-m1*line1['x0'])/(m1-m2)
-    y = line1['y0']+m1*(x-line1['x0'])
-    return int(x),int(y)
-
 class nozDetectorSide(nozDetector):
     '''for detecting the nozzle in an image'''
     
@@ -85,6 +61,15 @@ class nozDetectorSide(nozDetector):
         self.xRmax = 700
         self.yBmin = 200
         self.yBmax = 430
+        
+    def defineCritValsPrior(self, d:dict, margin:int=15) -> None:
+        '''define crit vals in a small window around the expected nozzle position d'''
+        self.xLmin = d['xL']-margin # px
+        self.xLmax = d['xL']+margin
+        self.xRmin = d['xR']-margin
+        self.xRmax = d['xR']+margin
+        self.yBmin = d['yB']-margin
+        self.yBmax = d['yB']+margin
 
     def defineCritValsImage(self, nd, crops:dict, xmargin:int=20, ymargin:int=20, yCropMargin:int=20, xCropMargin:int=20, **kwargs) -> None:
         '''define crit vals, where this is a cropped image and we already have approximate nozzle position'''
@@ -123,96 +108,59 @@ class nozDetectorSide(nozDetector):
         self.edgeImage = thres2.copy()                # store edge image for displaying diagnostics
         self.np.edgeImage = self.edgeImage
         
-    def nozzleLines0(self, im:np.array):
-        '''run a hough transform on the edge image to collect lines that could be part of the nozzle'''
-        theta = np.pi/180   # angular resolution in radians of the Hough grid
-      # threshold is minimum number of votes (intersections in Hough grid cell)
+    def nozzleLines0(self, im:np.array) -> Tuple[np.array, np.array]:
+        '''run a hough transform on the edge image to collect lines that could be part of the nozzle. 
+        returns arrays of horizontal and vertical segments, where each row is x0, y0, xf, yf'''
         # Run Hough on edge detected image
-        # Output "lines" is an array containing endpoints of detected line segments
+        # Output "lines" is an array containing endpoints of detected line segments, sorted by votes
         lines = cv.HoughLinesP(self.edgeImage, self.rho, self.theta, self.threshold, np.array([]), self.min_line_length, self.max_line_gap)
-        
-        if lines is None or len(lines)==0:
-            return [], []
-
-        # convert to dataframe
-        lines = pd.DataFrame(lines.reshape(len(lines),4), columns=['x0', 'y0', 'xf', 'yf'], dtype='int32')        
-        lines['slope'] = abs(lines['x0']-lines['xf'])/abs(lines['y0']-lines['yf'])
-        # find horizontal lines
-        horizLines = lines[(lines['slope']>20)&(lines['y0']>self.yBmin)&(lines['y0']<self.yBmax)]
-        lines0h = horizLines.copy()
-        
-        # only take nearly vertical lines, where slope = dx/dy
-        lines = lines[(lines['slope']<self.critslope)&(lines['x0']>self.xLmin)&(lines['x0']<self.xRmax)]
-        lines0 = lines.copy()
-        # sort each line by y
-        for i,row in lines0.iterrows():
-            if row['yf']<row['y0']:
-                lines0.loc[i,['x0','y0','xf','yf']] = list(row[['xf','yf','x0','y0']])
-        lines0 = lines0.convert_dtypes()         # convert back to int
-        lines0 = lines0[lines0.yf<self.hmax]      # only take lines that extend close to the top of the frame
+        segs = houghSegments(lines)
+        if len(segs)==0:
+            return segs, segs
+        lines0h = horizSegments(segs, self.yBmin, self.yBmax)                              # find horizontal lines
+        lines0 = vertSegments(segs, self.critslope, self.xLmin, self.xRmax, self.hmax)     # only take nearly vertical lines that extend close to the top of the frame
         return lines0h, lines0
         
         
-    def nozzleLines(self) -> pd.DataFrame:
+    def nozzleLines(self) -> None:
         '''get lines from the stored edge image'''
-        lines0h, lines0 = self.nozzleLines0(self.edgeImage)
-        if len(lines0)==0:
-            self.failed = True
-            raise ValueError('Failed to detect any lines in nozzle')
-        if len(lines0h)>0:
-            self.lines0h = lines0h
-        else:
-            self.lines0h = pd.DataFrame([])
-        if len(lines0)>0:
-            self.lines0 = lines0
-        else:
-            self.lines0 = pd.DataFrame([])
+        self.lines0h, self.lines0 = self.nozzleLines0(self.edgeImage)
         self.np.lines0h = self.lines0h
         self.np.lines0 = self.lines0
+        if len(self.lines0)==0:
+            self.failed = True
+            raise ValueError('Failed to detect any lines in nozzle')
         
     def useHoriz(self) -> None:
         '''use horizontal line to find nozzle corners'''
-        horizLine = self.lines0h.iloc[0]                        # dominant line
-        xL, yL = lineIntersect(horizLine, self.lines.loc[0])    # find the point where the horizontal line and left vertical line intersect
-        self.leftCorner = pd.Series({'xf':min(self.lines.loc[0]['x0'], self.lines.loc[0]['xf']), 'yf':yL})
-        xR, yR = lineIntersect(horizLine, self.lines.loc[1])    # find the point where the horizontal line and right vertical line intersect
-        self.rightCorner = pd.Series({'xf':xR, 'yf':yR})
+        horizLine = self.lines0h[0]                                 # dominant line
+        xL, yL = segmentIntersect(horizLine, self.lines[0])    # find the point where the horizontal line and left vertical line intersect
+        self.leftCorner = (min(self.lines[0,0], self.lines[0,2]), yL)
+        xR, yR = segmentIntersect(horizLine, self.lines[1])    # find the point where the horizontal line and right vertical line intersect
+        self.rightCorner = (xR, yR)
         
     def useVerticals(self) -> None:
         '''use vertical lines to find corners'''
         # corners are bottom points of each line
-        self.leftCorner = self.lines.loc[0,['xf','yf']]         # take bottom point of left vertical line
-        self.rightCorner = self.lines.loc[1,['xf', 'yf']]       # take bottom point of right vertical line
+        self.leftCorner = tuple(self.lines[0,2:4])         # take bottom point of left vertical line
+        self.rightCorner = tuple(self.lines[1,2:4])        # take bottom point of right vertical line
         
     def findNozzlePoints(self, mode:int=4, **kwargs) -> None:
         '''find lines and corners of nozzle from list of lines'''
-        # based on line with most votes, group lines into groups on the right edge and groups on the left edge
-        best = self.lines0.iloc[0]                # line with most votes
-        dx = max(10,2*abs(best['xf']-best['x0'])) # margin of error for inclusion in the group
-        nearbest = self.lines0[(self.lines0.x0<best['x0']+dx)&(self.lines0.x0>best['x0']-dx)]  # lines that are near the best line
-        
-        # group lines between 0.5 and 1.5 nozzles away on left and right side of best line
+        # based on line with most votes, group lines between 0.5 and 1.5 nozzles away on left and right side of best line
         margin = 0.45*self.pxpmm # half a nozzle
-        right = self.lines0[(self.lines0.x0>best['x0']+margin)&(self.lines0.x0<best['x0']+3*margin)] # lines that are 1-3 margins to the left of the best line
-        left = self.lines0[(self.lines0.x0<best['x0']-margin)&(self.lines0.x0>best['x0']-3*margin)]  # lines that are 1-3 margins to the right of the best line
-    
-        
-        if len(right)>len(left):
-            left = nearbest     # best was the left side, use nearbest as the left lines
-        else:
-            right = nearbest    # best was the right side, use nearbest as the right lines
-            
+        left, right = groupEdges(self.lines0, margin)
         if len(left)==0 or len(right)==0:
             raise ValueError('Failed to detect left and right edges of nozzle')
 
         # combine all left lines into one line and combine all right lines into one line
-        self.lines = pd.DataFrame([combineLines(left), combineLines(right)])
+        self.lines = np.array([combineSegments(left), combineSegments(right)])
         self.np.lines = self.lines
         
         if len(self.lines0h)>0:
             # we have already defined horizontal lines. use horizontal lines to find corners
             self.useHoriz()
-            if min([self.leftCorner['yf'],self.rightCorner['yf']]) > self.lines0.yf.max():
+            if min([self.leftCorner[1],self.rightCorner[1]]) > self.lines0[:,3].max():
                 # horiz line is far below verticals
                 # throw out the horiz line and use the verticals
                 self.useVerticals()
@@ -221,15 +169,15 @@ class nozDetectorSide(nozDetector):
             self.useVerticals()
         
         # store left edge x, right edge x, and bottom edge midpoint
-        xL = self.leftCorner['xf']   # left corner x
-        xR = self.rightCorner['xf']  # right corner x
+        xL = self.leftCorner[0]   # left corner x
+        xR = self.rightCorner[0]  # right corner x
         
-        if abs(self.leftCorner['yf']-self.rightCorner['yf'])>20:
+        if abs(self.leftCorner[1]-self.rightCorner[1])>20:
             # if bottom edge is not horizontal, use bottommost point for y position of nozzle bottom
-            yB = max([self.leftCorner['yf'],self.rightCorner['yf']])
+            yB = max([self.leftCorner[1],self.rightCorner[1]])
         else:
             # otherwise, use mean of bottom point of left and right edges
-            yB = (self.leftCorner['yf']+self.rightCorner['yf'])/2
+            yB = (self.leftCorner[1]+self.rightCorner[1])/2
         self.nd = nozDimsSide(self.pfd, importDims=False)
         if mode==1:
             # means erase lateral movement of the nozzle, so need to expand the nozzle slightly
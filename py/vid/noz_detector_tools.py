@@ -29,6 +29,7 @@ from v_tools import vidData
 from noz_dims import *
 from background import *
 from noz_plots import nozPlotter
+from noz_prior import priors
 
 
 # logging
@@ -57,11 +58,7 @@ class nozDetector:
         
     def defineDimensions(self):
         '''bounds of size of nozzle in mm. for 20 gauge nozzle, diam should be 0.908 mm'''
-        self.nod = 0.908 # mm
-        if len(self.pfd.meta)>0:
-            meta,u = plainImDict(self.pfd.meta[0], unitCol=1, valCol=2)
-            if 'nozzle_outer_diameter' in meta:
-                self.nod = float(meta['nozzle_outer_diameter'])
+        self.nod = self.pfd.metaRecord().nozzleOuterDiameter # mm, 0.908 if not in the meta file
 
         self.nozwidthMin = self.nod-0.15 # mm
         self.nozWidthMax = self.nod+0.3 # mm
@@ -79,8 +76,53 @@ class nozDetector:
             self.np.drawDiagnostics(diag) # show diagnostics
 
 
-    def detectNozzle(self, diag:int=0, **kwargs) -> None:
-        '''find the bottom corners of the nozzle, trying different images. suppressSuccess=True to only print diagnostics if the run fails'''
+    def getFrame(self, mode:int, draw:int, **kwargs) -> np.array:
+        '''get a combined frame from the draw-th set of frames in the frame selector's pool. 
+        frames and combined frames are reused across attempts'''
+        kwargs2 = {k:v for k,v in kwargs.items() if not k=='overwrite'}   # overwrite refers to the nozzle dimensions file, not the frames
+        return self.fs.frame(mode=mode, numpics=10, draw=draw, **kwargs2)
+        
+    def priorDate(self) -> int:
+        '''get the date of the folder, for looking up the expected nozzle position. returns 0 if there is no date'''
+        try:
+            return self.pfd.getDate()
+        except ValueError:
+            return 0
+        
+    def detectFromPrior(self, mode:int, diag:int=0, **kwargs) -> int:
+        '''try to detect the nozzle in a small window around the position found in other folders from the same day and fixture. 
+        returns 0 if successful, 1 if not. if it fails, the window is widened back to the full bounds'''
+        date = self.priorDate()
+        if date==0:
+            return 1
+        d = priors.expected(self.printFolder, date, self.pxpmm)
+        if len(d)==0:
+            return 1
+        self.defineCritValsPrior(d)
+        try:
+            frame = self.getFrame(mode, 0, **kwargs)
+            self.detectNozzle0(frame, diag=diag, mode=mode, **kwargs)
+        except ValueError as e:
+            if diag>1:
+                print(f'{e}: Widening search window')
+            priors.record(self.printFolder, False)
+            self.failed = False
+            self.defineCritVals()
+            return 1
+        else:
+            priors.record(self.printFolder, True)
+            return 0
+        
+    def learnPrior(self) -> None:
+        '''add the detected nozzle position to the stored priors'''
+        date = self.priorDate()
+        if date>0:
+            priors.add(self.printFolder, date, self.pxpmm, self.nd.nozDims())
+
+
+    def detectNozzle(self, diag:int=0, prior:bool=True, **kwargs) -> None:
+        '''find the bottom corners of the nozzle, trying different images. suppressSuccess=True to only print diagnostics if the run fails. 
+        prior=True to first search near the nozzle position from other folders from the same day and fixture'''
         if 'modes' in kwargs:
             modes = kwargs['modes']
         else:
@@ -93,20 +135,24 @@ class nozDetector:
             loops = 1
         else:
             loops = 3
+            
+        if prior and self.detectFromPrior(modes[0], diag=diag, **kwargs)==0:
+            self.learnPrior()
+            return 0
         
         for mode in modes: # min, median, then mean
             for i in range(loops):
                 try:
-                    frame = self.fs.frame(mode=mode, numpics=10, **kwargs)           # get median or averaged frame
+                    frame = self.getFrame(mode, i, **kwargs)           # get median or averaged frame
                     self.detectNozzle0(frame, diag=diag, mode=mode, **kwargs)
                 except ValueError as e:
                     if diag>1:
                         print(f'{e}: Looping to next mode')
                     pass
                 else:
+                    self.learnPrior()
                     return 0
             
         # if all modes failed:
         self.np.drawDiagnostics(diag) # show diagnostics
         raise ValueError(f'Failed to detect nozzle after {loops*len(modes)} iterations')
-        
\ No newline at end of file
@@ -54,6 +54,13 @@ class nozDetectorUnder(nozDetector):
         self.yCmin = 120
         self.yCmax = 300
         
+    def defineCritValsPrior(self, d:dict, margin:int=15) -> None:
+        '''define crit vals in a small window around the expected nozzle position d'''
+        self.xCmin = d['xC']-margin
+        self.xCmax = d['xC']+margin
+        self.yCmin = d['yC']-margin
+        self.yCmax = d['yC']+margin
+        
     def defineCritValsImage(self, nd, crops:dict, xmargin:int=20, ymargin:int=20, yCropMargin:int=20, xCropMargin:int=20, **kwargs) -> None:
         '''define crit vals, where this is a cropped image and we already have approximate nozzle position'''
         self.crops = crops.copy()
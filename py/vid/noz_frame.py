@@ -7,7 +7,7 @@ import traceback
 import logging
 import pandas as pd
 from matplotlib import pyplot as plt
-from typing import List, Dict, Tuple, Union, Any, TextIO
+from typing import List, Dict, Tuple, Union, Any, TextIO, Iterator
 import re
 import numpy as np
 import cv2 as cv
@@ -22,6 +22,7 @@ sys.path.append(os.path.dirname(currentdir))
 from im.imshow import imshow
 import im.morph as vm
 import im.crop as vc
+from im.frame_combiner import frameCombiner
 from tools.config import cfg
 from tools.plainIm import *
 import file.file_handling as fh
@@ -56,12 +57,21 @@ class fcModes:
     
 
 class frameSelector:
-    '''class that can extract images from a video'''
+    '''class that can extract images from a video. 
+    seed seeds the random selection of frames, so the same frames are chosen every run
+    poolSize is the number of candidate frames to choose draws from'''
     
-    def __init__(self, printFolder:str, pfd:fh.printFileDict):
+    def __init__(self, printFolder:str, pfd:fh.printFileDict, seed:int=0, poolSize:int=30):
         self.frames = []
         self.printFolder = printFolder
         self.pfd = pfd
+        self.seed = seed
+        self.poolSize = poolSize
+        self.rng = random.Random(seed)
+        self.draw = -1        # index of the current set of frames in the pool. -1 if the frames did not come from the pool
+        self.decoded = {}     # frames that have already been read, keyed by time or file name
+        self.flipped = False  # true if the frame list includes frames with the bottom half flipped
+        self.combined = {}    # combined frames, keyed by draw, flip, and mode
         
     def tlistFromProgPos(self, ymin:int=5, ymax:int=70, zmin:int=-20, numpics:int=6, **kwargs) -> list:
         '''get a random list of times from the progPos table'''
@@ -69,7 +79,7 @@ class frameSelector:
         prog = prog[(prog.zt<0)&(prog.yt>ymin)&(prog.yt<ymax)&(prog.zt>zmin)]        # select moves with no extrusion that aren't close to the edge
         prog.reset_index(inplace=True, drop=True)
         tlist = list((prog['tf']+prog['t0'])/2)
-        indices = random.sample(range(0, len(prog)), numpics-1)
+        indices = self.rng.sample(range(0, len(prog)), min(numpics-1, len(prog)))
         tlist = [self.randTime(prog.loc[i]) for i in indices]
         tlist = [prog.loc[0]['tf']-0.5] + tlist
         return tlist
@@ -88,7 +98,7 @@ class frameSelector:
 
     def randTime(self, row:pd.Series) -> float:
         '''get a random time between these two times'''
-        f = random.random()
+        f = self.rng.random()
         return row['t0']*f + row['tf']*(1-f)
     
     def randomBounds(self, ymin:int=5, ymax:int=70, zmin:int=-20):
@@ -102,9 +112,50 @@ class frameSelector:
         self.fmin = self.tmin/self.vd.duration
         self.fmax = self.tmax/self.vd.duration
     
+    def drawRng(self, draw:int) -> random.Random:
+        '''get a random number generator for the draw-th set of frames, so the set does not depend on which sets were drawn before'''
+        return random.Random(f'{self.seed}_{draw}')
+    
+    def poolTimes(self, numpics:int=6, **kwargs) -> list:
+        '''get the candidate times to draw frames from, choosing them the first time. the first time is before the print starts'''
+        if not hasattr(self, 'pool'):
+            if len(self.pfd.progPos)>0:
+                self.pool = self.tlistFromProgPos(numpics=max(numpics, self.poolSize), **kwargs)
+            elif len(self.pfd.progDims)>0:
+                self.pool = list(self.tlistFromProgDims())
+            else:
+                raise ValueError('No programmed dimensions in folder')
+        return self.pool
+    
+    def drawTimes(self, draw:int, numpics:int=6, **kwargs) -> list:
+        '''get the draw-th set of numpics times from the pool'''
+        pool = self.poolTimes(numpics=numpics, **kwargs)
+        if draw==0:
+            return pool[:numpics]
+        return [pool[0]] + self.drawRng(draw).sample(pool[1:], min(numpics-1, len(pool)-1))
+    
+    def frameAtTime(self, t:float) -> np.array:
+        '''get the frame at time t, reading it from the video only the first time'''
+        if not t in self.decoded:
+            self.decoded[t] = self.vd.getFrameAtTime(t)
+        return self.decoded[t]
+    
+    def framesAtTimes(self, tlist:list) -> list:
+        '''get the frames at all of the times, keeping the video open while reading them'''
+        if not hasattr(self, 'vd'):
+            self.vd = vidData(self.printFolder)
+        with self.vd.borrowStream():
+            return [self.frameAtTime(t) for t in tlist]
+        
+    def readStill(self, file:str) -> np.array:
+        '''read an image, reading it from file only the first time'''
+        if not file in self.decoded:
+            self.decoded[file] = cv.imread(file)
+        return self.decoded[file]
+    
     def randomFrame(self, inbath:bool=True) -> np.array:
         '''get a totally random frame'''
-        t = random.uniform(self.tmin, self.tmax)
+        t = self.rng.uniform(self.tmin, self.tmax)
         return self.vd.getFrameAtTime(t)
     
     def lowpass(self, frame:np.array, dd:int=30) -> np.array:
@@ -124,36 +175,57 @@ class frameSelector:
     def flipFrames(self) -> None:
         '''flip the bottom half of all of the frames and add that to the frame list'''
         self.frames = self.frames + [self.flipFrame(f) for f in self.frames]
+        self.flipped = True
 
         
-    def getFramesStill(self, numpics:int=6, **kwargs) -> None:
+    def getFramesStill(self, numpics:int=6, draw:int=-1, **kwargs) -> None:
         '''get frames from existing stills'''
         if len(self.pfd.vstill)==0:
             self.pfd.findVstill()
         if len(self.pfd.vstill)>numpics:
             vstill = list(filter(lambda f: not 'p5' in f and not 'l3' in f, self.pfd.vstill))
-            ilist = random.sample(range(0, len(vstill)), numpics)
-            self.frames = [cv.imread(vstill[i]) for i in ilist]
+            rng = self.drawRng(draw) if draw>=0 else self.rng
+            ilist = rng.sample(range(0, len(vstill)), numpics)
+            self.frames = [self.readStill(vstill[i]) for i in ilist]
             
     def getFramesSnap(self, **kwargs) -> None:
         '''get the first two images in the snap folder'''
         folder = os.path.join(self.printFolder, 'raw')
         if not os.path.exists(folder):
             return
-        self.frames = [cv.imread(os.path.join(folder, f))[5:-5,5:-5,:] for f in os.listdir(folder)[:2]]
+        self.frames = [self.readStill(os.path.join(folder, f))[5:-5,5:-5,:] for f in os.listdir(folder)[:2]]
             
-    def getFramesProgPos(self, **kwargs) -> None:
-        '''get a list of frames using the progPos table to guide us'''
-        if len(self.pfd.progPos)>0:
-            tlist = self.tlistFromProgPos(**kwargs)
+    def timesProgPos(self, draw:int=-1, **kwargs) -> list:
+        '''get a list of times using the progPos table to guide us'''
+        if 'tlist' in kwargs:
+            return kwargs['tlist']
+        if draw>=0:
+            return self.drawTimes(draw, **kwargs)
+        elif len(self.pfd.progPos)>0:
+            return self.tlistFromProgPos(**kwargs)
         else:
             if len(self.pfd.progDims)>0:
-                tlist = self.tlistFromProgDims()
+                return self.tlistFromProgDims()
             else:
                 raise ValueError('No programmed dimensions in folder')
+            
+    def getFramesProgPos(self, draw:int=-1, **kwargs) -> None:
+        '''get a list of frames using the progPos table to guide us'''
+        tlist = self.timesProgPos(draw=draw, **kwargs)
+        self.frames = self.framesAtTimes(tlist)  # get frames in gaps between prints
+        
+    def streamFrames(self, flip:bool=False, **kwargs) -> Iterator[np.array]:
+        '''read frames from the video one at a time without keeping them, using the progPos table to guide us. 
+        flip=True to also give each frame with the bottom half flipped'''
+        tlist = self.timesProgPos(**kwargs)
         if not hasattr(self, 'vd'):
             self.vd = vidData(self.printFolder)
-        self.frames = [self.vd.getFrameAtTime(t) for t in tlist]  # get frames in gaps between prints
+        with self.vd.borrowStream():
+            for t in tlist:
+                frame = self.vd.getFrameAtTime(t)
+                yield frame
+                if flip:
+                    yield self.flipFrame(frame)
             
     def getFrameGetMode(self, **kwargs) -> int:
         '''determine how we should be getting frames'''
@@ -166,36 +238,76 @@ class frameSelector:
             frameGetMode = frameGetModes.progPos
         return frameGetMode
         
-    def getFrames(self, overwrite:bool=False, flip:bool=False, **kwargs) -> list:
-        '''get a list of frames'''
+    def getFrames(self, overwrite:bool=False, flip:bool=False, draw:int=-1, **kwargs) -> list:
+        '''get a list of frames. 
+        draw>=0 to use the draw-th set of frames from a seeded pool of candidate frames, so retries get new frames without reading old frames again. 
+        overwrite is ignored if draw>=0'''
         
-        if len(self.frames)>0 and not overwrite:
+        if draw>=0:
+            if draw==self.draw and flip==self.flipped and len(self.frames)>0:
+                return self.frames
+        elif len(self.frames)>0 and not overwrite:
             return
+        self.draw = draw
+        self.flipped = False
         
         if 'tlist' in kwargs:
-            if not hasattr(self, 'vd'):
-                self.vd = vidData(self.printFolder)
-            self.frames = [self.vd.getFrameAtTime(t) for t in kwargs['tlist']]
+            self.frames = self.framesAtTimes(kwargs['tlist'])
             return
+            
         frameGetMode = self.getFrameGetMode(**kwargs)
             
         if frameGetMode==frameGetModes.still:
-            self.getFramesStill(**kwargs)
+            self.getFramesStill(draw=draw, **kwargs)
         elif frameGetMode==frameGetModes.snap:
             self.getFramesSnap(**kwargs)
 
         if len(self.frames)==0 or frameGetMode==frameGetModes.progPos:
-            self.getFramesProgPos(**kwargs)
+            self.getFramesProgPos(draw=draw, **kwargs)
                 
         if flip:
             self.flipFrames()
         return self.frames
     
-    def frame(self, mode:int=0, diag:int=0, overwrite:bool=False, **kwargs) -> np.array:
+    def medianLightest(self, medi:np.array, maxi:np.array) -> np.array:
+        '''combine the median frame and lightest frame, taking the lightest frame where the median frame is dark'''
+        _,thresh = cv.threshold(cv.cvtColor(medi, cv.COLOR_BGR2GRAY), (np.min(medi)+np.max(maxi))/2, 255, cv.THRESH_BINARY_INV)
+        return cv.add(cv.bitwise_and(medi, medi, mask=cv.bitwise_not(thresh)), cv.bitwise_and(maxi, maxi, mask=thresh))
+    
+    def frameStream(self, mode:int=0, bins:int=64, flip:bool=False, **kwargs) -> np.array:
+        '''combine frames as they are read from the video, so memory does not depend on the number of frames. 
+        bins is the number of histogram bins for the median. 256 gives the exact median, and 64 is within 2 levels'''
+        tlist = self.timesProgPos(**kwargs)
+        kwargs['tlist'] = tlist
+        n = len(tlist)*(2 if flip else 1)
+        fc = frameCombiner(median=mode in [fcModes.median, fcModes.medianLightest], bins=bins, maxFrames=n)
+        for f in self.streamFrames(flip=flip, **kwargs):
+            fc.add(f)
+        if mode==fcModes.median:
+            return fc.median()
+        elif mode==fcModes.mean:
+            return fc.mean()
+        elif mode==fcModes.lightest:
+            return fc.lightest()
+        elif mode==fcModes.medianLightest:
+            return self.medianLightest(fc.median(), fc.lightest())
+        elif mode==fcModes.darkest:
+            return fc.darkest()
+        else:
+            raise ValueError(f'Unexpected frame combine mode {mode}')
+    
+    def frame(self, mode:int=0, diag:int=0, overwrite:bool=False, stream:bool=False, **kwargs) -> np.array:
         '''get an averaged frame from several points in the stream to blur out all fluid and leave just the nozzle. 
         mode=0 to use median frame, mode=1 to use mean frame, mode=2 to use lightest frame
-        useStills=True to use stills from printing'''
+        useStills=True to use stills from printing. 
+        draw>=0 to combine the draw-th set of frames from the pool. combined frames are saved, so each draw, flip, and mode is only combined once. 
+        stream=True to combine frames from the video one at a time instead of holding them all, for combining many frames'''
+        if stream:
+            return self.frameStream(mode=mode, **kwargs)
         self.getFrames(overwrite=overwrite, **kwargs)
+        key = (self.draw, self.flipped, mode)
+        if self.draw>=0 and key in self.combined:
+            return self.combined[key].copy()
         if mode==fcModes.median:
             out = np.median(self.frames, axis=0).astype(dtype=np.uint8) # median frame
         elif mode==fcModes.mean:
@@ -205,11 +317,12 @@ class frameSelector:
         elif mode==fcModes.medianLightest:
             medi = np.median(self.frames, axis=0).astype(dtype=np.uint8) # median frame
             maxi = np.max(self.frames, axis=0).astype(dtype=np.uint8)   # lightest frame (do not do this for accurate nozzle dimensions)
-            _,thresh = cv.threshold(cv.cvtColor(medi, cv.COLOR_BGR2GRAY), (np.min(medi)+np.max(maxi))/2, 255, cv.THRESH_BINARY_INV)
-            out = cv.add(cv.bitwise_and(medi, medi, mask=cv.bitwise_not(thresh)), cv.bitwise_and(maxi, maxi, mask=thresh))
+            out = self.medianLightest(medi, maxi)
         elif mode==fcModes.darkest:
             out = np.min(self.frames, axis=0).astype(dtype=np.uint8)   # darkest frame 
         if diag>0:
             imshow(*self.frames, numbers=True, perRow=10)
+        if self.draw>=0:
+            self.combined[key] = out.copy()
         return out
     
\ No newline at end of file
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+'''Functions for sorting and combining Hough transform line segments, where each segment is a row of x0, y0, xf, yf in an array'''
+
+# external packages
+import os, sys
+import logging
+from typing import List, Dict, Tuple, Union, Any, TextIO
+import numpy as np
+
+# local packages
+
+
+# logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+#----------------------------------------------
+
+def houghSegments(lines:np.array) -> np.array:
+    '''convert the output of HoughLinesP into an Nx4 array of x0, y0, xf, yf'''
+    if lines is None or len(lines)==0:
+        return np.zeros((0,4), dtype=np.int32)
+    return lines.reshape(len(lines),4).astype(np.int32)
+
+def slopes(segs:np.array) -> np.array:
+    '''get dx/dy for each segment. horizontal segments are inf and points are nan'''
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.abs(segs[:,0]-segs[:,2])/np.abs(segs[:,1]-segs[:,3])
+
+def sortByY(segs:np.array) -> np.array:
+    '''flip segments so y0 is above yf'''
+    out = segs.copy()
+    flip = segs[:,3]<segs[:,1]
+    out[flip] = segs[flip][:, [2,3,0,1]]
+    return out
+
+def horizSegments(segs:np.array, ymin:float, ymax:float) -> np.array:
+    '''get the nearly horizontal segments that start between ymin and ymax'''
+    return segs[(slopes(segs)>20)&(segs[:,1]>ymin)&(segs[:,1]<ymax)]
+
+def vertSegments(segs:np.array, critslope:float, xmin:float, xmax:float, hmax:float) -> np.array:
+    '''get the nearly vertical segments that start between xmin and xmax and reach above hmax, sorted so y0 is at the top'''
+    segs = segs[(slopes(segs)<critslope)&(segs[:,0]>xmin)&(segs[:,0]<xmax)]
+    segs = sortByY(segs)
+    return segs[segs[:,3]<hmax]
+
+def combineSegments(segs:np.array) -> np.array:
+    '''combine a group of similar segments into one segment, from the top of the highest segment to the bottom of the lowest segment'''
+    top = segs[np.argmin(segs[:,1])]
+    bot = segs[np.argmax(segs[:,3])]
+    return np.array([top[0], top[1], bot[2], bot[3]])
+
+def groupEdges(segs:np.array, margin:float) -> Tuple[np.array, np.array]:
+    '''split vertical segments into the left and right edges of the nozzle.
+    the first segment has the most votes. segments 1-3 margins away from it are the other edge'''
+    x0 = segs[:,0]
+    best = segs[0]
+    bx = best[0]
+    dx = max(10,2*abs(best[2]-bx))          # margin of error for inclusion in the group
+    nearbest = segs[(x0<bx+dx)&(x0>bx-dx)]  # segments that are near the best segment
+    right = segs[(x0>bx+margin)&(x0<bx+3*margin)]
+    left = segs[(x0<bx-margin)&(x0>bx-3*margin)]
+    if len(right)>len(left):
+        left = nearbest     # best was the left side
+    else:
+        right = nearbest    # best was the right side
+    return left, right
+
+def segmentIntersect(seg1:np.array, seg2:np.array) -> Tuple[int,int]:
+    '''find the intersection between the lines that pass through two segments'''
+    x01,y01,xf1,yf1 = [int(v) for v in seg1[:4]]
+    x02,y02,xf2,yf2 = [int(v) for v in seg2[:4]]
+    if xf1-x01==0:
+        # line 1 is vertical
+        x = xf1
+        m1 = (yf2-y02)/(xf2-x02)
+        x01 = x02
+        y01 = y02
+    elif xf2-x02==0:
+        # line 2 is vertical
+        x = xf2
+        m1 = (yf1-y01)/(xf1-x01)
+    else:
+        m1 = (yf1-y01)/(xf1-x01)
+        m2 = (yf2-y02)/(xf2-x02)
+        x = (y02-y01-m2*x02-m1*x01)/(m1-m2)
+    y = y01+m1*(x-x01)
+    return int(x),int(y)
@@ -69,19 +69,19 @@ class nozPlotter:
         if hasattr(self, 'lines'):
             lines = self.lines
             try:
-                for i,line in lines.iterrows():
+                for x0,y0,xf,yf in lines:
                     if colors:
                         c = (0,0,255)
                     else:
                         c = (255,255,255)
-                    cv.line(self.line_image,(int(line['x0']),int(line['y0'])),(int(line['xf']),int(line['yf'])),c,2)
+                    cv.line(self.line_image,(int(x0),int(y0)),(int(xf),int(yf)),c,2)
 
                 # draw bottom edge
                 if colors:
                     c = (255,255,0)
                 else:
                     c = (255,255,255)
-                cv.line(self.line_image,(int(lines.loc[0,'xf']),int(nd.yB)),(int(lines.loc[1,'xf']),int(nd.yB)),c,2)
+                cv.line(self.line_image,(int(lines[0,2]),int(nd.yB)),(int(lines[1,2]),int(nd.yB)),c,2)
             except:
                 pass
         
@@ -99,10 +99,10 @@ class nozPlotter:
     def drawLinesOnFrameSide(self) -> None:
         '''draw the list of all detected nozzle edge lines on the thresholded frame'''
         if hasattr(self, 'lines0') and hasattr(self, 'lines0h'):
-            for df in [self.lines0, self.lines0h]:
-                for i,line in df.iterrows():
+            for segs in [self.lines0, self.lines0h]:
+                for x0,y0,xf,yf in segs:
                     color = list(np.random.random(size=3) * 256)            # assign a random color to each line
-                    cv.line(self.lines_image,(int(line['x0']),int(line['y0'])),(int(line['xf']),int(line['yf'])),color,4)
+                    cv.line(self.lines_image,(int(x0),int(y0)),(int(xf),int(yf)),color,4)
                     
     def displayNearLines(self, lines0:pd.DataFrame, im:np.array, edges:np.array) -> None:
         '''draw the lines that are near the nozzle on the frame'''
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+'''Functions for storing expected nozzle positions, learned from nozDims files, so nozzle detection can start with a small search window'''
+
+# external packages
+import os, sys
+import logging
+import pandas as pd
+from typing import List, Dict, Tuple, Union, Any, TextIO
+import numpy as np
+
+# local packages
+currentdir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(currentdir)
+sys.path.append(os.path.dirname(currentdir))
+from tools.config import cfg
+from tools.plainIm import *
+from file.f_tools import fileDate
+
+# logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+#----------------------------------------------
+
+dimCols = {'Side':['xL', 'xR', 'yB'], 'Under':['xC', 'yC', 'r']}   # nozzle dimensions for each camera view
+
+def priorView(printFolder:str) -> str:
+    '''get the camera view for the print folder'''
+    if 'Under' in printFolder:
+        return 'Under'
+    else:
+        return 'Side'
+
+def priorKey(date:int, view:str, pxpmm:int) -> str:
+    '''get the key that groups folders with the same nozzle position: same day, same camera view, same magnification'''
+    return f'{int(date)}_{view}_{int(pxpmm)}'
+
+def isNozDimsFile(f:str) -> bool:
+    '''check if the file name is a nozzle dimensions table'''
+    return 'nozDims' in f and f.endswith('.csv')
+
+
+class nozPrior:
+    '''holds the nozzle position found in each print folder, so the position can be predicted for other folders from the same day and fixture.
+    fn is the csv file that stores the table. if empty, use nozPriors.csv in the server folder
+    new rows are held until export() or flush(), which merge them into the file, so workers running in parallel don't overwrite each other's rows. 
+    the loops that detect nozzles call flush() once at the end. nothing is written when the process exits
+    counts how many folders were detected using the prediction (fast path) and how many had to search the whole image'''
+
+    def __init__(self, fn:str=''):
+        self.fn = fn
+        self.hits = 0
+        self.misses = 0
+        self.pending = set()    # folders whose rows have not been exported
+        self.seeded = set()     # folders that have already been searched for nozzle dimension files
+        self.cols = ['folder', 'key'] + dimCols['Side'] + dimCols['Under']
+
+    def file(self) -> str:
+        '''get the name of the file that stores the table'''
+        if len(self.fn)==0:
+            self.fn = os.path.join(cfg.path.server, 'nozPriors.csv')
+        return self.fn
+
+    def importTable(self) -> pd.DataFrame:
+        '''import the table of nozzle positions from file'''
+        fn = self.file()
+        if not os.path.exists(fn):
+            return pd.DataFrame([], columns=self.cols)
+        df,_ = plainIm(fn, ic=None)
+        if len(df)==0:
+            return pd.DataFrame([], columns=self.cols)
+        for s in self.cols[2:]:
+            df[s] = pd.to_numeric(df[s])
+        return df
+
+    def table(self) -> pd.DataFrame:
+        '''get the table of nozzle positions, importing it the first time'''
+        if not hasattr(self, 'df'):
+            self.df = self.importTable()
+        return self.df
+
+    def units(self) -> dict:
+        '''units for the columns in the table'''
+        d = {'folder':'', 'key':''}
+        for s in self.cols[2:]:
+            d[s] = 'px'
+        return d
+
+    def export(self) -> None:
+        '''merge the new rows into the table on file, keeping rows that other processes added since we imported it, and export'''
+        fn = self.file()
+        if not os.path.exists(os.path.dirname(fn)):
+            return
+        df = self.table()
+        new = df[df.folder.isin(self.pending)]
+        old = self.importTable()
+        old = old[~old.folder.isin(self.pending)]
+        self.df = pd.concat([old, new], ignore_index=True)
+        plainExp(fn, self.df, self.units(), index=False)
+        self.pending = set()
+
+    def flush(self) -> None:
+        '''export the new rows, if there are any. call this once at the end of a loop over folders'''
+        if len(self.pending)>0:
+            self.export()
+
+    def setRow(self, folder:str, key:str, d:dict) -> None:
+        '''add or replace the nozzle position for the folder'''
+        df = self.table()
+        row = {**{s:np.nan for s in self.cols}, 'folder':folder, 'key':key}
+        for s in dimCols[priorView(folder)]:
+            row[s] = float(d[s])
+        df = df[~(df.folder==folder)]
+        self.df = pd.concat([df, pd.DataFrame([row], columns=self.cols)], ignore_index=True)
+        self.pending.add(folder)
+
+    def add(self, folder:str, date:int, pxpmm:int, d:dict, export:bool=False) -> None:
+        '''record the nozzle position d detected in the folder. export=True to write it to file now instead of at the next flush'''
+        self.setRow(folder, priorKey(date, priorView(folder), pxpmm), d)
+        if export:
+            self.export()
+
+    def learn(self, topFolder:str, export:bool=True) -> int:
+        '''find all of the nozzle dimension files in the top folder and add them to the table. returns the number of files added'''
+        ct = 0
+        for root, _, files in os.walk(topFolder):
+            for f in files:
+                if not isNozDimsFile(f):
+                    continue
+                fn = os.path.join(root, f)
+                d,_ = plainImDict(fn, unitCol=-1, valCol=1)
+                view = priorView(root)
+                if len(set(dimCols[view]+['pxpmm'])-set(d))>0:
+                    continue
+                try:
+                    date = fileDate(fn, out='int')
+                    key = priorKey(date, view, float(d['pxpmm']))
+                except ValueError:
+                    continue
+                self.setRow(root, key, d)
+                ct+=1
+        if export and ct>0:
+            self.export()
+        return ct
+
+    def seed(self, topFolder:str) -> int:
+        '''learn from the nozzle dimension files in the top folder, if this folder has not been searched yet. returns the number of files added'''
+        if topFolder in self.seeded or not os.path.exists(topFolder):
+            return 0
+        self.seeded.add(topFolder)
+        return self.learn(topFolder, export=False)
+
+    def expected(self, folder:str, date:int, pxpmm:int) -> dict:
+        '''get the median nozzle position from other folders from the same day and fixture. returns an empty dict if there are none.
+        the first time there are none, learn from the nozzle dimension files in the other print folders in the same parent folder'''
+        df = self.table()
+        df = df[(df.key==priorKey(date, priorView(folder), pxpmm))&~(df.folder==folder)]
+        if len(df)==0:
+            if self.seed(os.path.dirname(folder))>0:
+                return self.expected(folder, date, pxpmm)
+            return {}
+        return {s:int(df[s].median()) for s in dimCols[priorView(folder)]}
+
+    def record(self, folder:str, success:bool) -> None:
+        '''record whether the fast path worked in this folder'''
+        if success:
+            self.hits+=1
+        else:
+            self.misses+=1
+        logger.info(f'Nozzle fast path {"succeeded" if success else "failed"} in {os.path.basename(folder)}. {self.summary()}')
+
+    def summary(self) -> str:
+        '''describe how many folders succeeded on the fast path'''
+        return f'Fast path succeeded in {self.hits}/{self.hits+self.misses} folders'
+
+
+priors = nozPrior()   # shared store for the whole process
@@ -13,6 +13,7 @@ import numpy as np
 import cv2 as cv
 import imageio
 import csv
+from contextlib import contextmanager
 
 # local packages
 currentdir = os.path.dirname(os.path.realpath(__file__))
@@ -21,6 +22,8 @@ sys.path.append(os.path.dirname(currentdir))
 from progDim.prog_dim import getProgDims
 from tools.plainIm import *
 import file.file_handling as fh
+from im.gif import gifStreamer
+from tools.imWriter import writer
 
 # logging
 logger = logging.getLogger(__name__)
@@ -68,6 +71,7 @@ class vidData:
         self.measures = []
         self.measuresUnits = []
         self.streamOpen = False
+        self.borrowers = 0       # number of open borrowStream blocks
         self.pxpmm = self.pfd.pxpmm()
         self.frameError = frameError(self.pfd)
 
@@ -161,10 +165,7 @@ class vidData:
         self.collectionFrameRate = 120
         if not hasattr(self.pfd, 'meta') or len(self.pfd.meta)==0:
             return 1
-        file = self.pfd.meta[0]
-        d,u = plainImDict(file, unitCol=1, valCol=2)
-        if 'Basler_camera_collection_frame_rate' in d:
-            self.collectionFrameRate = d['Basler_camera_collection_frame_rate']
+        self.collectionFrameRate = self.pfd.metaRecord().frameRate
         
     def getVidStats(self) -> None:
         '''get the video stats from the stream'''
@@ -204,8 +205,8 @@ class vidData:
             self.exportVidStats0()
             
         
-    def setTime(self, t:float) -> None:
-        '''go to the time in seconds, scaling by video length to fluigent length'''
+    def frameNumber(self, t:float) -> int:
+        '''get the frame number at the time in seconds, scaling by video length to fluigent length'''
         if self.frameError[-2:]=='sh':
             # offset start time
             f = int((t+self.dstart)*self.fps)
@@ -214,7 +215,11 @@ class vidData:
             f = max(1, int(t/self.duration*self.frames))
         if f>=self.frames:
             f = self.frames-1
-        self.stream.set(cv.CAP_PROP_POS_FRAMES,f)
+        return f
+        
+    def setTime(self, t:float) -> None:
+        '''go to the time in seconds, scaling by video length to fluigent length'''
+        self.stream.set(cv.CAP_PROP_POS_FRAMES,self.frameNumber(t))
         
     def getFrameAtTime(self, t:float, overwrite:bool=False) -> None:
         '''get the frame at a specific time'''
@@ -227,9 +232,52 @@ class vidData:
         else:
             return frame[5:-5,5:-5] # crop
         self.closeStream()
+        
+    def framesAtNumbers(self, frameNumbers:List[int]):
+        '''iterate through frames at a sorted list of frame numbers, decoding forward from the first frame instead of seeking to each frame. yields (frame number, cropped frame)'''
+        self.openStream()
+        if len(frameNumbers)==0:
+            return
+        self.stream.set(cv.CAP_PROP_POS_FRAMES, frameNumbers[0])
+        current = frameNumbers[0]   # number of the next frame in the stream
+        frame = None
+        fullFrame = None
+        for f in frameNumbers:
+            if f<current:
+                # repeated frame
+                if frame is not None:
+                    yield f, frame
+                continue
+            while current<f:
+                self.stream.grab()    # skip frame without decoding
+                current+=1
+            grabbed, fullFrame = self.stream.read(fullFrame)   # decode into the same buffer
+            current+=1
+            if not grabbed:
+                logging.info(f'Frame not collected at frame {f}: (t,frame) = {streamInfo(self.stream)}')
+                return
+            frame = fullFrame[5:-5,5:-5] # crop
+            yield f, frame
+ 
+    @contextmanager
+    def borrowStream(self, overwrite:bool=False):
+        '''keep the video stream open for everything inside the with block, so the container is only opened once for a whole measurement session.
+        nested blocks share the same stream, and closeStream does nothing until the outermost block exits.
+        the stream is released when the outermost block exits, even if there is an error, unless it was already open before the block'''
+        opened = not self.streamOpen
+        self.openStream(overwrite=overwrite)
+        self.borrowers+=1
+        try:
+            yield self.stream
+        finally:
+            self.borrowers-=1
+            if self.borrowers==0 and opened:
+                self.closeStream()
  
     def closeStream(self) -> None:
-        '''close the stream'''
+        '''close the stream, unless it is being borrowed'''
+        if self.borrowers>0:
+            return
         if self.streamOpen:
             self.stream.release()
             self.streamOpen = False
@@ -289,27 +337,23 @@ class vidData:
             raise ValueError(f'Unknown print type in {self.folder}')
         if len(prefixes)>0 and not prefix in prefixes:
             return
-        for i,row in self.prog.iterrows():
-            name = row['name']
-            if len(prefix)>0:
-                fn = self.pfd.newFileName(f'vstill_{prefix}_{name}', 'png')
-            else:
-                fn = self.pfd.newFileName(f'vstill_{name}', 'png')
-            if not os.path.exists(fn) or overwrite:
-                frame = self.getFrameAtTime(row['tpic'], (overwrite and i==0))   # this also exports video stats on the first loop if overwriting
-                cv.imwrite(fn, frame)
-                if diag>0:
-                    logging.info(f'Exported {os.path.basename(fn)}')
+        with self.borrowStream(overwrite=overwrite):   # this also exports video stats if overwriting
+            for i,row in self.prog.iterrows():
+                name = row['name']
+                if len(prefix)>0:
+                    fn = self.pfd.newFileName(f'vstill_{prefix}_{name}', 'png')
+                else:
+                    fn = self.pfd.newFileName(f'vstill_{name}', 'png')
+                if not os.path.exists(fn) or overwrite:
+                    frame = self.getFrameAtTime(row['tpic'])
+                    writer.write(fn, frame)      # encode the png while the next frame is read
+                    if diag>0:
+                        logging.info(f'Exported {os.path.basename(fn)}')
+        writer.flush()
                     
-    def exportGIF(self, line:str, compression:int=1, speedScale:float=1, color:bool=True, crop:dict={}, sizeCompression:int=1, prestart:float=0, postend:float=0) -> None:
-        '''export a gif of just the writing and observing of one line. line is the line name, e.g. l1w1.
-        compression is the factor of how many frames to drop. e.g take on frame per compression frames
-        speedScale is how much to speed up the video'''
-        self.openStream()
+    def gifFrameNumbers(self, line:str, compression:int=1, prestart:float=0, postend:float=0) -> List[int]:
+        '''get the list of frame numbers to put in a gif of the writing and observing of one line'''
         dt = compression/self.fps  # time step size to take frames
-        giffps = int(speedScale/dt)   # frames per second of the gif
-        newName = self.pfd.newFileName(f'clip_{line}', 'gif')
-        result = imageio.get_writer(newName, fps=giffps)
         if not hasattr(self, 'prog'):
             self.getProgDims()
         pline = self.prog[self.prog.name.str.contains(f'{line}p')]
@@ -318,30 +362,40 @@ class vidData:
         t0 = pline.iloc[0]['t0']+prestart
         oline = self.prog[self.prog.name.str.contains(f'{line}o')]
         tf = oline.iloc[-1]['tpic']+postend
-
-        for t in np.arange(t0, tf+dt, dt):
-            frame = self.getFrameAtTime(t, False)
-            if color:
-                frame = cv.cvtColor(frame, cv.COLOR_BGR2RGB)
-            else:
-                frame = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
-            if 'y0' in crop and 'yf' in crop and 'x0' in crop and 'xf' in crop:
-                frame = frame[crop['y0']:crop['yf'], crop['x0']:crop['xf']]
-            if not sizeCompression==1:
-                dim = frame.shape
-                h = int(dim[0]/sizeCompression)
-                w = int(dim[1]/sizeCompression)
-                dim = (w,h)
-                frame = cv.resize(frame, dim, interpolation = cv.INTER_AREA)
-            result.append_data(frame)
-
-          # When everything done, release 
-        # the video capture and video 
-        # write objects
-        result.close()
-        file_stats = os.stat(newName)
-        logging.info(f'Exported {newName}: {file_stats.st_size / (1024 * 1024)} MB')
+        return [self.frameNumber(t) for t in np.arange(t0, tf+dt, dt)]
+                    
+    def exportGIFs(self, lines:List[str], compression:int=1, speedScale:float=1, color:bool=True, crop:dict={}, sizeCompression:int=1, prestart:float=0, postend:float=0) -> None:
+        '''export a gif of just the writing and observing of each line in the list. lines are line names, e.g. l1w1.
+        compression is the factor of how many frames to drop. e.g take on frame per compression frames
+        speedScale is how much to speed up the video.
+        the video is decoded once from the start of the first clip to the end of the last clip, and frames are streamed into the gifs'''
+        self.openStream()
+        dt = compression/self.fps  # time step size to take frames
+        giffps = int(speedScale/dt)   # frames per second of the gif
+        if color:
+            colorCode = cv.COLOR_BGR2RGB
+        else:
+            colorCode = cv.COLOR_BGR2GRAY
+        clips = []
+        for line in lines:
+            frameNumbers = self.gifFrameNumbers(line, compression=compression, prestart=prestart, postend=postend)
+            newName = self.pfd.newFileName(f'clip_{line}', 'gif')
+            clips.append({'frames':frameNumbers, 'gif':gifStreamer(newName, giffps, colorCode=colorCode, crop=crop, sizeCompression=sizeCompression)})
+        
+        # each frame number goes to every clip that contains it
+        allFrames = sorted(set([f for clip in clips for f in clip['frames']]))
+        counts = [dict(zip(*np.unique(clip['frames'], return_counts=True))) for clip in clips]
+        for f, frame in self.framesAtNumbers(allFrames):
+            for clip, count in zip(clips, counts):
+                for i in range(count.get(f, 0)):
+                    clip['gif'].append(frame)
+        for clip in clips:
+            clip['gif'].close()
         return
+                    
+    def exportGIF(self, line:str, **kwargs) -> None:
+        '''export a gif of just the writing and observing of one line. line is the line name, e.g. l1w1. kwargs go to exportGIFs'''
+        self.exportGIFs([line], **kwargs)
             
 #----------------------------------------------
 
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+'''Script for testing that getLDiff simplifies convex hulls the same way as the original epsilon loop'''
+
+# external packages
+import os, sys
+import traceback
+import logging
+from typing import List, Dict, Tuple, Union, Any, TextIO
+import re
+import numpy as np
+import cv2 as cv
+import unittest
+import pandas as pd
+__unittest = True
+
+# local packages
+currentdir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(currentdir)
+parentdir = os.path.dirname(currentdir)
+sys.path.append(os.path.join(parentdir, 'py'))
+from metrics.m_file.file_metric import fileMetric
+import tools.logs as logs
+
+# logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+for s in ['matplotlib', 'imageio', 'IPython', 'PIL']:
+    logging.getLogger(s).setLevel(logging.WARNING)
+LOGGERDEFINED = logs.openLog('test_contourSimplify.py', False, level='DEBUG', exportLog=True) # export logs to file
+
+
+#----------------------------------------------
+
+def oldLDiff(fm:fileMetric, horiz:bool) -> float:
+    '''simplify the hull with the epsilon loop that getLDiff used before contourSimplifier, and get ldiff'''
+    fm.hull2 = [0,0,0,0,0]
+    ii = 30
+    while len(fm.hull2)>4:
+        ii = ii+5
+        fm.hull2 = cv.approxPolyDP(fm.hull, ii, True)
+    left,right = fm.getLDiffPoints(horiz)
+    lu, ru = fm.getLURU(left, right, horiz)
+    while (len(fm.hull2)<4 or lu<2 or ru<2) and ii>0:
+        ii = ii-1
+        fm.hull2 = cv.approxPolyDP(fm.hull, ii, True)
+        left,right = fm.getLDiffPoints(horiz)
+        lu, ru = fm.getLURU(left, right, horiz)
+    if horiz:
+        return (right.x.max()-right.x.min())-(left.x.max()-left.x.min())
+    else:
+        return (right.y.max()-right.y.min())-(left.y.max()-left.y.min())
+
+def isMonotone(hull:np.array) -> bool:
+    '''check if the number of vertices never goes up as epsilon goes up'''
+    counts = [len(cv.approxPolyDP(hull, e, True)) for e in range(0, 300)]
+    return all(counts[j+1]<=counts[j] for j in range(len(counts)-1))
+
+def randomHulls(n:int=3000, seed:int=0) -> List[np.array]:
+    '''convex hulls of random points. about 1 in 400 has a vertex count that goes up as epsilon goes up'''
+    rng = np.random.default_rng(seed)
+    hulls = []
+    for i in range(n):
+        pts = rng.integers(0, 600, size=(rng.integers(5,40),2)).astype(np.int32)
+        hulls.append(cv.convexHull(pts))
+    return hulls
+
+
+class TestContourSimplify(unittest.TestCase):
+    '''test that getLDiff gives the same simplified hull and ldiff as the original loop'''
+
+    def parameterize(self, hull:np.array, horiz:bool, **kwargs):
+        self.hull = hull
+        self.horiz = horiz
+
+    def setUp(self):
+        fm = fileMetric.__new__(fileMetric)   # only the hull is needed
+        fm.hull = self.hull
+        self.expectedError = ''
+        self.error = ''
+        try:
+            self.expected = oldLDiff(fm, self.horiz)
+        except Exception as e:
+            self.expectedError = type(e).__name__
+        self.expectedHull = fm.hull2
+        try:
+            self.ldiff = fm.getLDiff(self.horiz)
+        except Exception as e:
+            self.error = type(e).__name__
+        self.hull2 = fm.hull2
+
+    def test_error(self):
+        errmess = f'test_error failed on {self.hull.tolist()}, horiz = {self.horiz}, expected = {self.expectedError}, found = {self.error}'
+        self.assertEqual(self.expectedError, self.error, errmess)
+
+    def test_hull2(self):
+        errmess = f'test_hull2 failed on {self.hull.tolist()}, horiz = {self.horiz}, expected = {self.expectedHull.tolist()}, found = {self.hull2.tolist()}'
+        self.assertTrue(np.array_equal(self.expectedHull, self.hull2), errmess)
+
+    def test_ldiff(self):
+        errmess = f'test_ldiff failed on {self.hull.tolist()}, horiz = {self.horiz}, expected = {self.expected}, found = {self.ldiff}'
+        self.assertTrue(self.expected==self.ldiff or (np.isnan(self.expected) and np.isnan(self.ldiff)), errmess)
+
+    def runTest(self):
+        self.test_error()
+        self.test_hull2()
+        if len(self.error)==0:
+            self.test_ldiff()
+
+def suite():
+    suite = unittest.TestSuite()
+    hulls = randomHulls()
+    nonMonotone = [h for h in hulls if not isMonotone(h)]
+    if len(nonMonotone)==0:
+        raise ValueError('No random hulls have vertex counts that go up with epsilon')
+    for hull in hulls:
+        for horiz in [False, True]:
+            t = TestContourSimplify()
+            t.parameterize(hull, horiz)
+            suite.addTest(t)
+    return suite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner()
+    runner.run(suite())
+
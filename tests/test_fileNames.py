@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+'''Script for testing that the file name classifier sorts files the same way as the original table scans'''
+
+# external packages
+import os, sys
+import traceback
+import logging
+from typing import List, Dict, Tuple, Union, Any, TextIO
+import re
+import numpy as np
+import unittest
+import pandas as pd
+__unittest = True
+
+# local packages
+currentdir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(currentdir)
+parentdir = os.path.dirname(currentdir)
+sys.path.append(os.path.join(parentdir, 'py'))
+from file_handling import *
+import file.file_names as fn
+import tools.logs as logs
+
+# logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+for s in ['matplotlib', 'imageio', 'IPython', 'PIL']:
+    logging.getLogger(s).setLevel(logging.WARNING)
+LOGGERDEFINED = logs.openLog('test_fileNames.py', False, level='DEBUG', exportLog=True) # export logs to file
+
+
+#----------------------------------------------
+
+# frozen copies of the file name checks from before fileNameClassifier. they scan the tables every time instead of using the shared classifier
+
+def oldIsStill(file:str) -> bool:
+    '''determine if the file is an unstitched image by scanning the pic tables'''
+    spl = splitFileName(file)
+    return spl[0] in fn.tripleLineSBPPicfiles() or spl[0] in fn.singleLineSBPPicfiles() or spl[0] in fn.SDTSBPPicfiles()
+
+def oldIsVidStill(file:str) -> bool:
+    '''determine if the file is a video still by scanning the still names'''
+    if not '.png' in file:
+        return False
+    if '_vstill_' in file:
+        return True
+    for st in fn.allStFiles():
+        if f'_vid_{st}' in file:
+            return True
+    return False
+
+def oldIsStitch(file:str) -> bool:
+    '''determine if the file is a stitched image'''
+    if not '.png' in file:
+        return False
+    if '_stitch_' in file:
+        return True
+    if not 'singleLine' in file:
+        return False
+    bn = os.path.basename(file)
+    if 'xs' in bn or 'horiz' in bn or 'vert' in bn:
+        return True
+    return False
+
+def oldShortcut(file:str) -> str:
+    '''get the shortcut for the sbp name at the start of the file name by scanning the tables'''
+    spl0 = splitFileName(file)[0]
+    sbp = {**fn.singleDisturbSBPfiles(), **fn.SDTSBPfiles(), **fn.tripleLineSBPfiles(), **fn.singleLineSBPfiles()}
+    pics = {**fn.tripleLineSBPPicfiles(), **fn.singleLineSBPPicfiles(), **fn.SDTSBPPicfiles()}
+    if spl0 in sbp:
+        return sbp[spl0]
+    return pics.get(spl0, '')
+
+def sortPNGKind(file:str) -> str:
+    '''get the list that a png goes in, in the order that printFileDict.sortPNG checked them before it used the classifier'''
+    fname = os.path.splitext(os.path.basename(file))[0]
+    if 'background' in fname:
+        return 'background'
+    elif oldIsStill(file):
+        if 'Basler camera' in fname:
+            return 'still'
+        elif 'vcrop' in fname:
+            return 'vcrop'
+        elif 'MLsegment2' in fname:
+            return 'MLsegment2'
+        elif 'MLsegment' in fname:
+            return 'MLsegment'
+        elif 'Usegment' in fname:
+            return 'Usegment'
+        elif oldIsVidStill(file):
+            return 'vstill'
+        else:
+            return 'still_unknown'
+    elif oldIsStitch(file):
+        return 'stitch'
+    elif oldIsVidStill(file):
+        return 'vstill'
+    else:
+        return 'still_unknown'
+
+# names that cover every branch of sortPNG, with the list each one goes in
+knownKinds = {'disturbHoriz3_1_0.500_Basler camera_I_SO8_S_4.00_230511_123456_0.png':'still',
+              'disturbHoriz3_1_0.500_background_I_SO8_S_4.00_230511_123456_0.png':'background',
+              'disturbHoriz3_1_0.500_vcrop_HOh_l1w1o1_I_SO8_S_4.00_230511_123456_0.png':'vcrop',
+              'disturbHoriz3_1_0.500_MLsegment2_HOh_l1w1o1_I_SO8_S_4.00_230511_123456_0.png':'MLsegment2',
+              'disturbHoriz3_1_0.500_MLsegment_HOh_l1w1o1_I_SO8_S_4.00_230511_123456_0.png':'MLsegment',
+              'disturbHoriz3_1_0.500_Usegment_HOh_l1w1o1_I_SO8_S_4.00_230511_123456_0.png':'Usegment',
+              'disturbHoriz3_1_0.500_vstill_HOh_l1w1o1_I_SO8_S_4.00_230511_123456_0.png':'vstill',
+              'disturbHoriz3_1_0.500_other_I_SO8_S_4.00_230511_123456_0.png':'still_unknown',
+              'crossDoubleHoriz_0_0.750_HOC_0_stitch_1_I_3.50_S_2.75_220428_153705_1.png':'stitch',
+              'I_M4S_S_2.50T_210922_vid_horiz1.png':'vstill',
+              'I_SO8_S_4.00_230511_vid_HOh1.png':'vstill',
+              'crossDoubleVert_0.5_0.875_vid_VB.png':'vstill',
+              'I_SO8_S_4.00_230511_vid_zzz.png':'still_unknown'}
+
+def testNames() -> List[str]:
+    '''get all of the file names in the test tables, as pngs'''
+    cdir = os.path.dirname(os.path.realpath(__file__))
+    files = []
+    for f in os.listdir(cdir):
+        if not f.endswith('.csv'):
+            continue
+        df = pd.read_csv(os.path.join(cdir, f), dtype=str, encoding='utf-8-sig')
+        for col in df:
+            for val in df[col].dropna():
+                bn = re.split(r'[\\/]', val)[-1]
+                if '.' in bn:
+                    files.append(os.path.splitext(bn)[0]+'.png')
+    return list(dict.fromkeys(files))
+
+
+class TestFileNames(unittest.TestCase):
+    '''test that the classifier puts each file in the same list, with the same shortcut, as the frozen table scans'''
+
+    def parameterize(self, file:str, kind:str='', **kwargs):
+        self.file = file
+        self.kind0 = kind
+
+    def setUp(self):
+        if len(self.kind0)>0:
+            self.expected = self.kind0
+        else:
+            self.expected = sortPNGKind(self.file)
+        self.expectedShortcut = oldShortcut(self.file)
+        self.kind, self.shortcut, _ = fn.names.classify(self.file)
+
+    def test_kind(self):
+        errmess = f'test_kind failed on {self.file}, expected = {self.expected}, found = {self.kind}'
+        self.assertEqual(self.expected, self.kind, errmess)
+
+    def test_shortcut(self):
+        errmess = f'test_shortcut failed on {self.file}, expected = {self.expectedShortcut}, found = {self.shortcut}'
+        self.assertEqual(self.expectedShortcut, self.shortcut, errmess)
+
+    def runTest(self):
+        self.test_kind()
+        self.test_shortcut()
+
+def suite():
+    suite = unittest.TestSuite()
+    for file in testNames():
+        t = TestFileNames()
+        t.parameterize(file)
+        suite.addTest(t)
+    for file,kind in knownKinds.items():
+        t = TestFileNames()
+        t.parameterize(file, kind=kind)
+        suite.addTest(t)
+    return suite
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner()
+    runner.run(suite())
+